@@ -1,39 +1,187 @@
 import sys
-from functools import lru_cache
+from collections import OrderedDict, namedtuple
 from queue import Queue
 import matplotlib.pyplot as plt
+import numpy as np
 from numpy.ma.extras import average
 import timeit
 
 
-@lru_cache(None)
-def build_tree_recursive_cash(height: int, root: int, l_l=lambda x: x ** 2, l_r=lambda x: x ** 2 + 2):
+FrozenNode = namedtuple("FrozenNode", "key children")
+FrozenNode.__doc__ = """Неизменяемый узел дерева: key - строка значения, children - кортеж потомков.
+
+Одинаковые поддеревья разделяются между деревьями через кеш, поэтому
+изменять их нельзя; изменяемое дерево из словарей дает thaw().
+"""
+
+
+class SubtreeCache:
+    """Кеш построенных поддеревьев с вытеснением LRU и статистикой попаданий.
+
+    Ключ - (значение, тип значения, оставшаяся высота, левая функция, правая функция).
+    Функции сравниваются как объекты, поэтому две разные лямбды с одинаковым
+    текстом дают разные записи. Хранятся только FrozenNode, так что
+    отданное из кеша поддерево никто не может испортить.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        if maxsize <= 0:
+            raise ValueError("maxsize не может быть <= 0")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def make_key(value, height: int, l_b, r_b) -> tuple:
+        return value, type(value), max(height, 0), l_b, r_b
+
+    def get(self, key: tuple):
+        """Возвращает узел по ключу или None; учитывает попадание или промах в статистике."""
+        node = self._data.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return node
+
+    def put(self, key: tuple, node: FrozenNode) -> None:
+        self._data[key] = node
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data)}
+
+
+_SUBTREE_CACHE = SubtreeCache()
+
+
+def thaw(node: FrozenNode) -> dict:
+    """Копирует неизменяемое дерево в новые словари (без рекурсии).
+
+    Args:
+        node: Корень дерева из FrozenNode
+
+    Returns:
+        Словарь вида {key: [left_subtree, right_subtree]}, не связанный с кешем
+    """
+    result = {node.key: []}
+    stack = [(node, result[node.key])]
+    while stack:
+        frozen, children = stack.pop()
+        for child in frozen.children:
+            di = {child.key: []}
+            children.append(di)
+            stack.append((child, di[child.key]))
+    return result
+
+
+def _frozen_subtree(height: int, root, l_l, l_r, cache: SubtreeCache) -> FrozenNode:
+    key = cache.make_key(root, height, l_l, l_r)
+    node = cache.get(key)
+    if node is None:
+        children = ()
+        if height >= 1:
+            children = (_frozen_subtree(height - 1, l_l(root), l_l, l_r, cache),
+                        _frozen_subtree(height - 1, l_r(root), l_l, l_r, cache))
+        node = FrozenNode(str(root), children)
+        cache.put(key, node)
+    return node
+
+
+def build_tree_recursive_cash(height: int, root: int, l_l=lambda x: x ** 2, l_r=lambda x: x ** 2 + 2,
+                              cache: SubtreeCache = None, frozen: bool = False):
     """Рекурсивно с помощью кеша генерирует бинарное дерево в виде словарей.
 
-    Строит дерево с помощью рекурсии, каждый узел которой - словарь
+    Строит дерево с помощью рекурсии, каждый узел которой - словарь.
+    Поддеревья запоминаются в cache по (значение, высота, функции веток),
+    так что одинаковые поддеревья строятся один раз - и внутри одного
+    дерева, и между вызовами.
 
     Args:
         height: Высота дерева
         root: целое число
         l_l: Функция для вычисления левых веток
         l_r: Функция для вычисления правых веток
+        cache: Кеш поддеревьев, по умолчанию общий для модуля
+        frozen: Вернуть неизменяемый FrozenNode с общими поддеревьями вместо копии
 
     Returns:
         Словарь, где ключами являются значения root, а значениями - список результатов работы функции
 
     """
-    if height < 1:
-        return {str(root): []}
-    return {str(root): [build_tree_recursive_cash(height - 1, l_l(root), l_l, l_r),
-                        build_tree_recursive_cash(height - 1, l_r(root), l_l, l_r)]}
+    node = _frozen_subtree(height, root, l_l, l_r, _SUBTREE_CACHE if cache is None else cache)
+    return node if frozen else thaw(node)
+
 
+def _vector_level(prev: np.ndarray, l_b, r_b):
+    """Следующий уровень целиком операциями numpy или None, если так нельзя.
 
-@lru_cache(None)
-def build_tree_iterative_cach(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2):
+    None возвращается, если функции не работают с массивами, дают на
+    массиве не то же, что поэлементно, или значения (по оценке в float64)
+    выходят за 2**62 и int64 молча переполнился бы. Каждый элемент
+    результата сверяется с float64 с точностью до округления, так что
+    переполнение в промежуточном вычислении тоже дает None.
     """
-    Создает бинарное дерево заданной высоты c , используя алгоритм поиска в ширину.
-    Узлы обрабатываются уровень за уровнем с помощью очереди.
-    А так же используя кеш
+    try:
+        with np.errstate(all="ignore"):
+            results = (l_b(prev), r_b(prev))
+            bounds = (l_b(prev.astype(float)), r_b(prev.astype(float)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    for result, bound in zip(results, bounds):
+        if not isinstance(result, np.ndarray) or result.dtype != np.int64 or result.shape != prev.shape:
+            return None
+        if not np.all(np.abs(bound) < 2.0 ** 62):
+            return None
+        # промежуточное переполнение в любом элементе дает расхождение с float64
+        if not np.allclose(result, bound, rtol=1e-9, atol=0.5):
+            return None
+    for i in {0, len(prev) - 1}:
+        x = int(prev[i])
+        if l_b(x) != results[0][i] or r_b(x) != results[1][i]:
+            return None
+    level = np.empty(2 * len(prev), dtype=np.int64)
+    level[0::2], level[1::2] = results
+    return level
+
+
+def _next_level(prev, l_b, r_b):
+    """Значения следующего уровня: l_b(x), r_b(x) для каждого x предыдущего уровня по порядку.
+
+    Уровень хранится массивом numpy int64, пока значения в него помещаются,
+    иначе списком.
+    """
+    if isinstance(prev, np.ndarray):
+        level = _vector_level(prev, l_b, r_b)
+        if level is not None:
+            return level
+        prev = prev.tolist()
+    level = [f(x) for x in prev for f in (l_b, r_b)]
+    as_array = np.array(level)
+    return as_array if as_array.dtype == np.int64 else level
+
+
+def build_tree_iterative_cach(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2,
+                              cache: SubtreeCache = None, frozen: bool = False):
+    """
+    Создает бинарное дерево заданной высоты c , используя обход в ширину.
+    Узлы обрабатываются уровень за уровнем: весь следующий уровень
+    вычисляется сразу по предыдущему (numpy, если функции это
+    поддерживают), без очереди и без перевода ключей из строк в числа.
+    А так же используя кеш поддеревьев (тот же, что у build_tree_recursive_cash):
+    на каждом уровне раскрываются только различные значения, поддеревьев
+    которых еще нет в кеше, а их узлы собираются снизу вверх и запоминаются.
 
     Args:
         height (int): Высота генерируемого бинарного дерева
@@ -42,11 +190,46 @@ def build_tree_iterative_cach(height: int, root: int, l_b=lambda x: x ** 2, r_b=
                                  По умолчанию x**2.
         r_b (callable, optional): Функция для вычисления правого потомка.
                                  По умолчанию x**2 + 2.
+        cache (SubtreeCache, optional): Кеш поддеревьев, по умолчанию общий для модуля
+        frozen (bool, optional): Вернуть неизменяемый FrozenNode вместо копии
 
     Returns:
         dict: Словарь, представляющий бинарное дерево в формате:
               {root_value: [left_subtree, right_subtree]}
     """
+    cache = _SUBTREE_CACHE if cache is None else cache
+    height = max(height, 0)
+    levels = []
+    level, values = [root], [root]
+    for depth in range(height + 1):
+        remaining = height - depth
+        nodes, missing = {}, []
+        for x in values:
+            if (x, type(x)) not in nodes:
+                node = nodes[x, type(x)] = cache.get(cache.make_key(x, remaining, l_b, r_b))
+                if node is None:
+                    missing.append(x)
+        levels.append((values, nodes, missing, remaining))
+        if remaining == 0 or not missing:
+            break
+        level = _next_level(np.array(missing) if isinstance(level, np.ndarray) else missing, l_b, r_b)
+        values = level.tolist() if isinstance(level, np.ndarray) else level
+    below = below_nodes = None
+    for values, nodes, missing, remaining in reversed(levels):
+        for i, x in enumerate(missing):
+            children = ()
+            if remaining > 0:
+                left, right = below[2 * i], below[2 * i + 1]
+                children = (below_nodes[left, type(left)], below_nodes[right, type(right)])
+            node = nodes[x, type(x)] = FrozenNode(str(x), children)
+            cache.put(cache.make_key(x, remaining, l_b, r_b), node)
+        below, below_nodes = values, nodes
+    node = below_nodes[root, type(root)]
+    return node if frozen else thaw(node)
+
+
+def build_tree_queue(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2):
+    """Прежняя версия build_tree_iterative_cach на queue.Queue, без кеша - для сравнения скорости."""
     queue = Queue()
     di = {str(root): []}
     queue.put(di)
@@ -60,6 +243,21 @@ def build_tree_iterative_cach(height: int, root: int, l_b=lambda x: x ** 2, r_b=
             queue.put(r_di)
     return di
 
+
+def compare_level_builder(heights, l_b=lambda x: x + 1, r_b=lambda x: x + 2, repeat=3):
+    """Лучшее время построения дерева очередью и по уровням (с пустым кешем) для каждой высоты.
+
+    Returns:
+        Пара списков: времена build_tree_queue и build_tree_iterative_cach
+    """
+    queue_times, level_times = [], []
+    for height in heights:
+        queue_times.append(min(timeit.repeat(lambda: build_tree_queue(height, 1, l_b, r_b), number=1, repeat=repeat)))
+        level_times.append(min(timeit.repeat(lambda: build_tree_iterative_cach(height, 1, l_b, r_b, SubtreeCache()),
+                                             number=1, repeat=repeat)))
+    return queue_times, level_times
+
+
 def time(func, n, repeat=10):
     """Возвращает среднее время выполнения func(n)"""
     times = timeit.repeat(lambda: func(n, 11), number=5, repeat=repeat)
@@ -70,10 +268,13 @@ def main():
 
     res_recursive_cached = []
     res_iterative_cached = []
+    recursive_cache, iterative_cache = SubtreeCache(), SubtreeCache()
 
     for n in test_data:
-        res_recursive_cached.append(time(build_tree_recursive_cash, n))
-        res_iterative_cached.append(time(build_tree_iterative_cach, n))
+        res_recursive_cached.append(time(lambda h, root: build_tree_recursive_cash(h, root, cache=recursive_cache), n))
+        res_iterative_cached.append(time(lambda h, root: build_tree_iterative_cach(h, root, cache=iterative_cache), n))
+    print("кеш рекурсивного:", recursive_cache.stats())
+    print("кеш итеративного:", iterative_cache.stats())
 
     # С кэшем
     plt.plot(test_data, res_recursive_cached, label="Рекурсивный с кэшем")
@@ -83,5 +284,18 @@ def main():
     plt.legend()
     plt.show()
 
+    # Очередь против построения по уровням
+    heights = list(range(4, 17, 2))
+    queue_times, level_times = compare_level_builder(heights)
+    for height, queue_time, level_time in zip(heights, queue_times, level_times):
+        print(f"высота {height}: очередь {queue_time:.4f} c, по уровням {level_time:.4f} c, "
+              f"в {queue_time / level_time:.1f} раз быстрее")
+    plt.plot(heights, queue_times, label="queue.Queue")
+    plt.plot(heights, level_times, label="По уровням")
+    plt.xlabel("высота дерева")
+    plt.suptitle("Сравнение построения дерева очередью и по уровням")
+    plt.legend()
+    plt.show()
+
 if __name__ == '__main__':
     main()
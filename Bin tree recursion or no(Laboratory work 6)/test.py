@@ -0,0 +1,125 @@
+import unittest
+from main import SubtreeCache
+from main import FrozenNode
+from main import thaw
+from main import build_tree_recursive_cash
+from main import build_tree_iterative_cach
+from main import build_tree_queue
+
+
+def same(x):
+    return x
+
+
+class TestBinTree(unittest.TestCase):
+    """
+    Тестовый класс для проверки функций генерации бинарного дерева с кешем.
+
+    Содержит тестовые случаи для build_tree_recursive_cash и
+    build_tree_iterative_cach, кеша поддеревьев SubtreeCache и
+    неизменяемых деревьев FrozenNode.
+    """
+
+    builders = (build_tree_recursive_cash, build_tree_iterative_cach)
+
+    def test_build(self):
+        """
+        Проверяет, что оба построителя дают то же дерево, что и построение очередью без кеша.
+        """
+        for build in self.builders:
+            with self.subTest(build=build.__name__):
+                self.assertEqual(build(3, 11, cache=SubtreeCache()), build_tree_queue(3, 11))
+                self.assertEqual(build(1, 3, cache=SubtreeCache()), {'3': [{'9': []}, {'11': []}]})
+
+    def test_hidden_overflow(self):
+        """
+        Проверяет, что переполнение int64 внутри функции (x*x до взятия остатка) не дает неверных ключей.
+        """
+        l_b, r_b = lambda x: x * x % 10 ** 12, lambda x: (x % 2) * 10 ** 10
+        expected = build_tree_queue(3, 1, l_b, r_b)
+        self.assertEqual(build_tree_iterative_cach(3, 1, l_b, r_b, SubtreeCache()), expected)
+        self.assertEqual(build_tree_recursive_cash(3, 1, l_b, r_b, SubtreeCache()), expected)
+
+    def test_negative_height(self):
+        """
+        Проверяет, что при отрицательной высоте строится один корень.
+        """
+        for build in self.builders:
+            with self.subTest(build=build.__name__):
+                self.assertEqual(build(-1, 3, cache=SubtreeCache()), {'3': []})
+
+    def test_cache_stats(self):
+        """
+        Проверяет подсчет попаданий и промахов кеша.
+
+        При одинаковых функциях веток оба потомка узла совпадают, поэтому
+        правое поддерево каждого уровня берется из кеша.
+        """
+        cache = SubtreeCache()
+        build_tree_recursive_cash(2, 1, same, same, cache=cache)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 3, "evictions": 0, "size": 3})
+        build_tree_recursive_cash(2, 1, same, same, cache=cache)
+        self.assertEqual(cache.stats()["hits"], 3)
+        build_tree_iterative_cach(2, 1, same, same, cache=cache)
+        self.assertEqual(cache.stats()["hits"], 4)
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "size": 0})
+
+    def test_cache_eviction(self):
+        """
+        Проверяет, что кеш хранит не больше maxsize поддеревьев и вытесняет давно не запрошенные.
+        """
+        cache = SubtreeCache(maxsize=2)
+        build_tree_recursive_cash(2, 1, same, same, cache=cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get(cache.make_key(1, 0, same, same)))
+        self.assertIsNotNone(cache.get(cache.make_key(1, 2, same, same)))
+        with self.assertRaises(ValueError):
+            SubtreeCache(maxsize=0)
+
+    def test_int_and_float_keys(self):
+        """
+        Проверяет, что корни 3 и 3.0 не смешиваются в кеше: у них разные строки узлов.
+        """
+        for build in self.builders:
+            with self.subTest(build=build.__name__):
+                cache = SubtreeCache()
+                self.assertEqual(build(1, 3, cache=cache), {'3': [{'9': []}, {'11': []}]})
+                self.assertEqual(build(1, 3.0, cache=cache), {'3.0': [{'9.0': []}, {'11.0': []}]})
+                self.assertEqual(build(1, 3, cache=cache), {'3': [{'9': []}, {'11': []}]})
+
+    def test_frozen_shares_subtrees(self):
+        """
+        Проверяет, что frozen=True возвращает неизменяемое дерево с общими поддеревьями.
+        """
+        for build in self.builders:
+            with self.subTest(build=build.__name__):
+                cache = SubtreeCache()
+                tree = build(3, 1, same, same, cache=cache, frozen=True)
+                self.assertIsInstance(tree, FrozenNode)
+                self.assertIs(tree.children[0], tree.children[1])
+                self.assertIs(build(3, 1, same, same, cache=cache, frozen=True), tree)
+                with self.assertRaises(AttributeError):
+                    tree.key = '2'
+                self.assertEqual(thaw(tree), build_tree_queue(3, 1, same, same))
+
+    def test_thaw_copy_on_write(self):
+        """
+        Проверяет, что изменение дерева из thaw() не затрагивает кеш и следующие деревья.
+        """
+        for build in self.builders:
+            with self.subTest(build=build.__name__):
+                cache = SubtreeCache()
+                tree = build(2, 11, cache=cache)
+                expected = build_tree_queue(2, 11)
+                tree['11'][0]['121'].clear()
+                tree['11'].append({'0': []})
+                self.assertEqual(build(2, 11, cache=cache), expected)
+                self.assertEqual(thaw(build(2, 11, cache=cache, frozen=True)), expected)
+                left, right = build(1, 1, same, same, cache=cache)['1']
+                self.assertIsNot(left, right)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,10 @@
+import pickle
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+
 def left_leaf(root: int) -> int:
     """Вычисляет значение левого листового узла.
 
@@ -43,6 +50,312 @@ def gen_bin_tree(height: int, root: int, l_l=left_leaf, l_r=right_leaf):
                         gen_bin_tree(height - 1, l_r(root), l_l, l_r)]}
 
 
+def _grow_levels(values, levels: int, l_l, l_r):
+    """Достраивает плоский массив values (в порядке кучи) до levels уровней.
+
+    Дети узла i лежат на позициях 2i+1 и 2i+2, поэтому следующий уровень -
+    это значения l_l(x), l_r(x) для каждого x предыдущего уровня по порядку.
+    Пока значения помещаются в int64, они хранятся в array('q') по 8 байт;
+    как только очередное значение не помещается, буфер становится списком.
+
+    Args:
+        values: array('q') или список с уже построенными уровнями, начиная с корня
+        levels: Требуемое число уровней
+        l_l: Функция для вычисления левых веток
+        l_r: Функция для вычисления правых веток
+
+    Returns:
+        array('q') или список значений всех узлов
+    """
+    start = len(values) // 2
+    for _ in range(levels - (len(values) + 1).bit_length() + 1):
+        level = [f(x) for x in values[start:] for f in (l_l, l_r)]
+        start = len(values)
+        try:
+            values.extend(level)
+        except (OverflowError, TypeError):
+            values = list(values[:start]) + level
+    return values
+
+
+class ArrayTree:
+    """Бинарное дерево в виде плоского массива значений узлов в порядке кучи.
+
+    Узел с индексом i имеет детей 2i+1 и 2i+2 и родителя (i-1)//2, поэтому
+    переход к потомку - это арифметика над индексом, а не словари и списки
+    на каждый узел. Словарь в формате gen_bin_tree строится только по
+    явному вызову to_dict.
+
+    Args:
+        values: Значения узлов в порядке кучи (array('q') или список)
+        height: Число уровней дерева
+    """
+
+    def __init__(self, values, height: int):
+        self.values = values
+        self.height = height
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i: int):
+        return self.values[i]
+
+    def left(self, i: int):
+        """Индекс левого потомка узла i или None для листа."""
+        child = 2 * i + 1
+        return child if child < len(self.values) else None
+
+    def right(self, i: int):
+        """Индекс правого потомка узла i или None для листа."""
+        child = 2 * i + 2
+        return child if child < len(self.values) else None
+
+    def parent(self, i: int):
+        """Индекс родителя узла i или None для корня."""
+        return (i - 1) // 2 if i > 0 else None
+
+    def level(self, k: int):
+        """Значения узлов уровня k (корень - уровень 0) слева направо."""
+        if not 0 <= k < self.height:
+            raise IndexError("нет такого уровня")
+        return self.values[2 ** k - 1:2 ** (k + 1) - 1]
+
+    def to_dict(self) -> dict:
+        """Преобразует дерево в словари того же вида, что возвращает gen_bin_tree.
+
+        Словари связываются снизу вверх без рекурсии, поэтому глубина
+        дерева не ограничена стеком вызовов.
+        """
+        return _link([str(x) for x in self.values])
+
+
+def _link(keys: list) -> dict:
+    """Связывает словари узлов с ключами keys (в порядке кучи) и возвращает корень."""
+    nodes = [{key: []} for key in keys]
+    for i in range(len(nodes) // 2):
+        nodes[i][keys[i]] += [nodes[2 * i + 1], nodes[2 * i + 2]]
+    return nodes[0]
+
+
+def gen_bin_tree_array(height: int, root: int, l_l=left_leaf, l_r=right_leaf) -> ArrayTree:
+    """Генерирует бинарное дерево в компактном виде без словарей на узлы.
+
+    Дерево совпадает с gen_bin_tree(height, root, l_l, l_r): то же число
+    уровней и те же значения, а gen_bin_tree_array(...).to_dict() равен
+    результату gen_bin_tree.
+
+    Args:
+        height: Высота дерева
+        root: целое число
+        l_l: Функция для вычисления левых веток
+        l_r: Функция для вычисления правых веток
+
+    Returns:
+        ArrayTree со значениями всех узлов
+    """
+    levels = max(height, 1)
+    try:
+        values = array('q', [root])
+    except (OverflowError, TypeError):
+        values = [root]
+    return ArrayTree(_grow_levels(values, levels, l_l, l_r), levels)
+
+
+class _LazyContext:
+    """Общие для всех узлов ленивого дерева функции веток и счётчик запомненных узлов."""
+
+    __slots__ = ("l_l", "l_r", "memo_limit", "memo_size")
+
+    def __init__(self, l_l, l_r, memo_limit):
+        self.l_l = l_l
+        self.l_r = l_r
+        self.memo_limit = memo_limit
+        self.memo_size = 0
+
+
+class LazyNode:
+    """Узел бинарного дерева, дети которого вычисляются при первом обращении.
+
+    Дерево того же вида, что gen_bin_tree, но узлы создаются только когда
+    до них доходят: проход по одному пути дерева высоты 1000 создаёт около
+    2000 узлов, а не 2**1000. Вычисленные дети запоминаются в узле, пока
+    число запомнивших детей узлов не достигло memo_limit; дальше дети
+    вычисляются заново при каждом обращении, и память не растёт.
+
+    Args:
+        value: значение узла
+        height: Высота поддерева с корнем в этом узле
+        context: общие параметры дерева (см. gen_bin_tree_lazy)
+    """
+
+    __slots__ = ("value", "height", "_context", "_children")
+
+    def __init__(self, value, height: int, context: _LazyContext):
+        self.value = value
+        self.height = height
+        self._context = context
+        self._children = None
+
+    @property
+    def children(self) -> tuple:
+        """Пара (левый, правый) потомков или пустой кортеж для листа."""
+        if self._children is not None:
+            return self._children
+        if self.height <= 1:
+            return ()
+        context = self._context
+        children = (LazyNode(context.l_l(self.value), self.height - 1, context),
+                    LazyNode(context.l_r(self.value), self.height - 1, context))
+        if context.memo_limit is None or context.memo_size < context.memo_limit:
+            context.memo_size += 1
+            self._children = children
+        return children
+
+    @property
+    def left(self):
+        """Левый потомок или None для листа."""
+        children = self.children
+        return children[0] if children else None
+
+    @property
+    def right(self):
+        """Правый потомок или None для листа."""
+        children = self.children
+        return children[1] if children else None
+
+    def dfs(self, max_depth: int = None):
+        """Обходит поддерево в глубину (узел, затем левое и правое поддеревья).
+
+        Args:
+            max_depth: Не спускаться глубже этого уровня (корень - уровень 0)
+
+        Returns:
+            Генератор узлов; дети вычисляются по мере обхода
+        """
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node
+            if max_depth is None or depth < max_depth:
+                stack.extend((child, depth + 1) for child in reversed(node.children))
+
+    def bfs(self, max_depth: int = None):
+        """Обходит поддерево в ширину, уровень за уровнем слева направо.
+
+        Args:
+            max_depth: Не спускаться глубже этого уровня (корень - уровень 0)
+
+        Returns:
+            Генератор узлов; дети вычисляются по мере обхода
+        """
+        queue = deque([(self, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            yield node
+            if max_depth is None or depth < max_depth:
+                queue.extend((child, depth + 1) for child in node.children)
+
+    def to_dict(self) -> dict:
+        """Строит всё поддерево в виде словарей, как gen_bin_tree, без рекурсии."""
+        result = {str(self.value): []}
+        stack = [(self, result[str(self.value)])]
+        while stack:
+            node, children = stack.pop()
+            for child in node.children:
+                key = str(child.value)
+                child_dict = {key: []}
+                children.append(child_dict)
+                stack.append((child, child_dict[key]))
+        return result
+
+
+def gen_bin_tree_lazy(height: int, root: int, l_l=left_leaf, l_r=right_leaf, memo_limit: int = None) -> LazyNode:
+    """Создаёт корень ленивого бинарного дерева.
+
+    Узлы, их значения и ключи совпадают с gen_bin_tree(height, root, l_l, l_r),
+    но вычисляются только при обращении к потомкам (см. LazyNode).
+
+    Args:
+        height: Высота дерева
+        root: целое число
+        l_l: Функция для вычисления левых веток
+        l_r: Функция для вычисления правых веток
+        memo_limit: Сколько узлов могут запомнить своих детей; None - без ограничения
+
+    Returns:
+        Корневой узел LazyNode
+    """
+    if height <= 1:
+        height = 1
+    if memo_limit is not None and memo_limit < 0:
+        raise ValueError("memo_limit не может быть < 0")
+    return LazyNode(root, height, _LazyContext(l_l, l_r, memo_limit))
+
+
+def _make_pool(executor: str, max_workers: int, l_l, l_r):
+    """Создаёт пул для gen_bin_tree_parallel.
+
+    "auto" выбирает процессы, если функции веток можно передать в другой
+    процесс через pickle (функции модуля - можно, лямбды - нет), иначе потоки.
+    """
+    if executor == "auto":
+        try:
+            pickle.dumps((l_l, l_r))
+            executor = "process"
+        except (pickle.PicklingError, AttributeError, TypeError):
+            executor = "thread"
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _subtree_keys(height: int, root: int, l_l, l_r) -> list:
+    """Ключи всех узлов поддерева в порядке кучи - задача пула gen_bin_tree_parallel."""
+    return [str(x) for x in gen_bin_tree_array(height, root, l_l, l_r).values]
+
+
+def gen_bin_tree_parallel(height: int, root: int, l_l=left_leaf, l_r=right_leaf, split_depth: int = 2,
+                          executor: str = "auto", max_workers: int = None):
+    """Генерирует то же дерево, что gen_bin_tree, строя поддеревья параллельно.
+
+    Поддеревья ниже уровня split_depth не зависят друг от друга: верхние
+    уровни считаются в текущем процессе, а для 2**split_depth поддеревьев
+    пул вычисляет значения узлов и их строки-ключи. Из пула возвращаются
+    только списки строк (pickle словарей дороже, чем их построение), а
+    словари связываются здесь же, пока пул считает следующие поддеревья.
+    Так параллельно идут вычисление функций и str(), а последовательно -
+    только создание словарей. Потоки ускоряют построение, только если
+    функции веток отпускают GIL.
+
+    Args:
+        height: Высота дерева
+        root: целое число
+        l_l: Функция для вычисления левых веток
+        l_r: Функция для вычисления правых веток
+        split_depth: Уровень, на котором дерево делится на задачи
+        executor: "process", "thread" или "auto" (см. _make_pool)
+        max_workers: Размер пула; по умолчанию как у concurrent.futures
+
+    Returns:
+        Словарь того же вида, что возвращает gen_bin_tree
+    """
+    if executor not in ("auto", "process", "thread"):
+        raise ValueError("executor должен быть 'auto', 'process' или 'thread'")
+    if split_depth < 1 or height - split_depth < 2:
+        return gen_bin_tree(height, root, l_l, l_r)
+    values = gen_bin_tree_array(split_depth + 1, root, l_l, l_r).values
+    top = 2 ** split_depth - 1
+    with _make_pool(executor, max_workers, l_l, l_r) as pool:
+        parts = pool.map(_subtree_keys, repeat(height - split_depth), values[top:], repeat(l_l), repeat(l_r))
+        subtrees = [_link(keys) for keys in parts]
+    keys = [str(x) for x in values[:top]]
+    nodes = [{key: []} for key in keys] + subtrees
+    for i in range(top):
+        nodes[i][keys[i]] += [nodes[2 * i + 1], nodes[2 * i + 2]]
+    return nodes[0]
+
+
 def main():
     """Генерирует и выводит бинарное дерево"""
     print(gen_bin_tree(3, 11))
@@ -1,5 +1,6 @@
 import unittest
-from main import gen_bin_tree
+from array import array
+from main import gen_bin_tree, gen_bin_tree_array, gen_bin_tree_lazy, gen_bin_tree_parallel
 
 
 class Test_bin_tree(unittest.TestCase):
@@ -59,6 +60,111 @@ class Test_bin_tree(unittest.TestCase):
             gen_bin_tree(4, 11, 3, 4)
 
 
+    def test_array_to_dict(self):
+        """
+        проверка что компактное дерево после to_dict совпадает с gen_bin_tree.
+
+        Ожидаемый результат: одинаковые словари для разных высот и функций веток.
+        """
+        for height in range(0, 6):
+            with self.subTest(height=height):
+                self.assertEqual(gen_bin_tree_array(height, 11).to_dict(), gen_bin_tree(height, 11))
+                self.assertEqual(gen_bin_tree_array(height, 1, lambda x: x + 1, lambda x: x + 2).to_dict(),
+                                 gen_bin_tree(height, 1, lambda x: x + 1, lambda x: x + 2))
+
+    def test_array_navigation(self):
+        """
+        проверка переходов к потомкам и родителю по индексам.
+
+        Ожидаемый результат: дети узла i лежат на позициях 2i+1 и 2i+2, у листьев детей нет.
+        """
+        tree = gen_bin_tree_array(3, 11)
+        self.assertEqual(len(tree), 7)
+        self.assertEqual((tree[tree.left(0)], tree[tree.right(0)]), (121, 123))
+        self.assertEqual(tree[tree.right(tree.left(0))], 14643)
+        self.assertEqual(tree.parent(tree.right(2)), 2)
+        self.assertIsNone(tree.parent(0))
+        self.assertIsNone(tree.left(6))
+        self.assertEqual(list(tree.level(2)), [14641, 14643, 15129, 15131])
+        with self.assertRaises(IndexError):
+            tree.level(3)
+
+    def test_array_storage(self):
+        """
+        проверка хранения значений: array('q'), пока значения помещаются в int64, иначе список.
+
+        Ожидаемый результат: большие числа не теряются при переходе к списку.
+        """
+        self.assertIsInstance(gen_bin_tree_array(4, 8).values, array)
+        tree = gen_bin_tree_array(7, 8)
+        self.assertIsInstance(tree.values, list)
+        self.assertEqual(tree[-1], gen_bin_tree_array(6, 8)[-1] ** 2 + 2)
+        with self.assertRaises(TypeError):
+            gen_bin_tree_array(4, '11')
+
+    def test_lazy_to_dict(self):
+        """
+        проверка что ленивое дерево после полного построения совпадает с gen_bin_tree.
+
+        Ожидаемый результат: одинаковые словари для разных высот.
+        """
+        for height in range(0, 6):
+            with self.subTest(height=height):
+                self.assertEqual(gen_bin_tree_lazy(height, 11).to_dict(), gen_bin_tree(height, 11))
+        with self.assertRaises(TypeError):
+            gen_bin_tree_lazy('4', 11)
+
+    def test_lazy_traversal(self):
+        """
+        проверка обхода в глубину и в ширину и вычисления только посещённых узлов.
+
+        Ожидаемый результат: порядок узлов как в словаре gen_bin_tree, проход по одному
+        пути очень высокого дерева создаёт узлы только на этом пути.
+        """
+        tree = gen_bin_tree_lazy(3, 11)
+        self.assertEqual([node.value for node in tree.dfs()], [11, 121, 14641, 14643, 123, 15129, 15131])
+        self.assertEqual([node.value for node in tree.bfs()], [11, 121, 123, 14641, 14643, 15129, 15131])
+        self.assertEqual([node.value for node in tree.bfs(max_depth=1)], [11, 121, 123])
+
+        node = gen_bin_tree_lazy(10000, 0, lambda x: x + 1, lambda x: x - 1)
+        while node.children:
+            node = node.left
+        self.assertEqual(node.value, 9999)
+
+    def test_lazy_memo_limit(self):
+        """
+        проверка ограничения числа узлов, запоминающих своих детей.
+
+        Ожидаемый результат: после исчерпания лимита дети вычисляются заново при каждом обращении.
+        """
+        calls = []
+
+        def left(x):
+            calls.append(x)
+            return x + 1
+
+        tree = gen_bin_tree_lazy(4, 0, left, lambda x: x + 2, memo_limit=1)
+        self.assertIs(tree.left, tree.left)
+        child = tree.left
+        self.assertIsNot(child.left, child.left)
+        self.assertEqual(child.left.value, 2)
+        self.assertEqual(len(calls), 4)
+
+    def test_parallel(self):
+        """
+        проверка параллельного построения в процессах и в потоках.
+
+        Ожидаемый результат: то же дерево, что строит gen_bin_tree, при любом уровне разбиения.
+        """
+        for split_depth in range(0, 5):
+            with self.subTest(split_depth=split_depth):
+                self.assertEqual(gen_bin_tree_parallel(6, 2, split_depth=split_depth, executor="process"),
+                                 gen_bin_tree(6, 2))
+                self.assertEqual(gen_bin_tree_parallel(6, 1, lambda x: x + 1, lambda x: x * 2, split_depth=split_depth),
+                                 gen_bin_tree(6, 1, lambda x: x + 1, lambda x: x * 2))
+        with self.assertRaises(ValueError):
+            gen_bin_tree_parallel(6, 2, executor="gpu")
+
 if __name__ == '__main__':
     # Запуск всех тестовых случаев, определенных в классе Test_bin_tree
     unittest.main()
\ No newline at end of file
@@ -1,4 +1,14 @@
-from queue import Queue
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
 
 
 def bin_tree_No_recursion(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2):
@@ -17,31 +27,481 @@ def bin_tree_No_recursion(height: int, root: int, l_b=lambda x: x ** 2, r_b=lamb
         dict: Словарь, представляющий бинарное дерево в формате:
               {root_value: [left_subtree, right_subtree]}
     """
-    arr = [[{str(root): []}, root]]
+    arr = [[{_decimal(root): []}, root]]
     if height < 1:
-        return {str(root): []}
+        return {_decimal(root): []}
     height += 1
     bin_di = {}
     k = 0
     while height != 1:
         old_le = len(arr)
         for i in range(k, len(arr)):
-            s = str(arr[i][1])
-            arr += [[{str(l_b(arr[i][1])): []}, l_b(arr[i][1])]]
-            arr.append([{str(r_b(arr[i][1])): []}, r_b(arr[i][1])])
+            arr += [[{_decimal(l_b(arr[i][1])): []}, l_b(arr[i][1])]]
+            arr.append([{_decimal(r_b(arr[i][1])): []}, r_b(arr[i][1])])
 
         height -= 1
         k = old_le
     for i in range(len(arr) // 2):
-        arr[i][0][str(arr[i][1])].append(arr[i * 2 + 1][0])
-        arr[i][0][str(arr[i][1])].append(arr[i * 2 + 2][0])
+        arr[i][0][_decimal(arr[i][1])].append(arr[i * 2 + 1][0])
+        arr[i][0][_decimal(arr[i][1])].append(arr[i * 2 + 2][0])
     return arr[0][0]
 
 
-def bin_tree_bfs(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2):
+def bin_tree_bfs(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2,
+                 modulus: int = None, max_bits: int = None):
+    """
+    Создает бинарное дерево заданной высоты обходом в ширину.
+    Узлы обрабатываются уровень за уровнем: каждый следующий уровень
+    вычисляется целиком по предыдущему (см. _build_levels), если функции
+    поддерживают массивы numpy - одной операцией на весь уровень.
+    Словари строятся один раз в конце, ключи переводятся в строки
+    только при этом.
+
+    Args:
+        height (int): Высота генерируемого бинарного дерева
+        root (int): Значение корневого узла дерева
+        l_b (callable, optional): Функция для вычисления левого потомка.
+                                 По умолчанию x**2.
+        r_b (callable, optional): Функция для вычисления правого потомка.
+                                 По умолчанию x**2 + 2.
+        modulus (int, optional): Считать значения по модулю modulus (см. bin_tree_array).
+        max_bits (int, optional): Наибольшая допустимая длина значений в битах (см. bin_tree_array).
+
+    Returns:
+        dict: Словарь, представляющий бинарное дерево в формате:
+              {root_value: [left_subtree, right_subtree]}
+    """
+    return bin_tree_array(height, root, l_b, r_b, modulus, max_bits).to_dict()
+
+
+_SPLIT_DIGITS = 1000
+
+
+@lru_cache(maxsize=64)
+def _power_of_ten(n: int) -> int:
+    return 10 ** n
+
+
+def _decimal(x) -> str:
+    """
+    Десятичная запись значения для ключа словаря.
+
+    str() целого Python с версии 3.11 отказывается переводить числа длиннее
+    4300 цифр, а со стандартными функциями столько цифр появляется уже на
+    высоте 13. Большие целые переводятся через gmpy2, если он установлен,
+    иначе делением пополам на степень 10, пока куски не станут короткими.
+    Остальные значения (в том числе gmpy2.mpz) переводятся str().
+    """
+    if type(x) is not int or x.bit_length() < 3 * _SPLIT_DIGITS:
+        return str(x)
+    if gmpy2 is not None:
+        return gmpy2.mpz(x).digits()
+    if x < 0:
+        return "-" + _decimal(-x)
+    half = int(x.bit_length() * 0.30103) // 2
+    high, low = divmod(x, _power_of_ten(half))
+    return _decimal(high) + _decimal(low).zfill(half)
+
+
+def _lift(values: list, l_b, r_b) -> list:
+    """
+    Переводит целые уровня в gmpy2.mpz, если gmpy2 установлен.
+
+    Умножение больших чисел в GMP намного быстрее, чем в int Python. Перевод
+    делается, только если на первом значении обе функции принимают mpz,
+    возвращают mpz и дают то же число, что и для int (например, x / 2 дал
+    бы mpfr вместо float).
+    """
+    if gmpy2 is None or not values or type(values[0]) is not int:
+        return values
+    x = values[0]
+    big = gmpy2.mpz(x)
+    for f in (l_b, r_b):
+        try:
+            result = f(big)
+        except (TypeError, ValueError, ArithmeticError):
+            return values
+        if type(result) is not type(big) or result != f(x):
+            return values
+    return [gmpy2.mpz(v) if type(v) is int else v for v in values]
+
+
+def _check_bits(level, max_bits: int, depth: int) -> None:
+    """Бросает OverflowError, если значение уровня depth длиннее max_bits бит."""
+    if isinstance(level, np.ndarray):
+        biggest = int(np.abs(level).max()).bit_length() if len(level) else 0
+    else:
+        biggest = max((x.bit_length() for x in level if hasattr(x, "bit_length")), default=0)
+    if biggest > max_bits:
+        raise OverflowError(f"значение на уровне {depth} занимает {biggest} бит, больше max_bits={max_bits}")
+
+
+def _as_level(values: list):
+    """
+    Возвращает уровень как массив numpy int64, если все значения - целые в
+    пределах int64, иначе оставляет список (большие целые, дроби и т.д.).
+    """
+    level = np.array(values)
+    return level if level.dtype == np.int64 else values
+
+
+def _vector_level(prev: np.ndarray, l_b, r_b):
+    """
+    Вычисляет следующий уровень целиком операциями numpy.
+
+    Функции вызываются один раз на весь уровень. Чтобы не получить
+    молчаливое переполнение int64, те же функции считаются и в float64:
+    если хотя бы одно значение выходит за 2**62 или любой элемент
+    результата int64 расходится с float64 больше, чем на ошибку округления
+    (переполнение в промежуточном вычислении), возвращается None.
+    None возвращается и для функций, которые не работают с массивами или
+    дают на массиве не то же, что поэлементно.
+
+    Args:
+        prev (np.ndarray): Значения предыдущего уровня (int64)
+        l_b (callable): Функция для вычисления левого потомка.
+        r_b (callable): Функция для вычисления правого потомка.
+
+    Returns:
+        np.ndarray | None: Значения уровня: l_b(x), r_b(x) для каждого x по порядку
+    """
+    try:
+        with np.errstate(all="ignore"):
+            results = (l_b(prev), r_b(prev))
+            bounds = (l_b(prev.astype(float)), r_b(prev.astype(float)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    for result, bound in zip(results, bounds):
+        if not isinstance(result, np.ndarray) or result.dtype != np.int64 or result.shape != prev.shape:
+            return None
+        if not np.all(np.abs(bound) < 2.0 ** 62):
+            return None
+        # промежуточное переполнение в любом элементе дает расхождение с float64
+        if not np.allclose(result, bound, rtol=1e-9, atol=0.5):
+            return None
+    for i in {0, len(prev) - 1}:
+        x = int(prev[i])
+        if l_b(x) != results[0][i] or r_b(x) != results[1][i]:
+            return None
+    level = np.empty(2 * len(prev), dtype=np.int64)
+    level[0::2], level[1::2] = results
+    return level
+
+
+def _next_level(prev, l_b, r_b, modulus: int = None):
+    """
+    Следующий уровень: numpy, если получается (см. _vector_level), иначе поэлементно.
+
+    Если задан modulus, значения берутся по модулю после вычисления функций:
+    проверка переполнения в _vector_level видит значения до взятия остатка.
+    Целые, вышедшие за int64, считаются дальше в gmpy2.mpz (см. _lift).
+    """
+    if isinstance(prev, np.ndarray):
+        level = _vector_level(prev, l_b, r_b)
+        if level is not None:
+            return level if modulus is None else level % modulus
+        prev = prev.tolist()
+    prev = _lift(prev, l_b, r_b)
+    if modulus is None:
+        return _as_level([f(x) for x in prev for f in (l_b, r_b)])
+    return _as_level([f(x) % modulus for x in prev for f in (l_b, r_b)])
+
+
+def _build_levels(root, levels: int, l_b, r_b, modulus: int = None, max_bits: int = None):
+    """
+    Строит значения дерева уровень за уровнем, без очереди и без str/int на узел.
+
+    Args:
+        root: Значение корневого узла дерева
+        levels (int): Число уровней
+        l_b (callable): Функция для вычисления левого потомка.
+        r_b (callable): Функция для вычисления правого потомка.
+        modulus (int, optional): Модуль, по которому берутся значения.
+        max_bits (int, optional): Наибольшая допустимая длина значений в битах.
+
+    Returns:
+        np.ndarray | list: Значения всех узлов в порядке кучи: дети узла i
+        лежат на позициях 2i+1 и 2i+2. Массив int64, если все значения в
+        него помещаются, иначе список.
+    """
+    if modulus is not None and (type(modulus) is not int or modulus < 1):
+        raise ValueError("modulus должен быть натуральным числом")
+    level = _as_level([root if modulus is None else root % modulus])
+    built = [level]
+    for depth in range(1, levels):
+        level = _next_level(level, l_b, r_b, modulus)
+        if max_bits is not None:
+            _check_bits(level, max_bits, depth)
+        built.append(level)
+    if all(isinstance(part, np.ndarray) for part in built):
+        return np.concatenate(built)
+    return [x for part in built for x in (part.tolist() if isinstance(part, np.ndarray) else part)]
+
+
+class ArrayTree:
+    """
+    Бинарное дерево в виде плоского массива значений узлов в порядке кучи.
+
+    Узел с индексом i имеет детей 2i+1 и 2i+2 и родителя (i-1)//2, поэтому
+    переход к потомку - это арифметика над индексом, а не словари и списки
+    на каждый узел. Словарь в формате bin_tree_bfs строится только по
+    явному вызову to_dict.
+
+    Args:
+        values (np.ndarray | list): Значения узлов в порядке кучи
+        height (int): Высота дерева (число уровней минус один)
+    """
+
+    def __init__(self, values, height: int):
+        self.values = values
+        self.height = height
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i: int):
+        value = self.values[i]
+        if isinstance(value, np.generic):
+            return value.item()
+        return int(value) if gmpy2 is not None and type(value) is type(gmpy2.mpz()) else value
+
+    def left(self, i: int):
+        """Индекс левого потомка узла i или None для листа."""
+        child = 2 * i + 1
+        return child if child < len(self.values) else None
+
+    def right(self, i: int):
+        """Индекс правого потомка узла i или None для листа."""
+        child = 2 * i + 2
+        return child if child < len(self.values) else None
+
+    def parent(self, i: int):
+        """Индекс родителя узла i или None для корня."""
+        return (i - 1) // 2 if i > 0 else None
+
+    def level(self, k: int):
+        """Значения узлов уровня k (корень - уровень 0) слева направо."""
+        if not 0 <= k <= self.height:
+            raise IndexError("нет такого уровня")
+        return self.values[2 ** k - 1:2 ** (k + 1) - 1]
+
+    def to_dict(self) -> dict:
+        """
+        Преобразует дерево в словари того же вида, что возвращает bin_tree_bfs.
+
+        Словари связываются снизу вверх, как в bin_tree_No_recursion.
+        """
+        return _link(self.keys())
+
+    def keys(self) -> list:
+        """Ключи словарей (десятичные строки значений) в порядке кучи."""
+        values = self.values.tolist() if isinstance(self.values, np.ndarray) else self.values
+        return [_decimal(x) for x in values]
+
+
+def _link(keys: list) -> dict:
+    """Связывает словари узлов с ключами keys (в порядке кучи) снизу вверх и возвращает корень."""
+    nodes = [{key: []} for key in keys]
+    for i in range(len(nodes) // 2):
+        nodes[i][keys[i]] += [nodes[2 * i + 1], nodes[2 * i + 2]]
+    return nodes[0]
+
+
+def bin_tree_array(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2,
+                   modulus: int = None, max_bits: int = None) -> ArrayTree:
+    """
+    Генерирует бинарное дерево в компактном виде без словарей на узлы.
+
+    Дерево совпадает с bin_tree_No_recursion(height, root, l_b, r_b):
+    bin_tree_array(...).to_dict() равен его результату.
+
+    Со стандартными функциями число цифр значений удваивается на каждом
+    уровне, и точные значения глубокого дерева не помещаются в память.
+    Для таких деревьев есть два режима:
+    modulus - значения считаются по модулю (остаток корня, остатки
+    потомков); для функций-многочленов с целыми коэффициентами, как
+    x**2 и x**2 + 2, это остатки точных значений, а при modulus < 2**31
+    все уровни считаются в numpy int64;
+    max_bits - значения точные, но построение останавливается с
+    OverflowError, как только значение длиннее max_bits бит.
+
+    Args:
+        height (int): Высота генерируемого бинарного дерева
+        root (int): Значение корневого узла дерева
+        l_b (callable, optional): Функция для вычисления левого потомка.
+                                 По умолчанию x**2.
+        r_b (callable, optional): Функция для вычисления правого потомка.
+                                 По умолчанию x**2 + 2.
+        modulus (int, optional): Модуль, по которому берутся значения. По умолчанию точные значения.
+        max_bits (int, optional): Наибольшая допустимая длина значений в битах. По умолчанию без ограничения.
+
+    Returns:
+        ArrayTree: Значения всех узлов в порядке кучи
+    """
+    height = max(height, 0)
+    return ArrayTree(_build_levels(root, height + 1, l_b, r_b, modulus, max_bits), height)
+
+
+class TreeDag:
+    """
+    Бинарное дерево, в котором одинаковые поддеревья хранятся один раз.
+
+    Потомки узла зависят только от его значения, поэтому поддерево
+    определяется парой (значение, оставшаяся высота). Узлы с одинаковой
+    парой склеиваются в один (hash-consing), и дерево становится
+    ориентированным ациклическим графом: память и число вызовов l_b/r_b
+    растут с числом различных значений на уровнях, а не с 2**height.
+    Например, для x + 1 и x + 2 на уровне d всего d + 1 различных значений.
+
+    Ключ узла - кортеж (значение, оставшаяся высота, тип значения);
+    тип нужен, чтобы 2 и 2.0 с разными ключами словаря не склеивались.
+
+    Args:
+        height (int): Высота дерева
+        root: Значение корневого узла дерева
+        l_b (callable): Функция для вычисления левого потомка.
+        r_b (callable): Функция для вычисления правого потомка.
+    """
+
+    def __init__(self, height: int, root, l_b, r_b):
+        self.height = height
+        self.root = (root, height, type(root))
+        self.nodes = {}
+        self.levels = [[self.root]]
+        for remaining in range(height, 0, -1):
+            next_level = {}
+            for key in self.levels[-1]:
+                value = key[0]
+                children = tuple((child, remaining - 1, type(child)) for child in (l_b(value), r_b(value)))
+                self.nodes[key] = children
+                next_level.update(dict.fromkeys(children))
+            self.levels.append(list(next_level))
+        for key in self.levels[-1]:
+            self.nodes[key] = ()
+
+    def __len__(self):
+        """Число различных узлов."""
+        return len(self.nodes)
+
+    @property
+    def size(self) -> int:
+        """Число узлов в развёрнутом дереве."""
+        return 2 ** (self.height + 1) - 1
+
+    def children(self, key: tuple) -> tuple:
+        """Ключи (левый, правый) потомков узла key или пустой кортеж для листа."""
+        return self.nodes[key]
+
+    def to_dict(self, shared: bool = False) -> dict:
+        """
+        Разворачивает дерево в словари того же вида, что bin_tree_bfs.
+
+        Args:
+            shared (bool, optional): Если True, одинаковые поддеревья - это
+                                     один и тот же объект словаря: результат
+                                     равен полному дереву, но занимает память
+                                     по числу различных узлов. Такой результат
+                                     нельзя изменять. По умолчанию False -
+                                     каждый узел получает свой словарь.
+
+        Returns:
+            dict: {root_value: [left_subtree, right_subtree]}
+        """
+        names = {}
+        if shared:
+            built = {}
+            for level in reversed(self.levels):
+                for key in level:
+                    name = names.setdefault(key, _decimal(key[0]))
+                    built[key] = {name: [built[child] for child in self.nodes[key]]}
+            return built[self.root]
+        name = names.setdefault(self.root, _decimal(self.root[0]))
+        result = {name: []}
+        stack = [(self.root, result[name])]
+        while stack:
+            key, children = stack.pop()
+            for child in self.nodes[key]:
+                name = names.get(child)
+                if name is None:
+                    name = names[child] = _decimal(child[0])
+                child_dict = {name: []}
+                children.append(child_dict)
+                stack.append((child, child_dict[name]))
+        return result
+
+
+def bin_tree_dag(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x ** 2 + 2) -> TreeDag:
+    """
+    Генерирует бинарное дерево со склеенными одинаковыми поддеревьями.
+
+    TreeDag(...).to_dict() равен результату bin_tree_bfs(height, root, l_b, r_b).
+
+    Args:
+        height (int): Высота генерируемого бинарного дерева
+        root (int): Значение корневого узла дерева
+        l_b (callable, optional): Функция для вычисления левого потомка.
+                                 По умолчанию x**2.
+        r_b (callable, optional): Функция для вычисления правого потомка.
+                                 По умолчанию x**2 + 2.
+
+    Returns:
+        TreeDag: Дерево в виде графа различных поддеревьев
     """
-    Создает бинарное дерево заданной высоты, используя алгоритм поиска в ширину.
-    Узлы обрабатываются уровень за уровнем с помощью очереди.
+    return TreeDag(max(height, 0), root, l_b, r_b)
+
+
+def left_leaf(x: int) -> int:
+    """
+    Левый потомок по умолчанию для bin_tree_parallel: x**2.
+
+    Функция модуля, в отличие от лямбды, передается в процессы через pickle.
+    """
+    return x ** 2
+
+
+def right_leaf(x: int) -> int:
+    """Правый потомок по умолчанию для bin_tree_parallel: x**2 + 2."""
+    return x ** 2 + 2
+
+
+def _make_pool(executor: str, max_workers: int, l_b, r_b):
+    """
+    Создает пул для bin_tree_parallel.
+
+    "auto" выбирает процессы, если функции веток можно передать в другой
+    процесс через pickle (функции модуля - можно, лямбды - нет), иначе потоки.
+    """
+    if executor == "auto":
+        try:
+            pickle.dumps((l_b, r_b))
+            executor = "process"
+        except (pickle.PicklingError, AttributeError, TypeError):
+            executor = "thread"
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _subtree_keys(height: int, root, l_b, r_b, modulus: int, max_bits: int) -> list:
+    """Ключи всех узлов поддерева в порядке кучи - задача пула bin_tree_parallel."""
+    return bin_tree_array(height, root, l_b, r_b, modulus, max_bits).keys()
+
+
+def bin_tree_parallel(height: int, root: int, l_b=left_leaf, r_b=right_leaf, split_depth: int = 2,
+                      executor: str = "auto", max_workers: int = None, modulus: int = None, max_bits: int = None):
+    """
+    Генерирует то же дерево, что bin_tree_bfs, строя поддеревья параллельно.
+
+    Поддеревья ниже уровня split_depth не зависят друг от друга: верхние
+    уровни считаются в текущем процессе, а для 2**split_depth поддеревьев
+    пул вычисляет значения узлов (bin_tree_array) и их строки-ключи.
+    Из пула возвращаются только списки строк - pickle вложенных словарей
+    дороже, чем их построение, - а словари связываются здесь же, пока пул
+    считает следующие поддеревья. Последовательным остается только создание
+    словарей, поэтому ускорение близко к числу ядер, когда время уходит на
+    функции веток и перевод больших чисел в строки. Потоки ускоряют
+    построение, только если функции веток отпускают GIL (например, numpy
+    на уровнях int64).
 
     Args:
         height (int): Высота генерируемого бинарного дерева
@@ -50,23 +510,32 @@ def bin_tree_bfs(height: int, root: int, l_b=lambda x: x ** 2, r_b=lambda x: x *
                                  По умолчанию x**2.
         r_b (callable, optional): Функция для вычисления правого потомка.
                                  По умолчанию x**2 + 2.
+        split_depth (int, optional): Уровень, на котором дерево делится на задачи.
+        executor (str, optional): "process", "thread" или "auto" (см. _make_pool).
+        max_workers (int, optional): Размер пула; по умолчанию как у concurrent.futures.
+        modulus (int, optional): Считать значения по модулю modulus (см. bin_tree_array).
+        max_bits (int, optional): Наибольшая допустимая длина значений в битах (см. bin_tree_array).
 
     Returns:
         dict: Словарь, представляющий бинарное дерево в формате:
               {root_value: [left_subtree, right_subtree]}
     """
-    queue = Queue()
-    di = {str(root): []}
-    queue.put(di)
-    for i in range(2 ** height - 1):
-        current = queue.get()
-        for key in current:
-            l_di = {str(l_b(int(key))): []}
-            r_di = {str(r_b(int(key))): []}
-            current[key] += [l_di, r_di]
-            queue.put(l_di)
-            queue.put(r_di)
-    return di
+    if executor not in ("auto", "process", "thread"):
+        raise ValueError("executor должен быть 'auto', 'process' или 'thread'")
+    if split_depth < 1 or height - split_depth < 1:
+        return bin_tree_bfs(height, root, l_b, r_b, modulus, max_bits)
+    top_tree = bin_tree_array(split_depth, root, l_b, r_b, modulus, max_bits)
+    keys = top_tree.keys()
+    top = 2 ** split_depth - 1
+    roots = [top_tree[i] for i in range(top, len(top_tree))]
+    with _make_pool(executor, max_workers, l_b, r_b) as pool:
+        parts = pool.map(_subtree_keys, repeat(height - split_depth), roots, repeat(l_b), repeat(r_b),
+                         repeat(modulus), repeat(max_bits))
+        subtrees = [_link(part) for part in parts]
+    nodes = [{key: []} for key in keys[:top]] + subtrees
+    for i in range(top):
+        nodes[i][keys[i]] += [nodes[2 * i + 1], nodes[2 * i + 2]]
+    return nodes[0]
 
 
 def main():
@@ -1,6 +1,17 @@
+import sys
 import unittest
+from unittest.mock import patch
 from main import bin_tree_bfs
 from main import bin_tree_No_recursion
+from main import bin_tree_array
+from main import bin_tree_dag
+from main import bin_tree_parallel
+from main import _lift
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
 
 
 class TestBinTree(unittest.TestCase):
@@ -102,6 +113,163 @@ class TestBinTree(unittest.TestCase):
                   {'3': [{'4': [{'5': []}, {'6': []}]}, {'5': [{'6': []}, {'7': []}]}]}]})
 
 
+    def test_bin_tree_array(self):
+        """
+        Проверяет что компактное дерево после to_dict совпадает с bin_tree_bfs.
+
+        Тестирует разные высоты, включая нулевую, со стандартными и пользовательскими функциями.
+        """
+        for height in range(0, 5):
+            with self.subTest(height=height):
+                self.assertEqual(bin_tree_array(height, 11).to_dict(), bin_tree_bfs(height, 11))
+                self.assertEqual(bin_tree_array(height, 1, lambda x: x + 1, lambda x: x + 2).to_dict(),
+                                 bin_tree_bfs(height, 1, lambda x: x + 1, lambda x: x + 2))
+
+    def test_bin_tree_array_navigation(self):
+        """
+        Проверяет доступ к потомкам по индексам 2i+1 и 2i+2 и к уровням дерева.
+
+        Большие значения стандартных функций хранятся без потерь.
+        """
+        tree = bin_tree_array(3, 11)
+        self.assertEqual(len(tree), 15)
+        self.assertEqual((tree[tree.left(0)], tree[tree.right(0)]), (121, 123))
+        self.assertEqual(list(tree.level(3))[:2], [214358881, 214358883])
+        self.assertEqual(tree.parent(14), 6)
+        self.assertIsNone(tree.right(7))
+        self.assertEqual(bin_tree_array(6, 11)[-1], bin_tree_array(5, 11)[-1] ** 2 + 2)
+
+    def test_bin_bfs_levels(self):
+        """
+        Проверяет что построение по уровням numpy и поэлементно дает одно и то же дерево.
+
+        Функция с ветвлением не работает с массивами и считается поэлементно,
+        x * 1000003 переполнила бы int64 и переходит на целые Python,
+        деление дает дробные ключи.
+        """
+        cases = [
+            (lambda x: x * 1000003, lambda x: x * 999983),
+            (lambda x: x + 1 if x % 2 else x - 1, lambda x: -x),
+            (lambda x: x / 2, lambda x: x - 1),
+        ]
+        for l_b, r_b in cases:
+            with self.subTest(l_b=l_b):
+                self.assertEqual(bin_tree_bfs(6, 11, l_b, r_b), bin_tree_No_recursion(6, 11, l_b, r_b))
+        self.assertEqual(bin_tree_bfs(1, 4, lambda x: x / 2, lambda x: x - 1), {'4': [{'2.0': []}, {'3': []}]})
+
+    def test_bin_tree_dag(self):
+        """
+        Проверяет что дерево со склеенными поддеревьями разворачивается в то же дерево, что bin_tree_bfs.
+
+        Для x+1 и x+2 значения на уровнях повторяются, и различных узлов
+        гораздо меньше, чем узлов в полном дереве.
+        """
+        for height in range(0, 6):
+            with self.subTest(height=height):
+                self.assertEqual(bin_tree_dag(height, 11).to_dict(), bin_tree_bfs(height, 11))
+                self.assertEqual(bin_tree_dag(height, 1, lambda x: x + 1, lambda x: x + 2).to_dict(shared=True),
+                                 bin_tree_bfs(height, 1, lambda x: x + 1, lambda x: x + 2))
+
+        dag = bin_tree_dag(40, 1, lambda x: x + 1, lambda x: x + 2)
+        self.assertEqual(len(dag), 41 * 42 // 2)
+        self.assertEqual(dag.size, 2 ** 41 - 1)
+        self.assertEqual(dag.children(dag.root), ((2, 39, int), (3, 39, int)))
+
+    def test_bin_tree_dag_sharing(self):
+        """
+        Проверяет что одинаковые поддеревья - один объект только при shared=True,
+        и что 2 и 2.0 не считаются одним узлом.
+        """
+        dag = bin_tree_dag(2, 0, lambda x: x, lambda x: x)
+        shared = dag.to_dict(shared=True)['0']
+        self.assertIs(shared[0], shared[1])
+        full = dag.to_dict()['0']
+        self.assertIsNot(full[0], full[1])
+        self.assertEqual(len(dag), 3)
+        self.assertEqual(bin_tree_dag(1, 2, lambda x: x * 1.0, lambda x: x).to_dict(), {'2': [{'2.0': []}, {'2': []}]})
+
+    def test_bin_big_values(self):
+        """
+        Проверяет ключи длиннее 4300 цифр, которые str() целого не переводит.
+
+        Левая ветка x**2 от 11 на высоте 13 дает число из 8531 цифры.
+        """
+        tree = bin_tree_bfs(13, 11, lambda x: x ** 2, lambda x: x % 7)
+        self.assertEqual(tree, bin_tree_No_recursion(13, 11, lambda x: x ** 2, lambda x: x % 7))
+        node = tree
+        for _ in range(13):
+            node = next(iter(node.values()))[0]
+        key = next(iter(node))
+        limit = sys.get_int_max_str_digits()
+        sys.set_int_max_str_digits(0)
+        try:
+            self.assertEqual(key, str(11 ** 2 ** 13))
+        finally:
+            sys.set_int_max_str_digits(limit)
+
+    def test_bin_hidden_overflow(self):
+        """
+        Проверяет, что переполнение int64 внутри функции (x*x до взятия остатка) не дает неверных ключей.
+
+        Конечные значения помещаются в int64, но x*x в середине уровня уже нет.
+        """
+        l_b, r_b = lambda x: x * x % 10 ** 12, lambda x: (x % 2) * 10 ** 10
+        expected = bin_tree_No_recursion(3, 1, l_b, r_b)
+        self.assertEqual(bin_tree_bfs(3, 1, l_b, r_b), expected)
+        self.assertEqual(bin_tree_array(3, 1, l_b, r_b).to_dict(), expected)
+
+    @unittest.skipUnless(gmpy2, "gmpy2 не установлен")
+    def test_bin_gmpy2(self):
+        """
+        Проверяет, что значения за пределами int64 считаются в gmpy2.mpz и совпадают с вычислением в int.
+
+        Эталон строится с отключенным gmpy2; ArrayTree отдает значения как int.
+        """
+        with patch("main.gmpy2", None):
+            expected_tree = bin_tree_bfs(8, 11)
+            expected = bin_tree_array(8, 11)
+            expected_values = [expected[i] for i in range(len(expected))]
+        self.assertEqual(bin_tree_bfs(8, 11), expected_tree)
+        tree = bin_tree_array(8, 11)
+        self.assertIs(type(tree.values[-1]), type(gmpy2.mpz()))
+        values = [tree[i] for i in range(len(tree))]
+        self.assertEqual(values, expected_values)
+        self.assertTrue(all(type(v) is int for v in values))
+        self.assertIs(type(_lift([2 ** 70], lambda x: x ** 2, lambda x: x + 1)[0]), type(gmpy2.mpz()))
+        self.assertIs(type(_lift([2 ** 70], lambda x: x / 2, lambda x: x)[0]), int)
+
+    def test_bin_tree_array_modulus(self):
+        """
+        Проверяет режим modulus (остатки точных значений) и ограничение max_bits.
+        """
+        modulus = 10 ** 9 + 7
+        exact = bin_tree_array(6, 11)
+        reduced = bin_tree_array(6, 11, modulus=modulus)
+        self.assertEqual([reduced[i] for i in range(len(reduced))], [exact[i] % modulus for i in range(len(exact))])
+        self.assertEqual(bin_tree_bfs(2, 11, modulus=100), {'11': [{'21': [{'41': []}, {'43': []}]},
+                                                                   {'23': [{'29': []}, {'31': []}]}]})
+        self.assertEqual(len(bin_tree_array(20, 11, modulus=modulus)), 2 ** 21 - 1)
+        with self.assertRaises(OverflowError):
+            bin_tree_array(20, 11, max_bits=1000)
+        with self.assertRaises(ValueError):
+            bin_tree_array(3, 11, modulus=0)
+
+    def test_bin_tree_parallel(self):
+        """
+        Проверяет что параллельное построение в процессах и потоках дает то же дерево, что bin_tree_bfs.
+
+        Лямбды нельзя передать в процессы, поэтому для них executor="auto" выбирает потоки.
+        """
+        for split_depth in range(0, 5):
+            with self.subTest(split_depth=split_depth):
+                self.assertEqual(bin_tree_parallel(4, 11, split_depth=split_depth, executor="process"),
+                                 bin_tree_bfs(4, 11))
+                self.assertEqual(bin_tree_parallel(6, 1, lambda x: x + 1, lambda x: x * 2, split_depth=split_depth),
+                                 bin_tree_bfs(6, 1, lambda x: x + 1, lambda x: x * 2))
+        self.assertEqual(bin_tree_parallel(8, 11, executor="thread", modulus=97), bin_tree_bfs(8, 11, modulus=97))
+        with self.assertRaises(ValueError):
+            bin_tree_parallel(6, 11, executor="gpu")
+
 if __name__ == '__main__':
     """Запуск всех тестовых случаев, определенных в классе TestBinTree."""
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,6 @@
+# cython: language_level=3
+
+ctypedef double (*integrand_t)(double) noexcept nogil
+
+cdef double integrate_c(integrand_t f, double a, double b, long n_iter) noexcept nogil
+cdef double integrate_c_parallel(integrand_t f, double a, double b, long n_iter, int n_jobs) noexcept nogil
@@ -1,17 +1,111 @@
 # cython: language_level=3
 # distutils: language=c
-import Cython
+from cython.parallel cimport prange
+from libc.math cimport sin, cos, exp
 
-def integrate_basic(f, double a, double b, *,int n_iter = 100000):
+
+def integrate_basic(f, double a, double b, *, long n_iter = 100000):
+    """
+    Метод левых прямоугольников для произвольной python-функции f.
+
+    Цикл типизирован, но f вызывается как python-объект на каждой точке.
+    """
     if n_iter <= 0:
         raise ValueError("n_iter не может быть <= 0")
 
     cdef double acc = 0.0
     cdef double step = (b - a) / n_iter
-    cdef int i
-    cdef double x
+    cdef long i
+
+    for i in range(n_iter):
+        acc += f(a + i * step) * step
+    return round(acc, 10)
+
+
+# встроенные ядра: подынтегральные функции на уровне C
+cdef double c_sin(double x) noexcept nogil:
+    return sin(x)
+
+
+cdef double c_cos(double x) noexcept nogil:
+    return cos(x)
+
+
+cdef double c_exp(double x) noexcept nogil:
+    return exp(x)
+
+
+cdef double c_linear(double x) noexcept nogil:
+    return x
+
+
+cdef double c_quadratic(double x) noexcept nogil:
+    return 2 * x * x - 3 * x + 1
+
+
+KERNELS = ("sin", "cos", "exp", "linear", "quadratic")
+
 
+cdef integrand_t _get_kernel(str name) except NULL:
+    if name == "sin":
+        return c_sin
+    if name == "cos":
+        return c_cos
+    if name == "exp":
+        return c_exp
+    if name == "linear":
+        return c_linear
+    if name == "quadratic":
+        return c_quadratic
+    raise ValueError(f"неизвестное ядро {name!r}, доступны {KERNELS}")
+
+
+cdef double integrate_c(integrand_t f, double a, double b, long n_iter) noexcept nogil:
+    """Сумма левых прямоугольников для C-функции f; вызывается без GIL."""
+    cdef double acc = 0.0
+    cdef double step = (b - a) / n_iter
+    cdef long i
     for i in range(n_iter):
-        x = a + i * step
-        acc += f(x) * step
-        return acc
\ No newline at end of file
+        acc += f(a + i * step)
+    return acc * step
+
+
+cdef double integrate_c_parallel(integrand_t f, double a, double b, long n_iter, int n_jobs) noexcept nogil:
+    """То же, что integrate_c, но цикл распределяется между n_jobs потоками OpenMP."""
+    cdef double acc = 0.0
+    cdef double step = (b - a) / n_iter
+    cdef long i
+    for i in prange(n_iter, num_threads=n_jobs, schedule="static"):
+        acc += f(a + i * step)
+    return acc * step
+
+
+def integrate_kernel(str name, double a, double b, *, long n_iter = 100000):
+    """
+    Метод левых прямоугольников для встроенного C-ядра name (см. KERNELS).
+
+    Весь цикл выполняется без GIL и без вызовов python-объектов.
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    cdef integrand_t f = _get_kernel(name)
+    cdef double acc
+    with nogil:
+        acc = integrate_c(f, a, b, n_iter)
+    return round(acc, 10)
+
+
+def integrate_kernel_parallel(str name, double a, double b, *, long n_iter = 100000, int n_jobs = 3):
+    """
+    Параллельный вариант integrate_kernel: цикл выполняется через prange
+    в n_jobs потоках OpenMP без GIL.
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    if n_jobs <= 0:
+        raise ValueError("n_jobs не может быть <= 0")
+    cdef integrand_t f = _get_kernel(name)
+    cdef double acc
+    with nogil:
+        acc = integrate_c_parallel(f, a, b, n_iter, n_jobs)
+    return round(acc, 10)
@@ -1,11 +1,54 @@
 import unittest
+import asyncio
 import math
+import time
 from unittest.mock import patch, MagicMock
 import concurrent.futures
 import numba
 
 # Импортируем функции из вашего модуля
 from main import integrate, integrate_async, integrate_process, integrate_async_nogil
+from main import integrate_vectorized, get_nogil_kernel
+from main import IntegrationEngine, get_engine, quadratic
+from main import get_thread_pool, set_thread_pool_size, _integrate_range
+from main import IntegralCache, integrate_cached
+from main import integrate_aio, integrate_aio_stream
+from main import integrate_progressive, integrate_until
+from main import SharedGrid, partition
+from multiprocessing import shared_memory
+from main import integrate_batch, integrate_adaptive, _adaptive_simpson
+from main import choose_backend, integrate_auto, probe_integrand, clear_auto_cache
+from Cython_int import integrate_basic, integrate_kernel, integrate_kernel_parallel
+from time_set import run_benchmarks, format_table, save_csv, BACKENDS, RECORD_FIELDS
+from multidim import integrate_tensor, integrate_qmc, qmc_points, SOBOL_MAX_DIM
+from kernels import KernelRegistry
+from profiling import profile
+import main
+import json
+import os
+import tempfile
+import threading
+import warnings
+import numpy as np
+
+
+def product_3d(x, y, z):
+    return x * y * z
+
+
+def product_nd(*x):
+    return np.prod(x, axis=0)
+
+
+def oscillating(x):
+    return math.sin(1 / x)
+
+
+LOOKUP = {}
+
+
+def lookup_func(x):
+    return LOOKUP.get(x, x)
 
 
 class TestIntegrateFunctions(unittest.TestCase):
@@ -88,20 +131,77 @@ class TestIntegrateFunctions(unittest.TestCase):
         self.assertAlmostEqual(async_result, sync_result, delta=0.001)
 
     def test_integrate_async_mock_executor(self):
-        """Тест с моком ThreadPoolExecutor"""
-        with patch('concurrent.futures.ThreadPoolExecutor') as mock_executor:
-            mock_future = MagicMock()
-            mock_future.result.return_value = 0.5
+        """Тест с моком пула потоков"""
+        mock_future = MagicMock()
+        mock_future.result.return_value = (0.5, 0.0, "mock")
 
-            mock_executor_instance = MagicMock()
-            mock_executor_instance.submit.return_value = mock_future
-            mock_executor.return_value.__enter__.return_value = mock_executor_instance
+        mock_executor = MagicMock()
+        mock_executor.submit.return_value = mock_future
 
-            # Имитируем as_completed
-            with patch('concurrent.futures.as_completed', return_value=[mock_future]):
-                result = integrate_async(self.linear_func, 0, 1,
-                                         n_iter=100, n_jobs=1)
-                self.assertAlmostEqual(result, 0.5, delta=0.001)
+        result = integrate_async(self.linear_func, 0, 1,
+                                 n_iter=1, n_jobs=1, executor=mock_executor)
+        self.assertAlmostEqual(result, 0.5, delta=0.001)
+        mock_executor.submit.assert_called_once()
+
+    def test_integrate_async_shared_pool(self):
+        """Тест что integrate_async не создаёт новый пул потоков при каждом вызове"""
+        integrate_async(self.sin_func, 0, 1, n_iter=1000, n_jobs=2)
+        pool = get_thread_pool()
+        integrate_async(self.sin_func, 0, 1, n_iter=1000, n_jobs=2)
+        self.assertIs(get_thread_pool(), pool)
+
+    def test_integrate_async_custom_executor(self):
+        """Тест с переданным пулом потоков и размером пула"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            result = integrate_async(self.linear_func, 0, 1, n_iter=5001, n_jobs=3, executor=executor)
+        self.assertAlmostEqual(result, integrate(self.linear_func, 0, 1, n_iter=5001), delta=1e-9)
+
+    def test_set_thread_pool_size(self):
+        """Тест пересоздания общего пула с новым размером"""
+        old = get_thread_pool()
+        running = old.submit(time.sleep, 0.05)
+        set_thread_pool_size(2)
+        try:
+            self.assertEqual(get_thread_pool()._max_workers, 2)
+            # вызовы, получившие старый пул до смены размера, продолжают работать
+            self.assertIsNone(running.result())
+            self.assertEqual(old.submit(math.sqrt, 4.0).result(), 2.0)
+        finally:
+            set_thread_pool_size(None)
+        with self.assertRaises(ValueError):
+            set_thread_pool_size(0)
+
+    # Тесты для разбиения работы partition
+
+    def test_partition_exact_and_balanced(self):
+        """Тест что части покрывают все индексы и различаются не более чем на 1"""
+        for n_items, n_jobs in [(5000, 3), (7, 4), (1, 8), (100003, 7)]:
+            with self.subTest(n_items=n_items, n_jobs=n_jobs):
+                chunks = partition(n_items, n_jobs)
+                self.assertEqual(chunks[0][0], 0)
+                self.assertEqual(chunks[-1][1], n_items)
+                self.assertTrue(all(prev[1] == cur[0] for prev, cur in zip(chunks, chunks[1:])))
+                sizes = [stop - start for start, stop in chunks]
+                self.assertLessEqual(max(sizes) - min(sizes), 1)
+                self.assertEqual(len(chunks), min(n_items, n_jobs * 4))
+
+    def test_parallel_not_divisible_n_iter(self):
+        """Тест что при n_iter, не кратном n_jobs, точки не теряются"""
+        expected = integrate(self.constant_func, 0, 1, n_iter=1001)
+        self.assertAlmostEqual(integrate_async(self.constant_func, 0, 1, n_iter=1001, n_jobs=3), expected,
+                               delta=1e-9)
+        self.assertAlmostEqual(integrate_process(self.sin_func, 0, 1, n_iter=1001, n_jobs=3),
+                               integrate(self.sin_func, 0, 1, n_iter=1001), delta=1e-9)
+
+    def test_chunk_timings(self):
+        """Тест отчёта о времени вычисления частей"""
+        for func in [integrate_async, integrate_process]:
+            with self.subTest(func=func.__name__):
+                timings = []
+                func(self.sin_func, 0, 1, n_iter=1000, n_jobs=2, timings=timings)
+                self.assertEqual([t["chunk"] for t in timings], list(range(8)))
+                self.assertEqual(sum(t["stop"] - t["start"] for t in timings), 1000)
+                self.assertTrue(all(t["seconds"] >= 0 and t["worker"] for t in timings))
 
     # Тесты для функции integrate_process
 
@@ -119,48 +219,753 @@ class TestIntegrateFunctions(unittest.TestCase):
         expected = -0.5  # ∫₁⁰ x dx = -0.5
         self.assertAlmostEqual(result, expected, delta=0.001)
 
+    # Тесты для класса IntegrationEngine
+
+    def test_engine_integrate_matches_serial(self):
+        """Тест что пул процессов считает по той же сетке, что и integrate"""
+        with IntegrationEngine(n_jobs=3) as engine:
+            result = engine.integrate(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        sync_result = integrate(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        self.assertAlmostEqual(result, sync_result, delta=1e-9)
+
+    def test_engine_map_keeps_order(self):
+        """Тест что пачка интегралов возвращается в порядке задач"""
+        tasks = [(self.sin_func, 0, math.pi / 2), (quadratic, 0, 1), (self.sin_func, 0, math.pi)]
+        with IntegrationEngine(n_jobs=2) as engine:
+            results = engine.map(tasks, n_iter=1000)
+        self.assertEqual(results, [integrate(f, a, b, n_iter=1000) for f, a, b in tasks])
+
+    def test_engine_reused_between_calls(self):
+        """Тест что общий пул не пересоздаётся между вызовами integrate_process"""
+        integrate_process(self.sin_func, 0, 1, n_iter=100, n_jobs=2)
+        engine = get_engine()
+        executor = engine._executor
+        integrate_process(self.sin_func, 0, 1, n_iter=100, n_jobs=2)
+        self.assertIs(engine._executor, executor)
+
+    def test_engine_shared_for_all_n_jobs(self):
+        """Тест что разные n_jobs делят один пул по числу ядер, а не создают новые процессы"""
+        for n_jobs in range(1, 6):
+            self.assertAlmostEqual(integrate_process(quadratic, 0, 1, n_iter=1000, n_jobs=n_jobs),
+                                   integrate(quadratic, 0, 1, n_iter=1000), delta=1e-9)
+        integrate_batch(quadratic, [(0, 1), (1, 2)], n_iter=1000, backend="process", n_jobs=7)
+        engine = get_engine()
+        self.assertEqual(engine.n_jobs, main._cpu_count())
+        self.assertEqual(len(engine._executor._processes), engine.n_jobs)
+
+    def test_engine_start_from_threads(self):
+        """Тест что одновременный первый submit из нескольких потоков создаёт один пул процессов"""
+        engine = IntegrationEngine(n_jobs=1)
+        barrier = threading.Barrier(4)
+
+        def first_submit():
+            barrier.wait()
+            return engine.submit(math.sqrt, 4.0).result()
+
+        try:
+            with patch('concurrent.futures.ProcessPoolExecutor', wraps=concurrent.futures.ProcessPoolExecutor) as pool:
+                with concurrent.futures.ThreadPoolExecutor(4) as threads:
+                    results = list(threads.map(lambda _: first_submit(), range(4)))
+            self.assertEqual(results, [2.0] * 4)
+            self.assertEqual(pool.call_count, 1)
+        finally:
+            engine.close()
+
+    def test_engine_close(self):
+        """Тест что выход из with останавливает процессы"""
+        with IntegrationEngine(n_jobs=1, preload=('math',)) as engine:
+            self.assertIsNotNone(engine._executor)
+        self.assertIsNone(engine._executor)
+
     # Тесты для функции integrate_async_nogil
 
     def test_integrate_async_nogil_basic(self):
         """Базовый тест для NOGIL версии"""
-        # Мокаем декоратор numba.jit чтобы избежать компиляции во время тестов
-        with patch('numba.jit') as mock_jit:
-            mock_jit.return_value = integrate  # Возвращаем оригинальную функцию
+        result = integrate_async_nogil(self.sin_func, 0, math.pi / 2,
+                                       n_iter=5000, n_jobs=2)
+        expected = 1.0
+        self.assertAlmostEqual(result, expected, delta=0.01)
+
+    def test_integrate_async_nogil_same_grid_as_integrate(self):
+        """Тест что NOGIL версия считает по той же сетке, что и integrate"""
+        for n_jobs in [1, 3, 7]:
+            with self.subTest(n_jobs=n_jobs):
+                result = integrate_async_nogil(self.linear_func, 0, 1,
+                                               n_iter=5000, n_jobs=n_jobs)
+                sync_result = integrate(self.linear_func, 0, 1, n_iter=5000)
+                self.assertAlmostEqual(result, sync_result, delta=1e-9)
+
+    def test_integrate_async_nogil_kernel_cached(self):
+        """Тест что ядро компилируется один раз для функции"""
+        kernel = get_nogil_kernel(self.sin_func)
+        self.assertIsNotNone(kernel)
+        self.assertIs(get_nogil_kernel(self.sin_func), kernel)
+
+    def test_integrate_async_nogil_fallback(self):
+        """Тест перехода на integrate_async для функции, которую numba не компилирует"""
+        table = {}
+        func = lambda x: table.get(x, 1.0)
+
+        with self.assertWarns(RuntimeWarning):
+            result = integrate_async_nogil(func, 0, 1, n_iter=100, n_jobs=2)
+        self.assertAlmostEqual(result, 1.0, delta=1e-9)
+        self.assertIsNone(get_nogil_kernel(func))
+
+    # Тесты для функции integrate_vectorized
+
+    def test_integrate_vectorized_numpy_func(self):
+        """Тест векторизованного интегрирования функции numpy"""
+        result = integrate_vectorized(np.sin, 0, math.pi / 2, n_iter=5000)
+        sync_result = integrate(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        self.assertAlmostEqual(result, sync_result, delta=1e-9)
+
+    def test_integrate_vectorized_fallback(self):
+        """Тест что функция без поддержки массивов считается обычным циклом"""
+        result = integrate_vectorized(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        sync_result = integrate(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        self.assertEqual(result, sync_result)
+
+    def test_integrate_vectorized_constant_function(self):
+        """Тест константной функции, возвращающей скаляр вместо массива"""
+        result = integrate_vectorized(self.constant_func, 0, 5, n_iter=5000)
+        self.assertAlmostEqual(result, 10.0, delta=0.001)
+
+    def test_integrate_vectorized_complex_not_truncated(self):
+        """Тест что комплексный результат не обрезается до вещественной части, а ведёт себя как в integrate"""
+        with self.assertRaises(TypeError):
+            integrate(lambda x: x * 1j, 0, 1, n_iter=100)
+        with self.assertRaises(TypeError):
+            integrate_vectorized(lambda x: x * 1j, 0, 1, n_iter=100)
+
+    def test_integrate_vectorized_negative_n_iter_raises_error(self):
+        """Тест что n_iter <= 0 вызывает ошибку"""
+        with self.assertRaises(ValueError):
+            integrate_vectorized(np.sin, 0, 1, n_iter=0)
+
+    # Тесты для функции integrate_batch
+
+    def test_integrate_batch_matches_single_calls(self):
+        """Тест что пачка совпадает с отдельными вызовами на всех backend"""
+        intervals = [(0, 1), (0, math.pi / 2), (-1, 2)]
+        expected = [integrate(self.sin_func, a, b, n_iter=2000) for a, b in intervals]
+        for backend in ["vectorized", "thread", "process"]:
+            with self.subTest(backend=backend):
+                result = integrate_batch(self.sin_func, intervals, n_iter=2000, backend=backend)
+                for res, exp in zip(result, expected):
+                    self.assertAlmostEqual(res, exp, delta=1e-9)
+
+    def test_integrate_batch_numpy_intervals(self):
+        """Тест с массивом отрезков и функцией numpy"""
+        intervals = np.array([[0.0, 1.0], [1.0, 2.0], [0.0, 1.0]])
+        result = integrate_batch(np.sin, intervals, n_iter=1000)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0], result[2])
+        self.assertAlmostEqual(result[0], integrate(self.sin_func, 0, 1, n_iter=1000), delta=1e-9)
+
+    def test_integrate_batch_several_functions(self):
+        """Тест с отдельной функцией для каждого отрезка"""
+        result = integrate_batch([self.linear_func, self.constant_func], [(0, 1), (0, 5)], n_iter=5000)
+        self.assertAlmostEqual(result[0], 0.5, delta=0.001)
+        self.assertAlmostEqual(result[1], 10.0, delta=0.001)
+
+    def test_integrate_batch_thread_n_jobs(self):
+        """Тест что backend "thread" занимает не больше n_jobs потоков одновременно"""
+        lock = threading.Lock()
+        active, peak = 0, 0
+        task = main._integrate_task_nogil
+
+        def counting_task(*args):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return task(*args)
+
+        intervals = [(0, i + 1) for i in range(6)]
+        with patch('main._integrate_task_nogil', counting_task):
+            result = integrate_batch(self.linear_func, intervals, n_iter=1000, backend="thread", n_jobs=2)
+        self.assertEqual(peak, 2)
+        self.assertEqual(result, integrate_batch(self.linear_func, intervals, n_iter=1000, backend="thread", n_jobs=6))
+
+    def test_integrate_batch_errors(self):
+        """Тест ошибок при неверных аргументах"""
+        with self.assertRaises(ValueError):
+            integrate_batch(np.sin, [(0, 1)], backend="gpu")
+        with self.assertRaises(ValueError):
+            integrate_batch([np.sin, np.cos], [(0, 1)])
+
+    # Тесты для функции integrate_adaptive
+
+    def test_integrate_adaptive_accuracy(self):
+        """Тест что адаптивный метод достигает заданной точности"""
+        result = integrate_adaptive(self.sin_func, 0, math.pi, tol=1e-9)
+        self.assertAlmostEqual(result, 2.0, delta=1e-8)
+
+    def test_integrate_adaptive_fewer_evaluations(self):
+        """Тест что адаптивному методу нужно меньше вычислений функции"""
+        value, n_eval, _ = _adaptive_simpson(self.sin_func, 0, math.pi, 1e-9, 50)
+        self.assertAlmostEqual(value, 2.0, delta=1e-8)
+        self.assertLess(n_eval, 5000)
+
+    def test_integrate_adaptive_parallel(self):
+        """Тест параллельных вариантов адаптивного метода"""
+        for backend in ["thread", "process"]:
+            with self.subTest(backend=backend):
+                result = integrate_adaptive(quadratic, 0, 1, n_jobs=3, backend=backend)
+                self.assertAlmostEqual(result, 1 / 6, delta=1e-9)
+
+    def test_integrate_adaptive_nan_stops(self):
+        """Тест что nan и inf не дробят отрезок до max_depth, а возвращаются как в integrate"""
+        value, n_eval, _ = _adaptive_simpson(lambda x: math.nan, 0.0, 1.0, 1e-10, 50)
+        self.assertTrue(math.isnan(value))
+        self.assertEqual(n_eval, 5)
+        result = integrate_adaptive(lambda x: math.sqrt(x) if x > 0.5 else math.nan, 0, 1)
+        self.assertTrue(math.isnan(result))
+        self.assertTrue(math.isnan(integrate_adaptive(lambda x: 1 / x if x else math.inf, -1, 1)))
+
+    def test_integrate_adaptive_max_eval(self):
+        """Тест что max_eval ограничивает число вычислений функции"""
+        value, n_eval, truncated = _adaptive_simpson(oscillating, 1e-6, 1.0, 1e-12, 50, 1001)
+        self.assertLessEqual(n_eval, 1001)
+        self.assertTrue(math.isfinite(value))
+        self.assertTrue(truncated)
+        for n_jobs, backend in [(1, "thread"), (2, "thread"), (2, "process")]:
+            with self.subTest(n_jobs=n_jobs, backend=backend):
+                with self.assertWarns(RuntimeWarning) as caught:
+                    integrate_adaptive(oscillating, 1e-6, 1.0, tol=1e-12, max_eval=1000, n_jobs=n_jobs,
+                                       backend=backend)
+                self.assertEqual(caught.filename, __file__)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            integrate_adaptive(self.sin_func, 0, 1, n_jobs=2, backend="process")
+
+    def test_integrate_adaptive_errors(self):
+        """Тест ошибок при неверных аргументах"""
+        with self.assertRaises(ValueError):
+            integrate_adaptive(self.sin_func, 0, 1, tol=0)
+        with self.assertRaises(ValueError):
+            integrate_adaptive(self.sin_func, 0, 1, n_jobs=2, backend="gpu")
+        with self.assertRaises(ValueError):
+            integrate_adaptive(self.sin_func, 0, 1, max_eval=2)
+
+    # Тесты для модуля Cython_int
 
-            result = integrate_async_nogil(self.sin_func, 0, math.pi / 2,
-                                           n_iter=5000, n_jobs=2)
-            expected = 1.0
-            self.assertAlmostEqual(result, expected, delta=0.01)
+    def test_cython_integrate_basic_full_loop(self):
+        """Тест что integrate_basic суммирует все точки, а не первую"""
+        result = integrate_basic(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        sync_result = integrate(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        self.assertAlmostEqual(result, sync_result, delta=1e-9)
+
+    def test_cython_kernels_match_python(self):
+        """Тест встроенных C-ядер и их параллельного варианта"""
+        cases = [("sin", math.sin), ("cos", math.cos), ("exp", math.exp),
+                 ("linear", self.linear_func), ("quadratic", quadratic)]
+        for name, func in cases:
+            with self.subTest(kernel=name):
+                expected = integrate(func, -1, 2, n_iter=5000)
+                self.assertAlmostEqual(integrate_kernel(name, -1, 2, n_iter=5000), expected, delta=1e-9)
+                self.assertAlmostEqual(integrate_kernel_parallel(name, -1, 2, n_iter=5000, n_jobs=3),
+                                       expected, delta=1e-9)
+
+    def test_cython_unknown_kernel(self):
+        """Тест ошибки для неизвестного ядра"""
+        with self.assertRaises(ValueError):
+            integrate_kernel("tan", 0, 1)
+
+    # Тесты для способов суммирования
 
-    def test_integrate_async_nogil_mock_integrate(self):
-        """Тест с моком внутренней функции integrate"""
+    def test_summation_modes_agree(self):
+        """Тест что все способы суммирования дают близкий результат"""
+        naive = integrate(self.sin_func, 0, math.pi / 2, n_iter=5000)
+        for summation in ["kahan", "fsum"]:
+            with self.subTest(summation=summation):
+                result = integrate(self.sin_func, 0, math.pi / 2, n_iter=5000, summation=summation)
+                self.assertAlmostEqual(result, naive, delta=1e-9)
+
+    def test_summation_compensated_more_accurate(self):
+        """Тест что компенсированное суммирование точнее наивного"""
+        exact = 0.1 * 1000000
+        naive = _integrate_range(self.constant_func, 0.0, 0.05, 0, 1000000)
+        for summation in ["kahan", "fsum"]:
+            with self.subTest(summation=summation):
+                result = _integrate_range(self.constant_func, 0.0, 0.05, 0, 1000000, summation)
+                self.assertLessEqual(abs(result - exact), abs(naive - exact))
+
+    def test_summation_deterministic_parallel(self):
+        """Тест что параллельный результат одинаков при повторных запусках"""
+        for summation in ["naive", "fsum"]:
+            with self.subTest(summation=summation):
+                results = {integrate_async(self.sin_func, 0, 3, n_iter=20000, n_jobs=4, summation=summation)
+                           for _ in range(5)}
+                self.assertEqual(len(results), 1)
+
+    def test_summation_unknown_mode(self):
+        """Тест ошибки для неизвестного способа суммирования"""
+        with self.assertRaises(ValueError):
+            integrate(self.sin_func, 0, 1, summation="magic")
+        with self.assertRaises(ValueError):
+            integrate_async(self.sin_func, 0, 1, summation="magic")
+
+    # Тесты для замеров time_set
+
+    def test_benchmarks_check_correctness(self):
+        """Тест что замеры сверяют результат каждого back-end с эталоном"""
+        records = run_benchmarks(n_iters=(500,), n_jobs_list=(2,), integrands=("cheap",), repeat=1)
+        self.assertEqual({r["backend"] for r in records}, set(BACKENDS))
+        self.assertTrue(all(r["ok"] for r in records), format_table(records))
+        self.assertEqual(tuple(records[0]), RECORD_FIELDS)
+
+    def test_save_csv_empty(self):
+        """Тест что пустой список замеров даёт файл только с заголовком"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "empty.csv")
+            save_csv([], path)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(file.read().splitlines(), [",".join(RECORD_FIELDS)])
+
+    # Тесты для кеша integrate_cached
+
+    def test_cache_hit_returns_same_value(self):
+        """Тест что повторный запрос берётся из кеша"""
+        cache = IntegralCache()
+        first = integrate_cached(self.sin_func, 0, 1, n_iter=1000, cache=cache)
         mock_integrate = MagicMock()
-        mock_integrate.return_value = 0.25
+        with patch.dict('main.CACHE_METHODS', {'integrate': mock_integrate}):
+            second = integrate_cached(self.sin_func, 0, 1, n_iter=1000, cache=cache)
+            mock_integrate.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()["hits"], 1)
 
-        with patch('main.integrate', mock_integrate):
-            with patch('numba.jit') as mock_jit:
-                mock_jit.return_value = mock_integrate
+    def test_cache_key_includes_method_and_options(self):
+        """Тест что разные методы и параметры не смешиваются в кеше"""
+        cache = IntegralCache()
+        integrate_cached(self.sin_func, 0, 1, n_iter=1000, cache=cache)
+        integrate_cached(self.sin_func, 0, 1, n_iter=1000, method="async", n_jobs=2, cache=cache)
+        integrate_cached(self.sin_func, 0, 1, n_iter=1000, summation="fsum", cache=cache)
+        self.assertEqual(cache.stats()["misses"], 3)
 
-                result = integrate_async_nogil(self.linear_func, 0, 1,
-                                               n_iter=100, n_jobs=2)
-                mock_integrate.assert_called()
+    def test_cache_key_ignores_non_result_options(self):
+        """Тест что timings, executor и engine не входят в ключ, а нехешируемые параметры дают TypeError"""
+        cache = IntegralCache()
+        timings = []
+        first = integrate_cached(self.sin_func, 0, 1, n_iter=1000, method="async", cache=cache, timings=timings)
+        self.assertTrue(timings)
+        second = integrate_cached(self.sin_func, 0, 1, n_iter=1000, method="async", cache=cache,
+                                  timings=[], executor=get_thread_pool())
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()["hits"], 1)
+        with self.assertRaises(TypeError):
+            integrate_cached(self.sin_func, 0, 1, n_iter=1000, method="async", cache=cache, n_jobs=[2])
+
+    def test_cache_lru_eviction(self):
+        """Тест вытеснения самой старой записи"""
+        cache = IntegralCache(maxsize=2)
+        for b in [1, 2, 3]:
+            integrate_cached(self.sin_func, 0, b, n_iter=100, cache=cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get(cache.make_key(self.sin_func, 0, 1, 100, "integrate")))
+
+    def test_cache_ttl(self):
+        """Тест устаревания записи по времени жизни"""
+        cache = IntegralCache(ttl=10)
+        with patch('main.time.monotonic', return_value=0.0):
+            integrate_cached(self.sin_func, 0, 1, n_iter=100, cache=cache)
+        with patch('main.time.monotonic', return_value=20.0):
+            integrate_cached(self.sin_func, 0, 1, n_iter=100, cache=cache)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_cache_extends_prefix(self):
+        """Тест продления ранее вычисленного отрезка с тем же шагом"""
+        cache = IntegralCache()
+        integrate_cached(self.sin_func, 0, 1, n_iter=1000, cache=cache)
+        result = integrate_cached(self.sin_func, 0, 3, n_iter=3000, cache=cache)
+        self.assertEqual(cache.stats()["extensions"], 1)
+        self.assertAlmostEqual(result, integrate(self.sin_func, 0, 3, n_iter=3000), delta=1e-8)
+
+    # Тесты для asyncio-версий
+
+    def test_integrate_aio_matches_async(self):
+        """Тест что asyncio-версия совпадает с integrate_async"""
+        result = asyncio.run(integrate_aio(self.sin_func, 0, math.pi / 2, n_iter=5000, n_jobs=2))
+        expected = integrate_async(self.sin_func, 0, math.pi / 2, n_iter=5000, n_jobs=2)
+        self.assertEqual(result, expected)
+
+    def test_integrate_aio_concurrent_requests(self):
+        """Тест нескольких интегралов в одном цикле событий"""
+        async def run():
+            return await asyncio.gather(integrate_aio(self.linear_func, 0, 1, n_iter=5000),
+                                        integrate_aio(self.constant_func, 0, 5, n_iter=5000),
+                                        integrate_aio(self.sin_func, 0, 1, n_iter=1000, executor=get_engine()))
+        linear, constant, sin = asyncio.run(run())
+        self.assertAlmostEqual(linear, 0.5, delta=0.001)
+        self.assertAlmostEqual(constant, 10.0, delta=0.001)
+        self.assertAlmostEqual(sin, integrate(self.sin_func, 0, 1, n_iter=1000), delta=1e-9)
+
+    def test_integrate_aio_timeout(self):
+        """Тест ограничения времени вычисления"""
+        def slow(x):
+            time.sleep(0.02)
+            return x
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(integrate_aio(slow, 0, 1, n_iter=24, n_jobs=2, timeout=0.01))
+
+    def test_integrate_aio_stream(self):
+        """Тест потока частичных сумм"""
+        async def collect():
+            return [item async for item in integrate_aio_stream(self.sin_func, 0, 1, n_iter=4000, n_jobs=2)]
+
+        items = asyncio.run(collect())
+        done = [item[0] for item in items]
+        self.assertEqual(done, sorted(done))
+        self.assertEqual(items[-1][:2], (8, 8))
+        self.assertEqual(items[-1][2], integrate_async(self.sin_func, 0, 1, n_iter=4000, n_jobs=2))
+
+    # Тесты для последовательного уточнения
+
+    def test_integrate_progressive_matches_integrate(self):
+        """Тест что каждое уточнение совпадает с integrate на той же сетке"""
+        steps = list(integrate_progressive(self.sin_func, 0, 2, n_start=500, max_iter=8000))
+        self.assertEqual([n for n, _, _ in steps], [500, 1000, 2000, 4000, 8000])
+        for n, value, _ in steps:
+            with self.subTest(n=n):
+                self.assertAlmostEqual(value, integrate(self.sin_func, 0, 2, n_iter=n), delta=1e-9)
+
+    def test_integrate_progressive_reuses_points(self):
+        """Тест что функция вычисляется только в новых точках"""
+        calls = []
+        func = lambda x: calls.append(x) or x
+        for _ in integrate_progressive(func, 0, 1, n_start=100, max_iter=800):
+            pass
+        self.assertEqual(len(calls), 800)
+
+    def test_integrate_until_stops_at_tolerance(self):
+        """Тест остановки при достижении точности"""
+        n, value, error = integrate_until(self.linear_func, 0, 1, tol=1e-4, n_start=100)
+        self.assertLessEqual(error, 1e-4)
+        self.assertAlmostEqual(value, 0.5, delta=1e-3)
+        self.assertLess(n, 100000)
+
+    # Тесты для SharedGrid
+
+    def test_shared_grid_left_matches_integrate(self):
+        """Тест что левые прямоугольники по общей сетке совпадают с integrate"""
+        with SharedGrid.evaluate(self.sin_func, 0, math.pi / 2, n_iter=5000, n_jobs=3) as grid:
+            self.assertAlmostEqual(grid.left(), integrate(self.sin_func, 0, math.pi / 2, n_iter=5000),
+                                   delta=1e-9)
+
+    def test_shared_grid_rules_reuse_values(self):
+        """Тест нескольких квадратурных формул по одной сетке"""
+        with SharedGrid.evaluate(np.sin, 0, math.pi, n_iter=1000, n_jobs=2) as grid:
+            self.assertEqual(len(grid.values), 1001)
+            self.assertAlmostEqual(grid.right(), grid.left(), delta=1e-9)
+            self.assertAlmostEqual(grid.trapezoid(), 2.0, delta=1e-5)
+            self.assertAlmostEqual(grid.simpson(), 2.0, delta=1e-10)
+
+    def test_shared_grid_simpson_odd(self):
+        """Тест что метод Симпсона требует чётного n_iter"""
+        with SharedGrid.evaluate(self.sin_func, 0, 1, n_iter=11, n_jobs=2) as grid:
+            with self.assertRaises(ValueError):
+                grid.simpson()
+
+    def test_shared_grid_close_releases_memory(self):
+        """Тест освобождения общей памяти"""
+        grid = SharedGrid.evaluate(self.sin_func, 0, 1, n_iter=100, n_jobs=2)
+        name = grid._shm.name
+        grid.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    # Тесты для модуля multidim
+
+    def test_integrate_tensor_backends(self):
+        """Тест тензорной сетки на всех backend"""
+        expected = 0.125  # ∫∫∫ xyz по единичному кубу
+        for backend in ["vectorized", "thread", "process", "nogil"]:
+            with self.subTest(backend=backend):
+                value, error = integrate_tensor(product_3d, [(0, 1)] * 3, n_iter=20, backend=backend, n_jobs=2)
+                self.assertAlmostEqual(value, expected, delta=1e-9)
+                self.assertLess(error, 1e-9)
+
+    def test_integrate_tensor_error_estimate(self):
+        """Тест что оценка погрешности соответствует фактической ошибке"""
+        for rule in ["midpoint", "left"]:
+            with self.subTest(rule=rule):
+                value, error = integrate_tensor(lambda x, y: np.sin(x) * np.cos(y),
+                                                [(0, math.pi), (0, math.pi / 2)], n_iter=100, rule=rule)
+                self.assertLess(abs(value - 2.0), 3 * error + 1e-9)
+
+    def test_integrate_tensor_scalar_function(self):
+        """Тест функции без поддержки массивов numpy"""
+        value, _ = integrate_tensor(lambda x, y: math.exp(x + y), [(0, 1), (0, 1)], n_iter=50)
+        self.assertAlmostEqual(value, (math.e - 1) ** 2, delta=1e-3)
+
+    def test_multidim_complex_not_truncated(self):
+        """Тест что комплексная функция не обрезается до вещественной части в integrate_tensor и integrate_qmc"""
+        with self.assertRaises(TypeError):
+            integrate_tensor(lambda x, y: x * 1j, [(0, 1)] * 2, n_iter=10)
+        with self.assertRaises(TypeError):
+            integrate_qmc(lambda x, y: x * 1j, [(0, 1)] * 2, n_points=64)
+
+    def test_integrate_tensor_errors(self):
+        """Тест ошибок при неверных аргументах"""
+        with self.assertRaises(ValueError):
+            integrate_tensor(product_3d, [(0, 1)] * 4)
+        with self.assertRaises(ValueError):
+            integrate_tensor(product_3d, [(0, 1)] * 3, rule="simpson")
+        with self.assertRaises(ValueError):
+            integrate_tensor(product_3d, [(0, 1)] * 3, n_iter=2.5)
+
+    def test_multidim_nogil_fallback(self):
+        """Тест что nogil без компилируемой функции предупреждает и считает в потоках"""
+        table = {}
+        f = lambda x, y: table.get(x, 1.0) * table.get(y, 1.0)
+        with self.assertWarns(RuntimeWarning):
+            value, _ = integrate_tensor(f, [(0, 1), (0, 2)], n_iter=10, backend="nogil")
+        self.assertAlmostEqual(value, 2.0, delta=1e-9)
+        with self.assertWarns(RuntimeWarning):
+            value, _ = integrate_qmc(f, [(0, 1), (0, 2)], n_points=256, backend="nogil")
+        self.assertAlmostEqual(value, 2.0, delta=1e-9)
+
+    def test_multidim_numpy_integers(self):
+        """Тест что размеры сетки можно передавать целыми numpy"""
+        expected = integrate_tensor(product_3d, [(0, 1)] * 3, n_iter=10)
+        self.assertEqual(integrate_tensor(product_3d, [(0, 1)] * 3, n_iter=np.int64(10)), expected)
+        self.assertEqual(integrate_tensor(product_3d, [(0, 1)] * 3, n_iter=np.array([10, 10, 10])), expected)
+        self.assertEqual(integrate_qmc(product_3d, [(0, 1)] * 3, n_points=np.int64(256), n_random=np.int32(4), seed=1),
+                         integrate_qmc(product_3d, [(0, 1)] * 3, n_points=256, n_random=4, seed=1))
+
+    def test_qmc_points_stratified(self):
+        """Тест что каждая проекция 2**k точек Соболя равномерно заполняет [0, 1)"""
+        points = qmc_points("sobol", SOBOL_MAX_DIM, 0, 256)
+        for dim in range(SOBOL_MAX_DIM):
+            with self.subTest(dim=dim):
+                self.assertEqual(sorted(points[dim].tolist()), [i / 256 for i in range(256)])
+
+    def test_integrate_qmc(self):
+        """Тест квази-Монте-Карло в высокой размерности"""
+        expected = 1 / 2 ** 8
+        for sequence in ["sobol", "halton"]:
+            for backend in ["vectorized", "thread", "process"]:
+                with self.subTest(sequence=sequence, backend=backend):
+                    value, error = integrate_qmc(product_nd, [(0, 1)] * 8, n_points=4096, sequence=sequence,
+                                                 seed=3, backend=backend, n_jobs=2)
+                    self.assertAlmostEqual(value, expected, delta=max(5 * error, 1e-6))
+                    self.assertLess(error, 1e-4)
+
+    def test_integrate_qmc_reproducible(self):
+        """Тест что результат не зависит от числа исполнителей при одинаковом seed"""
+        first = integrate_qmc(product_nd, [(0, 1)] * 4, n_points=1024, seed=7, n_jobs=1, backend="thread")
+        second = integrate_qmc(product_nd, [(0, 1)] * 4, n_points=1024, seed=7, n_jobs=3, backend="thread")
+        self.assertAlmostEqual(first[0], second[0], delta=1e-9)
+
+    def test_integrate_qmc_nogil(self):
+        """Тест что nogil-ядро квази-Монте-Карло совпадает с векторизованным счётом"""
+        for sequence in ["sobol", "halton"]:
+            with self.subTest(sequence=sequence):
+                expected = integrate_qmc(product_3d, [(0, 1), (-1, 2), (0, 3)], n_points=2048,
+                                         sequence=sequence, seed=5)
+                value = integrate_qmc(product_3d, [(0, 1), (-1, 2), (0, 3)], n_points=2048,
+                                      sequence=sequence, seed=5, backend="nogil", n_jobs=3)
+                self.assertAlmostEqual(value[0], expected[0], delta=1e-9)
+                self.assertAlmostEqual(value[1], expected[1], delta=1e-9)
+
+    # Тесты для реестра ядер KernelRegistry
+
+    def test_kernel_registry_persists(self):
+        """Тест что ядро импортируемой функции сохраняется на диск и загружается новым реестром"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for f, kind in [(math.cos, "left"), (product_3d, "tensor3")]:
+                with self.subTest(kind=kind):
+                    first = KernelRegistry(cache_dir)
+                    self.assertIsNotNone(first.get(f, kind))
+                    self.assertEqual(first.stats()["kernels"][0]["source"], "compiled")
+
+                    second = KernelRegistry(cache_dir)
+                    self.assertIsNotNone(second.get(f, kind))
+                    self.assertEqual(second.stats()["disk_hits"], 1)
+            self.assertEqual(KernelRegistry(cache_dir).warm(), 2)
+
+    def test_kernel_registry_broken_file(self):
+        """Тест что недописанный модуль ядра считается промахом кеша и создаётся заново"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            KernelRegistry(cache_dir).get(math.cos, "left")
+            manifest = KernelRegistry(cache_dir)._read_manifest()
+            (filename,) = manifest
+            with open(os.path.join(cache_dir, filename), "w", encoding="utf-8") as file:
+                file.write("import numba\ndef kernel(a, step,")
+            registry = KernelRegistry(cache_dir)
+            kernel = registry.get(math.cos, "left")
+            self.assertAlmostEqual(kernel(0.0, 0.001, 0, 1000), math.sin(1.0), delta=1e-3)
+            self.assertEqual(registry.stats()["kernels"][0]["source"], "memory")
+            # испорченный файл удалён, следующий реестр записывает его заново
+            rebuilt = KernelRegistry(cache_dir)
+            self.assertIsNotNone(rebuilt.get(math.cos, "left"))
+            self.assertIn(rebuilt.stats()["kernels"][0]["source"], ("compiled", "disk"))
+            self.assertEqual([f for f in os.listdir(cache_dir) if f.endswith(".tmp")], [])
+
+    def test_kernel_registry_memory_only(self):
+        """Тест что лямбды компилируются без записи на диск, а ошибки компиляции запоминаются"""
+        table = {}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            registry = KernelRegistry(cache_dir)
+            kernel = registry.get(self.linear_func, "left")
+            self.assertAlmostEqual(kernel(0.0, 0.001, 0, 1000), 0.4995, delta=1e-9)
+            self.assertIsNone(registry.get(lambda x: table.get(x, 1.0), "left"))
+            self.assertEqual([k["source"] for k in registry.stats()["kernels"]], ["memory", "failed"])
+            self.assertEqual(registry.warm(), 0)
+            with self.assertRaises(ValueError):
+                registry.get(math.sin, "unknown")
+
+    def test_kernel_registry_run_metrics(self):
+        """Тест что время счёта учитывается отдельно от времени компиляции"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            registry = KernelRegistry(cache_dir, persist=False)
+            registry.get(math.sin, "left")
+            registry.record_run(math.sin, "left", 0.25)
+            registry.record_run(math.sin, "left", 0.5)
+            stats = registry.stats()
+            self.assertEqual(stats["kernels"][0]["calls"], 2)
+            self.assertAlmostEqual(stats["run_s"], 0.75)
+            self.assertGreater(stats["compile_s"], 0)
+
+    def test_kernel_registry_bounded(self):
+        """Тест что реестр хранит не больше maxsize ядер и забывает давно не запрошенные"""
+        registry = KernelRegistry(persist=False, maxsize=2)
+        registry.get(math.sin, "left")
+        registry.get(math.cos, "left")
+        registry.get(math.sin, "left")
+        registry.get(math.exp, "left")
+        self.assertEqual([k["name"] for k in registry.stats()["kernels"]], ["sin", "exp"])
+        with self.assertRaises(ValueError):
+            KernelRegistry(maxsize=0)
+
+    # Тесты для профилирования profiling.profile
+
+    def test_profile_records_backends(self):
+        """Тест что каждый back-end записывает этапы, число частей и скорость вычислений"""
+        expected_phases = {
+            "integrate": {"evaluate"},
+            "integrate_async": {"pool", "submit", "wait", "reduce"},
+            "integrate_process": {"pool", "submit", "wait", "reduce"},
+            "integrate_async_nogil": {"compile", "pool", "submit", "wait", "reduce"},
+            "integrate_basic": {"evaluate"},
+            "integrate_kernel_parallel": {"evaluate"},
+        }
+        with profile() as profiler:
+            integrate(self.sin_func, 0, 1, n_iter=1000)
+            integrate_async(self.sin_func, 0, 1, n_iter=1000, n_jobs=2)
+            integrate_process(self.sin_func, 0, 1, n_iter=1000, n_jobs=2)
+            integrate_async_nogil(self.sin_func, 0, 1, n_iter=1000, n_jobs=2)
+            main.integrate_basic(self.sin_func, 0, 1, n_iter=1000)
+            main.integrate_kernel_parallel("sin", 0, 1, n_iter=1000, n_jobs=2)
+
+        records = {record["backend"]: record for record in profiler.records}
+        self.assertEqual(set(records), set(expected_phases))
+        for backend, phases in expected_phases.items():
+            with self.subTest(backend=backend):
+                record = records[backend]
+                self.assertEqual(set(record["phases"]), phases)
+                self.assertEqual(record["evals"], 1000)
+                self.assertGreater(record["evals_per_s"], 0)
+                self.assertGreaterEqual(record["wall_s"], sum(record["phases"].values()) - 1e-9)
+                self.assertLessEqual(record["utilization"], 1.0 + 1e-9)
+        self.assertEqual(records["integrate_async"]["chunks"], len(partition(1000, 2)))
+        self.assertGreater(records["integrate_process"]["pickle_bytes"], 0)
+        self.assertEqual(records["integrate_kernel_parallel"]["n_jobs"], 2)
+
+    def test_profile_nogil_fallback(self):
+        """Тест что запасной путь integrate_async_nogil тоже закрывает свою запись профиля"""
+        table = {}
+        with profile() as profiler:
+            with self.assertWarns(RuntimeWarning):
+                integrate_async_nogil(lambda x: table.get(x, 1.0), 0, 1, n_iter=1000, n_jobs=2)
+        records = {record["backend"]: record for record in profiler.records}
+        self.assertEqual(set(records), {"integrate_async", "integrate_async_nogil"})
+        record = records["integrate_async_nogil"]
+        self.assertEqual(set(record["phases"]), {"compile", "fallback"})
+        self.assertGreaterEqual(record["wall_s"], records["integrate_async"]["wall_s"])
+
+    def test_profile_callback_and_export(self):
+        """Тест передачи записей в callback, выгрузки в JSON Lines и отсутствия записей вне profile"""
+        seen = []
+        with profile(seen.append) as profiler:
+            integrate_async(self.linear_func, 0, 1, n_iter=100, n_jobs=1)
+        integrate(self.linear_func, 0, 1, n_iter=100)
+
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(profiler.records, seen)
+        self.assertEqual(profiler.summary()["integrate_async"]["calls"], 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.jsonl")
+            profiler.to_jsonl(path)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual([json.loads(line) for line in file], seen)
+
+    # Тесты для автоматического выбора back-end
+
+    def test_choose_backend(self):
+        """Тест выбора back-end по типу функции и объёму работы"""
+        branchy = lambda x: x if x > 0 else -x
+        cases = [
+            (np.exp, 10 ** 6, 1, "integrate_vectorized"),
+            (branchy, 10 ** 7, 1, "integrate_async_nogil"),
+            (lookup_func, 10 ** 8, 4, "integrate_process"),
+        ]
+        for f, n_iter, n_jobs, expected in cases:
+            with self.subTest(expected=expected):
+                choice = choose_backend(f, 0, 1, n_iter=n_iter, n_jobs=n_jobs)
+                self.assertEqual(choice["backend"], expected)
+                self.assertEqual(min(choice["estimates"], key=choice["estimates"].get), expected)
+
+    def test_choose_backend_small_skips_compile(self):
+        """Тест что для маленького интеграла не тратится время на компиляцию numba"""
+        f = lambda x: x * 3
+        choice = choose_backend(f, 0, 1, n_iter=100, n_jobs=1)
+        self.assertIn(choice["backend"], ("integrate", "integrate_basic", "integrate_vectorized"))
+        self.assertNotIn("nogil", probe_integrand(f, 0, 1))
 
-    def test_integrate_async_nogil_jit_decorator(self):
-        """Тест что функция использует декоратор numba.jit"""
-        # Проверяем что numba.jit вызывается с правильными аргументами
-        with patch('numba.jit') as mock_jit:
-            mock_jit.return_value = integrate
+    def test_choose_backend_small_skips_probe(self):
+        """Тест что для интеграла меньше PROBE_MIN_ITER точек функция не замеряется"""
+        clear_auto_cache()
+        f = lambda x: x * 5
+        with patch('main._best_time', wraps=main._best_time) as best_time:
+            choice = choose_backend(f, 0, 1, n_iter=main.PROBE_MIN_ITER - 1)
+            self.assertEqual(integrate_auto(f, 0, 1, n_iter=100), integrate(f, 0, 1, n_iter=100))
+        self.assertEqual(choice["backend"], "integrate")
+        self.assertEqual(best_time.call_count, 0)
+        self.assertNotIn(f, main._AUTO_PROFILES)
 
-            # Вызываем функцию
-            integrate_async_nogil(self.sin_func, 0, 1, n_iter=100)
+    def test_auto_probe_cached(self):
+        """Тест что замеры функции делаются один раз"""
+        clear_auto_cache()
+        f = lambda x: x * x
+        with patch('main._best_time', wraps=main._best_time) as best_time:
+            first = probe_integrand(f, 0, 1)
+            calls = best_time.call_count
+            choose_backend(f, 0, 1, n_iter=1000)
+            self.assertIs(probe_integrand(f, 0, 1), first)
+            self.assertEqual(best_time.call_count, calls)
 
-            # Проверяем что jit был вызван с правильными параметрами
-            mock_jit.assert_called_once()
-            call_args = mock_jit.call_args
+    def test_auto_probe_cache_bounded(self):
+        """Тест что замеры хранятся не больше чем для AUTO_PROFILES_MAXSIZE функций"""
+        clear_auto_cache()
+        with patch('main.AUTO_PROFILES_MAXSIZE', 2):
+            funcs = [lambda x: x, lambda x: x + 1, lambda x: x + 2]
+            for f in funcs:
+                probe_integrand(f, 0, 1)
+            self.assertEqual(list(main._AUTO_PROFILES), funcs[1:])
+        clear_auto_cache()
 
-            # Проверяем что передан nogil=True
-            self.assertIn('nogil', call_args[1])
-            self.assertTrue(call_args[1]['nogil'])
+    def test_integrate_auto(self):
+        """Тест что результат integrate_auto совпадает с integrate"""
+        for f in [self.sin_func, self.linear_func, quadratic, lookup_func]:
+            with self.subTest(func=f):
+                self.assertAlmostEqual(integrate_auto(f, 0, 1, n_iter=20000),
+                                       integrate(f, 0, 1, n_iter=20000), delta=1e-8)
 
     # Компаративные тесты
 
@@ -0,0 +1,420 @@
+import doctest
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import OrderedDict
+from typing import Callable
+import numba
+import numpy as np
+
+
+# шаблоны ядер: имя -> текст функции kernel, вызывающей скомпилированную функцию jf.
+# CACHE = True в сгенерированном модуле включает дисковый кеш numba, при компиляции в памяти — False
+KERNEL_TEMPLATES = {
+    "left": '''
+@numba.njit(nogil=True, cache=CACHE)
+def kernel(a, step, start, stop):
+    acc = 0.0
+    for i in range(start, stop):
+        acc += jf(a + i * step) * step
+    return acc
+''',
+    "tensor1": '''
+@numba.njit(nogil=True, cache=CACHE)
+def kernel(lows, steps, counts, offset, start, stop):
+    acc = 0.0
+    for i in range(start, stop):
+        acc += jf(lows[0] + (i + offset) * steps[0])
+    return acc
+''',
+    "tensor2": '''
+@numba.njit(nogil=True, cache=CACHE)
+def kernel(lows, steps, counts, offset, start, stop):
+    acc = 0.0
+    for i in range(start, stop):
+        x = lows[0] + (i + offset) * steps[0]
+        for j in range(counts[1]):
+            acc += jf(x, lows[1] + (j + offset) * steps[1])
+    return acc
+''',
+    "tensor3": '''
+@numba.njit(nogil=True, cache=CACHE)
+def kernel(lows, steps, counts, offset, start, stop):
+    acc = 0.0
+    for i in range(start, stop):
+        x = lows[0] + (i + offset) * steps[0]
+        for j in range(counts[1]):
+            y = lows[1] + (j + offset) * steps[1]
+            for k in range(counts[2]):
+                acc += jf(x, y, lows[2] + (k + offset) * steps[2])
+    return acc
+''',
+}
+
+# ядро квази-Монте-Карло: суммы f по блоку точек points (d, n) в [0, 1)^d для каждого
+# сдвига из shifts (n_random, d). jf принимает d отдельных аргументов, поэтому шаблон
+# подставляется для каждой размерности от 1 до QMC_KERNEL_MAX_DIM
+QMC_KERNEL_MAX_DIM = 16
+_QMC_TEMPLATE = '''
+@numba.njit(nogil=True, cache=CACHE)
+def kernel(points, shifts, lows, widths):
+    sums = np.zeros(shifts.shape[0])
+    x = np.empty(points.shape[0])
+    for r in range(shifts.shape[0]):
+        acc = 0.0
+        for i in range(points.shape[1]):
+            for k in range(points.shape[0]):
+                u = points[k, i] + shifts[r, k]
+                if u >= 1.0:
+                    u -= 1.0
+                x[k] = lows[k] + u * widths[k]
+            acc += jf({args})
+        sums[r] = acc
+    return sums
+'''
+KERNEL_TEMPLATES.update(
+    (f"qmc{d}", _QMC_TEMPLATE.format(args=", ".join(f"x[{k}]" for k in range(d))))
+    for d in range(1, QMC_KERNEL_MAX_DIM + 1))
+
+# ядра, для которых встроенную функцию одного аргумента можно обернуть в python-функцию
+SCALAR_KERNELS = ("left", "tensor1", "qmc1")
+
+_HEADER_FUNCTION = '''# сгенерировано kernels.KernelRegistry для {module}.{name}, не редактировать
+import numba
+import numpy as np
+from {module} import {name} as _integrand
+CACHE = True
+jf = numba.njit(getattr(_integrand, "py_func", _integrand), nogil=True, cache=True)
+'''
+
+_HEADER_BUILTIN = '''# сгенерировано kernels.KernelRegistry для {module}.{name}, не редактировать
+import numba
+import numpy as np
+from {module} import {name} as _builtin
+CACHE = True
+
+
+def _integrand(x):
+    return _builtin(x)
+
+
+jf = numba.njit(_integrand, nogil=True, cache=True)
+'''
+
+MANIFEST = "manifest.json"
+DEFAULT_CACHE_DIR = os.environ.get(
+    "INTEGRATE_KERNEL_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "kernels"))
+
+
+def _wrap_integrand(f: Callable):
+    def wrapper(x):
+        return f(x)
+    return wrapper
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """
+    Записывает файл через временный файл в том же каталоге и os.replace.
+
+    Другой процесс видит либо старый файл, либо новый целиком, но не
+    наполовину записанный.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            out.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _warmup_args(kind: str) -> tuple:
+    """Аргументы пустого вызова ядра, после которого оно скомпилировано или загружено с диска."""
+    if kind == "left":
+        return 0.0, 0.0, 0, 0
+    if kind.startswith("qmc"):
+        d = int(kind[len("qmc"):])
+        return np.zeros((d, 0)), np.zeros((1, d)), np.zeros(d), np.zeros(d)
+    d = int(kind[len("tensor"):])
+    zeros = np.zeros(d)
+    return zeros, zeros, np.zeros(d, dtype=np.int64), 0.0, 0, 0
+
+
+def _import_path(f: Callable):
+    """
+    Возвращает (модуль, имя, исходный текст) для функции, которую можно
+    импортировать заново в другом процессе, иначе None.
+
+    Подходят функции верхнего уровня импортируемого модуля (в том числе
+    уже скомпилированные numba) и встроенные функции вроде math.sin.
+    Лямбды, замыкания, вложенные функции и функции из __main__ хранятся
+    только в памяти.
+    """
+    target = f.py_func if isinstance(f, numba.core.registry.CPUDispatcher) else f
+    module = getattr(target, "__module__", None)
+    name = getattr(target, "__qualname__", None) or getattr(target, "__name__", None)
+    if module in (None, "__main__") or not name or not name.isidentifier():
+        return None
+    if getattr(sys.modules.get(module), name, None) is not f:
+        return None
+    if isinstance(target, types.FunctionType):
+        if target.__closure__:
+            return None
+        try:
+            source = inspect.getsource(target)
+        except (OSError, TypeError):
+            return None
+    else:
+        source = f"{module}.{name}"
+    return module, name, source
+
+
+class KernelRegistry:
+    """
+    Реестр скомпилированных numba-ядер для подынтегральных функций.
+
+    Каждое ядро компилируется один раз на процесс. Для функций, которые
+    можно импортировать по имени (см. _import_path), в каталог cache_dir
+    записывается модуль с ядром, скомпилированным с cache=True, поэтому
+    следующий процесс загружает машинный код с диска вместо компиляции.
+    Имя файла содержит хеш исходного текста функции: после её изменения
+    ядро компилируется заново. Изменения функций, которые вызывает сама
+    подынтегральная функция, не отслеживаются — в этом случае нужен clear().
+    Сама функция кешируется numba в обычном месте (__pycache__ рядом с её
+    модулем или NUMBA_CACHE_DIR).
+
+    stats() показывает время компиляции (или загрузки с диска) каждого ядра
+    отдельно от времени счёта, переданного через record_run.
+
+    В памяти хранится не больше maxsize ядер: реестр держит ссылки на
+    функции, поэтому при превышении забывается ядро (и его статистика),
+    которое дольше всех не запрашивали. Дисковый кеш при этом не трогается.
+
+    >>> import math, tempfile
+    >>> registry = KernelRegistry(tempfile.mkdtemp())
+    >>> kernel = registry.get(math.sin, "left")
+    >>> round(kernel(0.0, math.pi / 1000, 0, 1000), 4)
+    2.0
+    >>> registry.get(math.sin, "left") is kernel
+    True
+    >>> [(k["name"], k["source"]) for k in registry.stats()["kernels"]]
+    [('math.sin', 'compiled')]
+    >>> KernelRegistry(registry.cache_dir).warm()
+    1
+    """
+
+    def __init__(self, cache_dir: str = None, persist: bool = True, maxsize: int = 256):
+        if maxsize <= 0:
+            raise ValueError("maxsize не может быть <= 0")
+        self.cache_dir = DEFAULT_CACHE_DIR if cache_dir is None else cache_dir
+        self.persist = persist
+        self.maxsize = maxsize
+        self._kernels = OrderedDict()
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, f: Callable, kind: str = "left"):
+        """
+        Возвращает ядро вида kind для функции f или None, если numba не может его скомпилировать.
+
+        Параметры
+        ----------
+        f : Callable
+            Подынтегральная функция.
+        kind : str, optional
+            Шаблон ядра из KERNEL_TEMPLATES. По умолчанию "left".
+        """
+        if kind not in KERNEL_TEMPLATES:
+            raise ValueError(f"неизвестный вид ядра {kind!r}, ожидается один из {tuple(KERNEL_TEMPLATES)}")
+        key = (f, kind)
+        with self._lock:
+            if key in self._kernels:
+                self._kernels.move_to_end(key)
+                return self._kernels[key]
+            path = _import_path(f) if self.persist else None
+            name = f"{path[0]}.{path[1]}" if path else getattr(f, "__qualname__", repr(f))
+            start = time.perf_counter()
+            try:
+                kernel, source = self._build(f, kind, path)
+            except (TypeError, numba.core.errors.NumbaError):
+                kernel, source = None, "failed"
+            self._kernels[key] = kernel
+            self._records[key] = {"name": name, "kind": kind, "source": source,
+                                  "compile_s": time.perf_counter() - start, "run_s": 0.0, "calls": 0}
+            while len(self._kernels) > self.maxsize:
+                old, _ = self._kernels.popitem(last=False)
+                del self._records[old]
+            return kernel
+
+    def _build(self, f: Callable, kind: str, path: tuple) -> tuple:
+        """Возвращает (ядро, источник); первый вызов ядра компилирует его или загружает с диска."""
+        if path:
+            try:
+                kernel = self._load(f, kind, path)
+                kernel(*_warmup_args(kind))
+                return kernel, "disk" if kernel.stats.cache_hits else "compiled"
+            except (ImportError, OSError):
+                pass  # повреждённый дисковый кеш: компилируем в памяти
+        kernel = self._compile(f, kind)
+        kernel(*_warmup_args(kind))
+        return kernel, "memory"
+
+    def _compile(self, f: Callable, kind: str):
+        """Компилирует ядро в памяти, без записи на диск."""
+        if isinstance(f, numba.core.registry.CPUDispatcher):
+            jf = f
+        elif isinstance(f, types.FunctionType):
+            jf = numba.njit(f, nogil=True)
+        elif kind in SCALAR_KERNELS:
+            jf = numba.njit(_wrap_integrand(f), nogil=True)
+        else:
+            raise TypeError("встроенные функции нескольких переменных не компилируются")
+        namespace = {"numba": numba, "np": np, "jf": jf, "CACHE": False}
+        exec(KERNEL_TEMPLATES[kind], namespace)
+        return namespace["kernel"]
+
+    def _filename(self, kind: str, module: str, name: str, source: str) -> str:
+        digest = hashlib.sha1(f"{kind}\n{module}.{name}\n{source}\n{numba.__version__}".encode()).hexdigest()
+        return f"{kind}_{module.replace('.', '_')}_{name}_{digest[:16]}.py"
+
+    def _load(self, f: Callable, kind: str, path: tuple):
+        """Создаёт (или находит) модуль ядра в cache_dir и импортирует его."""
+        module, name, source = path
+        builtin = not isinstance(f, (types.FunctionType, numba.core.registry.CPUDispatcher))
+        if builtin and kind not in SCALAR_KERNELS:
+            raise TypeError("встроенные функции нескольких переменных не компилируются")
+        filename = self._filename(kind, module, name, source)
+        file = os.path.join(self.cache_dir, filename)
+        if not os.path.exists(file):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            header = _HEADER_BUILTIN if builtin else _HEADER_FUNCTION
+            _write_atomic(file, header.format(module=module, name=name) + KERNEL_TEMPLATES[kind])
+            self._update_manifest(filename, {"module": module, "name": name, "kind": kind})
+        spec = importlib.util.spec_from_file_location(f"_kernel_{filename[:-3]}", file)
+        generated = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = generated  # numba находит окружение ядра по имени модуля
+        try:
+            spec.loader.exec_module(generated)
+            return generated.kernel
+        except Exception as error:
+            # испорченный файл (например, записанный старой версией не целиком) удаляем,
+            # чтобы следующий вызов создал его заново, а сейчас компилируем в памяти
+            del sys.modules[spec.name]
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+            raise ImportError(f"не удалось загрузить модуль ядра {file}") from error
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, MANIFEST), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_manifest(self, filename: str, entry: dict) -> None:
+        """
+        Записывает новое ядро в манифест и удаляет устаревшие файлы для той же функции.
+
+        Манифест заменяется целиком (см. _write_atomic), поэтому он всегда
+        читается как корректный JSON. Если два процесса обновляют его
+        одновременно, запись одного из них может потеряться; манифест нужен
+        только warm(), и потерянное ядро будет загружено с диска при первом get().
+        """
+        manifest = self._read_manifest()
+        for old, item in list(manifest.items()):
+            if item == entry and old != filename:
+                del manifest[old]
+                try:
+                    os.remove(os.path.join(self.cache_dir, old))
+                except OSError:
+                    pass
+        manifest[filename] = entry
+        _write_atomic(os.path.join(self.cache_dir, MANIFEST), json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    def warm(self) -> int:
+        """
+        Загружает заранее все ядра из манифеста cache_dir, например при старте процесса.
+
+        Ядра функций, которые больше нельзя импортировать или чей исходный
+        текст изменился, пропускаются. Возвращает число ядер, загруженных с диска.
+        """
+        loaded = 0
+        for filename, entry in self._read_manifest().items():
+            try:
+                f = getattr(importlib.import_module(entry["module"]), entry["name"])
+            except (ImportError, AttributeError):
+                continue
+            path = _import_path(f)
+            if path is None or self._filename(entry["kind"], *path) != filename:
+                continue
+            if self.get(f, entry["kind"]) is not None and self._records[f, entry["kind"]]["source"] == "disk":
+                loaded += 1
+        return loaded
+
+    def record_run(self, f: Callable, kind: str, seconds: float) -> None:
+        """Добавляет время счёта ядром к статистике функции f."""
+        with self._lock:
+            record = self._records.get((f, kind))
+            if record is not None:
+                record["run_s"] += seconds
+                record["calls"] += 1
+
+    def stats(self) -> dict:
+        """
+        Время компиляции и счёта по каждому ядру.
+
+        Поле source у ядра: "disk" — загружено из дискового кеша,
+        "compiled" — скомпилировано и сохранено, "memory" — скомпилировано
+        без сохранения, "failed" — функция не компилируется numba.
+        """
+        with self._lock:
+            kernels = [dict(record) for record in self._records.values()]
+        return {
+            "kernels": kernels,
+            "compile_s": sum(k["compile_s"] for k in kernels),
+            "run_s": sum(k["run_s"] for k in kernels),
+            "disk_hits": sum(k["source"] == "disk" for k in kernels),
+        }
+
+    def clear(self, disk: bool = False) -> None:
+        """Забывает скомпилированные ядра; при disk=True удаляет и сгенерированные модули."""
+        with self._lock:
+            self._kernels.clear()
+            self._records.clear()
+            if disk:
+                for filename in self._read_manifest():
+                    try:
+                        os.remove(os.path.join(self.cache_dir, filename))
+                    except OSError:
+                        pass
+                try:
+                    os.remove(os.path.join(self.cache_dir, MANIFEST))
+                except OSError:
+                    pass
+
+
+_DEFAULT_REGISTRY = KernelRegistry()
+
+
+def get_kernel_registry() -> KernelRegistry:
+    """Возвращает общий реестр ядер, используемый nogil-back-end main и multidim."""
+    return _DEFAULT_REGISTRY
+
+
+if __name__ == "__main__":
+    doctest.testmod()
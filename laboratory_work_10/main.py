@@ -1,15 +1,62 @@
+import asyncio
+import atexit
+import importlib
 import math
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
 import doctest
 import concurrent.futures as ftres
 from functools import partial
 from typing import Callable
+import warnings
 import concurrent.futures as futures
-from Cython_int import integrate_basic
-import numba
+from Cython_int import integrate_basic, integrate_kernel, integrate_kernel_parallel
+from kernels import get_kernel_registry
+from profiling import instrument, track
+import numpy as np
 
 
 # итерация 1
-def integrate(f: Callable, a:float, b:float, *, n_iter=100000)-> float:
+SUMMATION_MODES = ("naive", "kahan", "fsum")
+
+
+def _check_summation(summation: str) -> None:
+    if summation not in SUMMATION_MODES:
+        raise ValueError(f"неизвестный способ суммирования {summation!r}, ожидается один из {SUMMATION_MODES}")
+
+
+CHUNKS_PER_JOB = 4
+
+
+def partition(n_items: int, n_jobs: int, chunks_per_job: int = CHUNKS_PER_JOB) -> list:
+    """
+    Делит индексы [0, n_items) на непрерывные части для n_jobs исполнителей.
+
+    Частей создаётся n_jobs * chunks_per_job (но не больше n_items), их
+    размеры отличаются не более чем на 1, и вместе они покрывают все
+    индексы без остатка. Лишние части нужны для балансировки: если
+    функция на одних участках [a, b] дороже, чем на других, освободившийся
+    исполнитель берёт следующую часть.
+
+    >>> partition(10, 3, 1)
+    [(0, 3), (3, 6), (6, 10)]
+    >>> partition(3, 2)
+    [(0, 1), (1, 2), (2, 3)]
+    """
+    if n_jobs <= 0 or chunks_per_job <= 0:
+        raise ValueError("n_jobs и chunks_per_job не могут быть <= 0")
+    if n_items <= 0:
+        return []
+    n_chunks = min(n_items, n_jobs * chunks_per_job)
+    bounds = [i * n_items // n_chunks for i in range(n_chunks + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def integrate(f: Callable, a:float, b:float, *, n_iter=100000, summation: str = "naive")-> float:
     """
       Вычисляет приближённое значение определённого интеграла функции
       методом левых прямоугольников (Left Riemann Sum).
@@ -32,6 +79,12 @@ def integrate(f: Callable, a:float, b:float, *, n_iter=100000)-> float:
           Большее значение увеличивает точность вычислений,
           но требует больше вычислительных ресурсов.
           По умолчанию 100000.
+      summation : str, optional
+          Способ суммирования: "naive" — обычное накопление acc += f(x) * step,
+          "kahan" — компенсированное суммирование Кэхэна–Ноймайера,
+          "fsum" — точное суммирование math.fsum. В двух последних режимах
+          значения функции складываются без умножения на step, а результат
+          умножается на step один раз. По умолчанию "naive".
 
       Возвращаемое значение
       -------
@@ -44,23 +97,85 @@ def integrate(f: Callable, a:float, b:float, *, n_iter=100000)-> float:
     -0.0006283185
     >>> integrate(quadratic, 0, 1, n_iter=5000)
     0.16676668
+    >>> integrate(math.sin, -math.pi/2, math.pi/2, n_iter=5000, summation="fsum")
+    -0.0006283185
       """
 
     if n_iter <= 0:
         raise ValueError("n_iter не может быть <= 0")
-    acc = 0
+    _check_summation(summation)
+    call = track("integrate", f, n_iter)
     step = (b - a) / n_iter
-    for i in range(n_iter):
-        acc += f(a + i*step) * step
+    if summation != "naive":
+        acc = _integrate_range(f, a, step, 0, n_iter, summation)
+    else:
+        acc = 0
+        for i in range(n_iter):
+            acc += f(a + i*step) * step
+    call.lap("evaluate")
+    call.done()
     return round(acc, 10)
 
 
 #итерация 2 потоки
-def integrate_async(f: Callable, a:float, b:float, *, n_iter=100000, n_jobs = 3)-> float:
+_THREAD_POOL = None
+_THREAD_POOL_SIZE = None
+_THREAD_POOL_LOCK = threading.Lock()
+
+
+def get_thread_pool() -> ftres.ThreadPoolExecutor:
+    """
+    Возвращает общий для модуля пул потоков, создавая его при первом вызове.
+
+    Размер пула задаётся set_thread_pool_size (по умолчанию как у
+    ThreadPoolExecutor: min(32, cpu_count + 4)), поэтому количество
+    потоков ограничено и не растёт от вызова к вызову.
+    """
+    global _THREAD_POOL
+    with _THREAD_POOL_LOCK:
+        if _THREAD_POOL is None:
+            _THREAD_POOL = ftres.ThreadPoolExecutor(max_workers=_THREAD_POOL_SIZE,
+                                                    thread_name_prefix="integrate")
+        return _THREAD_POOL
+
+
+def set_thread_pool_size(max_workers: int = None) -> None:
+    """
+    Задаёт размер общего пула потоков; новый пул создаётся при следующем get_thread_pool().
+
+    Текущий пул не останавливается: вызовы, которые уже получили его,
+    могут и дальше отправлять в него задачи, отправленные задачи
+    доработают, а потоки пула завершатся, когда на него не останется ссылок.
+    """
+    global _THREAD_POOL, _THREAD_POOL_SIZE
+    if max_workers is not None and max_workers <= 0:
+        raise ValueError("max_workers не может быть <= 0")
+    with _THREAD_POOL_LOCK:
+        _THREAD_POOL, _THREAD_POOL_SIZE = None, max_workers
+
+
+@atexit.register
+def shutdown_thread_pool() -> None:
+    """Останавливает общий пул потоков, дожидаясь завершения задач."""
+    global _THREAD_POOL
+    with _THREAD_POOL_LOCK:
+        pool, _THREAD_POOL = _THREAD_POOL, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def integrate_async(f: Callable, a:float, b:float, *, n_iter=100000, n_jobs = 3,
+                    executor: ftres.Executor = None, summation: str = "naive", timings: list = None)-> float:
     """
     Вычисляет приближённое значение определённого интеграла функции
     методом левых прямоугольников с использованием пула потоков (ThreadPoolExecutor).
 
+    Сетка делится на части функцией partition, поэтому освободившийся
+    поток сразу берёт следующую часть, а не ждёт самый медленный. Пул потоков не создаётся при каждом вызове: используется
+    общий пул модуля (см. get_thread_pool) или переданный executor.
+    Частичные суммы складываются в порядке частей, а не в порядке
+    завершения, поэтому результат не меняется от запуска к запуску.
+
     Параметры
     ----------
     f : Callable[[float], float]
@@ -73,8 +188,16 @@ def integrate_async(f: Callable, a:float, b:float, *, n_iter=100000, n_jobs = 3)
         Общее количество подинтервалов для разбиения отрезка [a, b].
         По умолчанию 100000.
     n_jobs : int, optional
-        Количество потоков в пуле для параллельных вычислений.
+        Количество потоков для параллельных вычислений.
         По умолчанию 3.
+    executor : concurrent.futures.Executor, optional
+        Пул, в котором выполняются вычисления. По умолчанию общий пул потоков.
+    summation : str, optional
+        Способ суммирования внутри частей и между ними (см. integrate).
+        По умолчанию "naive".
+    timings : list, optional
+        Если передан список, в него добавляется по словарю на каждую часть
+        сетки (см. _collect_chunks): границы, время вычисления и исполнитель.
 
     Возвращаемое значение
     -------
@@ -83,19 +206,35 @@ def integrate_async(f: Callable, a:float, b:float, *, n_iter=100000, n_jobs = 3)
         округлённое до 10 знаков после запятой.
 
     >>> integrate_async(math.sin, -math.pi/2, math.pi/2, n_iter=5000)
-    -0.00062857
+    -0.0006283185
     >>> integrate_async(quadratic, 0, 1, n_iter=5000)
-    0.16676672
+    0.16676668
     """
-
-    executor = ftres.ThreadPoolExecutor(max_workers=n_jobs)
-    spawn = partial(executor.submit, integrate, f, n_iter = n_iter // n_jobs)
-    step = (b - a) / n_jobs
-    fs = [spawn(a + i * step, a + (i + 1) * step) for i in range(n_jobs)]
-    return round(sum(list(f.result() for f in ftres.as_completed(fs))), 10)
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    _check_summation(summation)
+    call = track("integrate_async", f, n_iter, n_jobs)
+    if call and timings is None:
+        timings = []
+    if executor is None:
+        executor = get_thread_pool()
+    call.lap("pool")
+    chunks = partition(n_iter, n_jobs)
+    step = (b - a) / n_iter
+    spawn = partial(executor.submit, _integrate_range_timed, f, a, step)
+    fs = [spawn(start, stop, summation) for start, stop in chunks]
+    call.lap("submit")
+    partials = _collect_chunks(fs, chunks, timings)
+    call.lap("wait")
+    result = round(_reduce_partials(partials, summation), 10)
+    call.lap("reduce")
+    call.done(timings, getattr(executor, "_max_workers", n_jobs))
+    return result
 
 #итерация 3 через процессы
-def integrate_process(func: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = 2) -> float:
+def integrate_process(func: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = 2,
+                      engine: "IntegrationEngine" = None, summation: str = "naive",
+                      timings: list = None) -> float:
     """
         Вычисляет приближённое значение определённого интеграла функции
         методом левых прямоугольников с использованием параллельных процессов.
@@ -120,11 +259,25 @@ def integrate_process(func: Callable, a: float, b: float, *, n_iter: int = 10000
             По умолчанию: 100000.
 
         n_jobs : int, опционально
-            Количество процессов для параллельных вычислений.
-            Если n_jobs = 1, вычисления выполняются последовательно.
-            Рекомендуется устанавливать равным количеству ядер CPU.
+            Степень параллельности: сетка делится на части для n_jobs
+            процессов (см. partition). Одновременно работает не больше
+            процессов, чем есть в пуле.
             По умолчанию: 2.
 
+        engine : IntegrationEngine, опционально
+            Пул процессов, в котором выполняются вычисления. По умолчанию
+            используется общий пул по числу ядер (см. get_engine),
+            который создаётся один раз и переиспользуется между вызовами.
+
+        summation : str, опционально
+            Способ суммирования внутри частей и между ними (см. integrate).
+            Частичные суммы складываются в порядке частей.
+            По умолчанию: "naive".
+
+        timings : list, опционально
+            Список, в который добавляется время вычисления каждой части
+            сетки (см. integrate_async).
+
         Возвращаемое значение
         -------
         float
@@ -133,24 +286,255 @@ def integrate_process(func: Callable, a: float, b: float, *, n_iter: int = 10000
         doctest:
 
         >>> integrate_process(math.sin, -math.pi/2, math.pi/2, n_iter=5000)
-        -0.0006283186
+        -0.0006283185
         >>> integrate_process(quadratic, 0, 1, n_iter=5000)
         0.16676668
         """
-    iter_per_job = n_iter // n_jobs
-    with futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
-        threadStart = partial(executor.submit, integrate, func, n_iter=iter_per_job)
+    if engine is None:
+        engine = get_engine()
+    return engine.integrate(func, a, b, n_iter=n_iter, n_jobs=n_jobs, summation=summation, timings=timings)
+
+
+def _integrate_range(f: Callable, a: float, step: float, start: int, stop: int,
+                     summation: str = "naive") -> float:
+    """Сумма левых прямоугольников по индексам сетки [start, stop) без округления."""
+    if summation == "fsum":
+        return math.fsum(f(a + i * step) for i in range(start, stop)) * step
+    if summation == "kahan":
+        acc = comp = 0.0
+        for i in range(start, stop):
+            y = f(a + i * step)
+            t = acc + y
+            if abs(acc) >= abs(y):
+                comp += (acc - t) + y
+            else:
+                comp += (y - t) + acc
+            acc = t
+        return (acc + comp) * step
+    acc = 0.0
+    for i in range(start, stop):
+        acc += f(a + i * step) * step
+    return acc
+
+
+def _reduce_partials(partials: list, summation: str) -> float:
+    """Складывает частичные суммы частей сетки в порядке частей."""
+    if summation == "naive":
+        return sum(partials)
+    return math.fsum(partials)
+
+
+def _integrate_range_timed(f: Callable, a: float, step: float, start: int, stop: int,
+                           summation: str = "naive") -> tuple:
+    """То же, что _integrate_range, но возвращает ещё время вычисления и исполнителя."""
+    return _call_timed(_integrate_range, f, a, step, start, stop, summation)
+
+
+def _call_timed(fn: Callable, *args) -> tuple:
+    """Вызывает fn(*args) и возвращает (результат, время, исполнитель), как _integrate_range_timed."""
+    started = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - started, f"{os.getpid()}:{threading.current_thread().name}"
+
+
+def _collect_chunks(fs: list, chunks: list, timings: list = None) -> list:
+    """
+    Дожидается частей сетки в порядке chunks и возвращает их частичные суммы.
+
+    Если передан список timings, в него добавляются словари
+    {"chunk", "start", "stop", "seconds", "worker"} по одному на часть,
+    по которым видно самые медленные части.
+    """
+    results = [fut.result() for fut in fs]
+    if timings is not None:
+        timings.extend({"chunk": i, "start": start, "stop": stop, "seconds": seconds, "worker": worker}
+                       for i, ((start, stop), (_, seconds, worker)) in enumerate(zip(chunks, results)))
+    return [value for value, _, _ in results]
+
+
+def _integrate_batch(tasks: list, n_iter: int) -> list:
+    """Вычисляет в рабочем процессе список интегралов (f, a, b) за одну отправку."""
+    return [integrate(f, a, b, n_iter=n_iter) for f, a, b in tasks]
+
+
+def _preload_modules(modules: tuple) -> None:
+    """Инициализатор рабочих процессов: заранее импортирует модули с подынтегральными функциями."""
+    for name in modules:
+        importlib.import_module(name)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+class IntegrationEngine:
+    """
+    Долгоживущий пул процессов для интегрирования.
+
+    Процессы создаются один раз при start() (или входе в with) и
+    переиспользуются между вызовами, поэтому стоимость запуска пула
+    не платится при каждом интеграле. Модули из preload импортируются
+    в каждом рабочем процессе заранее. Параметр n_jobs методов integrate
+    и map задаёт число частей работы (см. partition), а не размер пула.
+
+    >>> with IntegrationEngine(n_jobs=2) as engine:
+    ...     engine.integrate(quadratic, 0, 1, n_iter=5000)
+    ...     engine.map([(quadratic, 0, 1), (math.sin, 0, math.pi)], n_iter=5000)
+    0.16676668
+    [0.16676668, 1.9999999342]
+    """
+
+    def __init__(self, n_jobs: int = 2, preload: tuple = ()):
+        if n_jobs <= 0:
+            raise ValueError("n_jobs не может быть <= 0")
+        self.n_jobs = n_jobs
+        self.preload = tuple(preload)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "IntegrationEngine":
+        """Запускает рабочие процессы и дожидается их готовности; безопасно вызывать из нескольких потоков."""
+        with self._lock:
+            if self._executor is None:
+                # общий трекер ресурсов для рабочих процессов, иначе каждый процесс
+                # запускает свой и удаляет буферы SharedGrid при завершении
+                resource_tracker.ensure_running()
+                executor = futures.ProcessPoolExecutor(max_workers=self.n_jobs,
+                                                       initializer=_preload_modules,
+                                                       initargs=(self.preload,))
+                for fut in [executor.submit(_worker_ready) for _ in range(self.n_jobs)]:
+                    fut.result()
+                self._executor = executor
+        return self
+
+    def close(self) -> None:
+        """Останавливает рабочие процессы."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, fn: Callable, *args) -> futures.Future:
+        """Отправляет произвольную задачу fn(*args) в пул процессов."""
+        self.start()
+        return self._executor.submit(fn, *args)
+
+    def _jobs(self, n_jobs: int = None) -> int:
+        if n_jobs is None:
+            return self.n_jobs
+        if n_jobs <= 0:
+            raise ValueError("n_jobs не может быть <= 0")
+        return n_jobs
+
+    def integrate(self, func: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = None,
+                  summation: str = "naive", timings: list = None) -> float:
+        """
+        Вычисляет один интеграл, разделяя сетку из n_iter точек на части
+        для n_jobs процессов (см. partition); по умолчанию n_jobs — размер пула.
+        """
+        if n_iter <= 0:
+            raise ValueError("n_iter не может быть <= 0")
+        _check_summation(summation)
+        n_jobs = self._jobs(n_jobs)
+        call = track("integrate_process", func, n_iter, n_jobs)
+        if call and timings is None:
+            timings = []
+        self.start()
+        call.lap("pool")
+        step = (b - a) / n_iter
+        chunks = partition(n_iter, n_jobs)
+        call.pickle((_integrate_range_timed, func, a, step, 0, 0, summation), len(chunks))
+        results = [self._executor.submit(_integrate_range_timed, func, a, step, start, stop, summation)
+                   for start, stop in chunks]
+        call.lap("submit")
+        partials = _collect_chunks(results, chunks, timings)
+        call.lap("wait")
+        result = round(_reduce_partials(partials, summation), 10)
+        call.lap("reduce")
+        call.done(timings, min(n_jobs, self.n_jobs))
+        return result
+
+    def map(self, tasks: list, *, n_iter: int = 100000, n_jobs: int = None) -> list:
+        """
+        Вычисляет список интегралов (func, a, b).
+
+        Задачи делятся на пачки для n_jobs процессов (см. partition), и каждая
+        пачка отправляется в рабочий процесс одним вызовом. Результаты
+        возвращаются в порядке задач.
+        """
+        if n_iter <= 0:
+            raise ValueError("n_iter не может быть <= 0")
+        n_jobs = self._jobs(n_jobs)
+        self.start()
+        tasks = list(tasks)
+        batches = [self._executor.submit(_integrate_batch, tasks[start:stop], n_iter)
+                   for start, stop in partition(len(tasks), n_jobs)]
+        return [res for batch in batches for res in batch.result()]
+
+
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_engine() -> IntegrationEngine:
+    """
+    Возвращает общий для модуля пул процессов по числу ядер, создавая его при первом вызове.
+
+    Пул один на модуль: разные n_jobs в вызовах меняют только число частей
+    работы, а не число процессов, поэтому лишние процессы не накапливаются.
+    """
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = IntegrationEngine(_cpu_count())
+        return _ENGINE
+
+
+@atexit.register
+def _close_engines() -> None:
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is not None:
+            _ENGINE.close()
+            _ENGINE = None
 
-        step = (b - a) / n_jobs
-        results = [threadStart(a + i * step, a + (i + 1) * step) for i in range(n_jobs)]
-        return round(sum([i.result() for i in futures.as_completed(results)]), 10)
 #Cython
 
 #интеграция 5 через nogil
+def get_nogil_kernel(f: Callable):
+    """
+    Возвращает скомпилированное numba-ядро для функции f, освобождающее GIL.
+
+    Ядра хранятся в общем реестре kernels.get_kernel_registry(): каждое
+    компилируется один раз на процесс, а для функций верхнего уровня
+    импортируемых модулей сохраняется на диск и при следующем запуске
+    загружается без компиляции. Встроенные функции (math.sin и т.п.)
+    оборачиваются в python-функцию, уже скомпилированные функции numba
+    используются как есть.
+
+    Возвращаемое значение
+    -------
+    Скомпилированное ядро kernel(a, step, start, stop) или None,
+    если numba не может скомпилировать функцию.
+    """
+    return get_kernel_registry().get(f, "left")
+
+
 def integrate_async_nogil(f: Callable, a:float, b:float, *, n_iter=100000, n_jobs = 3)-> float:
     """
     Вычисляет приближённое значение определённого интеграла функции
-    методом левых прямоугольников с использованием пула потоков (ThreadPoolExecutor).
+    методом левых прямоугольников в пуле потоков, освобождающих GIL.
+
+    Функция компилируется numba (см. get_nogil_kernel) в ядро с nogil=True,
+    и каждый поток считает свою часть сетки без удержания GIL, поэтому
+    потоки действительно выполняются параллельно. Если функцию нельзя
+    скомпилировать, выдаётся RuntimeWarning и используется integrate_async.
 
     Параметры
     ----------
@@ -164,7 +548,7 @@ def integrate_async_nogil(f: Callable, a:float, b:float, *, n_iter=100000, n_job
         Общее количество подинтервалов для разбиения отрезка [a, b].
         По умолчанию 100000.
     n_jobs : int, optional
-        Количество потоков в пуле для параллельных вычислений.
+        Количество частей сетки, которые считаются параллельно в общем пуле потоков.
         По умолчанию 3.
 
     Возвращаемое значение
@@ -173,17 +557,1000 @@ def integrate_async_nogil(f: Callable, a:float, b:float, *, n_iter=100000, n_job
         Приближённое значение определённого интеграла ∫[a, b] f(x) dx,
         округлённое до 10 знаков после запятой.
 
-    >>> integrate_async(math.sin, -math.pi/2, math.pi/2, n_iter=5000)
-    -0.00062857
-    >>> integrate_async(quadratic, 0, 1, n_iter=5000)
-    0.16676672
-    """
-    integrate_async_nogil = numba.jit(integrate, nogil=True)
-    executor = ftres.ThreadPoolExecutor(max_workers=n_jobs)
-    spawn = partial(executor.submit, integrate, f, n_iter = n_iter // n_jobs)
-    step = (b - a) / n_jobs
-    fs = [spawn(a + i * step, a + (i + 1) * step) for i in range(n_jobs)]
-    return round(sum(list(f.result() for f in ftres.as_completed(fs))), 10)
+    >>> integrate_async_nogil(math.sin, -math.pi/2, math.pi/2, n_iter=5000)
+    -0.0006283185
+    >>> integrate_async_nogil(quadratic, 0, 1, n_iter=5000)
+    0.16676668
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    call = track("integrate_async_nogil", f, n_iter, n_jobs)
+    kernel = get_nogil_kernel(f)
+    call.lap("compile")
+    if kernel is None:
+        warnings.warn("функция не компилируется numba, используется integrate_async с GIL",
+                      RuntimeWarning, stacklevel=2)
+        try:
+            return integrate_async(f, a, b, n_iter=n_iter, n_jobs=n_jobs)
+        finally:
+            call.lap("fallback")
+            call.done()
+    step = (b - a) / n_iter
+    executor = get_thread_pool()
+    call.lap("pool")
+    start_time = time.perf_counter()
+    chunks = partition(n_iter, n_jobs)
+    fs = [executor.submit(_call_timed, kernel, a, step, start, stop) for start, stop in chunks]
+    call.lap("submit")
+    timings = [] if call else None
+    partials = _collect_chunks(fs, chunks, timings)
+    call.lap("wait")
+    result = round(sum(partials), 10)
+    call.lap("reduce")
+    get_kernel_registry().record_run(f, "left", time.perf_counter() - start_time)
+    call.done(timings, executor._max_workers)
+    return result
+
+
+#итерация 6 векторизация через numpy
+VECTOR_CHUNK = 1 << 20
+
+
+def _eval_vectorized(f: Callable, x: np.ndarray):
+    """
+    Пробует вычислить f сразу на всём массиве точек x.
+
+    Возвращает массив значений той же формы, что и x, либо None,
+    если функция не умеет работать с массивами numpy
+    (например, math.sin или функции с ветвлением по значению x)
+    или возвращает не вещественные числа: комплексный массив нельзя
+    молча привести к float, отбросив мнимую часть.
+    """
+    try:
+        y = f(x)
+    except (TypeError, ValueError):
+        return None
+    y = np.asarray(y)
+    if y.dtype.kind not in "biuf":
+        return None
+    y = y.astype(float, copy=False)
+    if y.ndim == 0:
+        return np.broadcast_to(y, x.shape)
+    if y.shape != x.shape:
+        return None
+    return y
+
+
+def integrate_vectorized(f: Callable, a: float, b: float, *, n_iter=100000) -> float:
+    """
+    Вычисляет приближённое значение определённого интеграла функции
+    методом левых прямоугольников, вычисляя функцию сразу на массиве точек.
+
+    Сетка точек a + i*step строится одним массивом numpy (блоками по
+    VECTOR_CHUNK точек, чтобы не расходовать лишнюю память), и функция
+    вызывается один раз на блок. Если функция не поддерживает массивы
+    (например, math.sin), вычисление выполняется обычным циклом integrate.
+
+    Параметры
+    ----------
+    f : Callable
+        Интегрируемая функция. Для ускорения должна поддерживать массивы
+        numpy (np.sin, лямбды из арифметических операций и т.п.).
+    a : float
+        Нижний предел интегрирования (левая граница отрезка).
+    b : float
+        Верхний предел интегрирования (правая граница отрезка).
+    n_iter : int, optional
+        Количество подинтервалов для разбиения отрезка [a, b].
+        По умолчанию 100000.
+
+    Возвращаемое значение
+    -------
+    float
+        Приближённое значение определённого интеграла ∫[a, b] f(x) dx,
+        округлённое до 10 знаков после запятой.
+
+    >>> integrate_vectorized(np.sin, -math.pi/2, math.pi/2, n_iter=5000)
+    -0.0006283185
+    >>> integrate_vectorized(quadratic, 0, 1, n_iter=5000)
+    0.16676668
+    >>> integrate_vectorized(math.sin, -math.pi/2, math.pi/2, n_iter=5000)
+    -0.0006283185
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    step = (b - a) / n_iter
+    acc = 0.0
+    for start in range(0, n_iter, VECTOR_CHUNK):
+        x = a + np.arange(start, min(start + VECTOR_CHUNK, n_iter)) * step
+        y = _eval_vectorized(f, x)
+        if y is None:
+            return integrate(f, a, b, n_iter=n_iter)
+        acc += float(np.sum(y)) * step
+    return round(acc, 10)
+
+
+#итерация 7 пакетное интегрирование
+BATCH_BACKENDS = ("vectorized", "thread", "process")
+
+
+def _integrate_rows(f: Callable, a: np.ndarray, b: np.ndarray, n_iter: int):
+    """
+    Вычисляет интегралы одной функции сразу по нескольким отрезкам.
+
+    Сетки всех отрезков складываются в одну матрицу (по строке на отрезок),
+    и функция вызывается один раз на блок строк. Возвращает массив
+    результатов или None, если функция не поддерживает массивы numpy.
+    """
+    step = (b - a) / n_iter
+    offsets = np.arange(n_iter)
+    rows = max(1, VECTOR_CHUNK // n_iter)
+    results = np.empty(len(a))
+    for start in range(0, len(a), rows):
+        part = slice(start, start + rows)
+        x = a[part, None] + offsets * step[part, None]
+        y = _eval_vectorized(f, x)
+        if y is None:
+            return None
+        results[part] = np.sum(y, axis=1) * step[part]
+    return results
+
+
+def _integrate_task_nogil(f: Callable, a: float, b: float, n_iter: int) -> float:
+    """Вычисляет один интеграл скомпилированным ядром, если функция компилируется numba."""
+    kernel = get_nogil_kernel(f)
+    if kernel is None:
+        return integrate(f, a, b, n_iter=n_iter)
+    start_time = time.perf_counter()
+    result = round(kernel(a, (b - a) / n_iter, 0, n_iter), 10)
+    get_kernel_registry().record_run(f, "left", time.perf_counter() - start_time)
+    return result
+
+
+def _integrate_tasks_nogil(tasks: list, n_iter: int) -> list:
+    """Вычисляет задачи (func, a, b) по очереди в одном потоке, см. _integrate_task_nogil."""
+    return [_integrate_task_nogil(func, a, b, n_iter) for func, a, b in tasks]
+
+
+def integrate_batch(f, intervals, *, n_iter: int = 100000, backend: str = "vectorized",
+                    n_jobs: int = 2) -> list:
+    """
+    Вычисляет пачку определённых интегралов одним заданием.
+
+    Одинаковые задачи (функция, a, b) считаются один раз. Для backend
+    "vectorized" сетки всех отрезков одной функции вычисляются одним
+    вызовом функции на матрице точек; если функция не поддерживает
+    массивы, используется обычный цикл. Для "thread" задачи делятся на
+    n_jobs пачек, которые выполняются в пуле потоков скомпилированными
+    nogil-ядрами (см. get_nogil_kernel), так что одновременно работают не
+    больше n_jobs потоков; для "process" — пачками в общем пуле процессов
+    (см. get_engine).
+
+    Параметры
+    ----------
+    f : Callable или список Callable
+        Интегрируемая функция для всех отрезков или список функций,
+        по одной на каждый отрезок.
+    intervals : последовательность пар (a, b) или массив формы (k, 2)
+        Отрезки интегрирования.
+    n_iter : int, optional
+        Количество подинтервалов для каждого отрезка. По умолчанию 100000.
+    backend : str, optional
+        Способ вычисления: "vectorized", "thread" или "process".
+        По умолчанию "vectorized".
+    n_jobs : int, optional
+        Количество потоков или процессов для "thread" и "process".
+        По умолчанию 2.
+
+    Возвращаемое значение
+    -------
+    list
+        Значения интегралов в порядке отрезков, округлённые до 10 знаков.
+
+    >>> integrate_batch(np.sin, [(-math.pi/2, math.pi/2), (0, math.pi)], n_iter=5000)
+    [-0.0006283185, 1.9999999342]
+    >>> integrate_batch([quadratic, math.sin], [(0, 1), (0, math.pi)], n_iter=5000, backend="thread")
+    [0.16676668, 1.9999999342]
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"неизвестный backend {backend!r}, ожидается один из {BATCH_BACKENDS}")
+    intervals = [(float(a), float(b)) for a, b in intervals]
+    funcs = list(f) if isinstance(f, (list, tuple)) else [f] * len(intervals)
+    if len(funcs) != len(intervals):
+        raise ValueError("количество функций не совпадает с количеством отрезков")
+
+    unique = list(dict.fromkeys(zip(funcs, intervals)))
+    tasks = [(func, a, b) for func, (a, b) in unique]
+
+    if backend == "process":
+        values = get_engine().map(tasks, n_iter=n_iter, n_jobs=n_jobs)
+    elif backend == "thread":
+        executor = get_thread_pool()
+        fs = [executor.submit(_integrate_tasks_nogil, tasks[start:stop], n_iter)
+              for start, stop in partition(len(tasks), n_jobs, 1)]
+        values = [res for fut in fs for res in fut.result()]
+    else:
+        values = [None] * len(tasks)
+        groups = {}
+        for i, (func, a, b) in enumerate(tasks):
+            groups.setdefault(func, []).append(i)
+        for func, idx in groups.items():
+            bounds = np.array([tasks[i][1:] for i in idx])
+            rows = None
+            if n_iter <= VECTOR_CHUNK:
+                rows = _integrate_rows(func, bounds[:, 0], bounds[:, 1], n_iter)
+            for k, i in enumerate(idx):
+                if rows is None:
+                    values[i] = integrate_vectorized(*tasks[i], n_iter=n_iter)
+                else:
+                    values[i] = round(float(rows[k]), 10)
+
+    results = dict(zip(unique, values))
+    return [results[key] for key in zip(funcs, intervals)]
+
+
+#итерация 8 адаптивный метод Симпсона
+ADAPTIVE_MAX_EVAL = 1000000
+
+
+def _adaptive_simpson(f: Callable, a: float, b: float, tol: float, max_depth: int,
+                      max_eval: int = ADAPTIVE_MAX_EVAL) -> tuple:
+    """
+    Адаптивный метод Симпсона на отрезке [a, b] без рекурсии.
+
+    Отрезок делится пополам только там, где оценка погрешности больше
+    допуска, значения функции на концах и в середине переиспользуются.
+    Если оценка погрешности не конечна (f дала nan или inf), отрезок
+    больше не делится и результат будет nan или inf, как у integrate.
+    Когда следующее деление превысило бы max_eval вычислений функции,
+    оставшиеся отрезки берутся по уже посчитанной формуле Симпсона.
+    Предупреждение об этом выдаёт integrate_adaptive в вызывающем
+    процессе, а не здесь: функция может выполняться в пуле процессов.
+
+    Возвращаемое значение
+    -------
+    tuple
+        (значение интеграла, количество вычислений функции, был ли
+        счёт остановлен по max_eval).
+    """
+    fa, fm, fb = f(a), f((a + b) / 2), f(b)
+    n_eval = 3
+    whole = (b - a) / 6 * (fa + 4 * fm + fb)
+    acc = 0.0
+    stack = [(a, b, fa, fm, fb, whole, tol, max_depth)]
+    truncated = False
+    while stack:
+        if n_eval + 2 > max_eval:
+            acc += math.fsum(item[5] for item in stack)
+            truncated = True
+            break
+        a, b, fa, fm, fb, whole, tol, depth = stack.pop()
+        m = (a + b) / 2
+        flm, frm = f((a + m) / 2), f((m + b) / 2)
+        n_eval += 2
+        left = (m - a) / 6 * (fa + 4 * flm + fm)
+        right = (b - m) / 6 * (fm + 4 * frm + fb)
+        delta = left + right - whole
+        if depth <= 0 or not math.isfinite(delta) or abs(delta) <= 15 * tol:
+            acc += left + right + delta / 15
+        else:
+            stack.append((m, b, fm, frm, fb, right, tol / 2, depth - 1))
+            stack.append((a, m, fa, flm, fm, left, tol / 2, depth - 1))
+    return acc, n_eval, truncated
+
+
+def integrate_adaptive(f: Callable, a: float, b: float, *, tol: float = 1e-10, max_depth: int = 50,
+                       max_eval: int = ADAPTIVE_MAX_EVAL, n_jobs: int = 1, backend: str = "thread") -> float:
+    """
+    Вычисляет приближённое значение определённого интеграла функции
+    адаптивным методом Симпсона с заданной точностью.
+
+    В отличие от integrate, количество вычислений функции не задаётся
+    заранее: отрезок дробится только там, где функция сильно искривлена,
+    пока оценка погрешности не станет меньше tol.
+
+    Параметры
+    ----------
+    f : Callable[[float], float]
+        Интегрируемая функция одного вещественного аргумента.
+    a : float
+        Нижний предел интегрирования (левая граница интервала).
+    b : float
+        Верхний предел интегрирования (правая граница интервала).
+    tol : float, optional
+        Допустимая абсолютная погрешность. По умолчанию 1e-10.
+    max_depth : int, optional
+        Максимальная глубина деления отрезка. По умолчанию 50.
+    max_eval : int, optional
+        Наибольшее общее число вычислений функции (делится поровну между
+        частями). Если его не хватает для точности tol, выдаётся
+        RuntimeWarning и возвращается текущая оценка.
+        По умолчанию ADAPTIVE_MAX_EVAL.
+    n_jobs : int, optional
+        Количество частей, на которые делится [a, b]; каждая часть
+        считается с допуском tol / n_jobs в отдельном потоке или процессе.
+        По умолчанию 1 (последовательно).
+    backend : str, optional
+        "thread" или "process" для n_jobs > 1. По умолчанию "thread".
+
+    Возвращаемое значение
+    -------
+    float
+        Приближённое значение определённого интеграла ∫[a, b] f(x) dx,
+        округлённое до 10 знаков после запятой.
+
+    >>> integrate_adaptive(math.sin, -math.pi/2, math.pi/2)
+    0.0
+    >>> integrate_adaptive(quadratic, 0, 1)
+    0.1666666667
+    >>> integrate_adaptive(math.sin, 0, math.pi, n_jobs=2, backend="process")
+    2.0
+    """
+    if tol <= 0:
+        raise ValueError("tol не может быть <= 0")
+    if n_jobs <= 0:
+        raise ValueError("n_jobs не может быть <= 0")
+    if max_eval < 3 * n_jobs:
+        raise ValueError("max_eval не может быть меньше 3 * n_jobs")
+    if backend not in ("thread", "process"):
+        raise ValueError(f"неизвестный backend {backend!r}, ожидается 'thread' или 'process'")
+    if n_jobs == 1:
+        results = [_adaptive_simpson(f, a, b, tol, max_depth, max_eval)]
+    else:
+        step = (b - a) / n_jobs
+        parts = [(f, a + i * step, a + (i + 1) * step, tol / n_jobs, max_depth, max_eval // n_jobs)
+                 for i in range(n_jobs)]
+        pool = get_engine() if backend == "process" else get_thread_pool()
+        fs = [pool.submit(_adaptive_simpson, *part) for part in parts]
+        results = [fut.result() for fut in fs]
+    if any(truncated for _, _, truncated in results):
+        warnings.warn(f"адаптивный метод остановлен после {sum(n for _, n, _ in results)} вычислений функции "
+                      f"(max_eval), точность tol не гарантирована", RuntimeWarning, stacklevel=2)
+    return round(sum(value for value, _, _ in results), 10)
+
+
+#итерация 9 кеш результатов
+CACHE_METHODS = {
+    "integrate": integrate,
+    "async": integrate_async,
+    "process": integrate_process,
+    "nogil": integrate_async_nogil,
+    "vectorized": integrate_vectorized,
+}
+# параметры методов, которые не влияют на результат и не входят в ключ кеша
+CACHE_IGNORED_OPTIONS = ("timings", "executor", "engine")
+
+
+class IntegralCache:
+    """
+    Кеш результатов интегрирования с вытеснением LRU и временем жизни записей.
+
+    Ключ записи — (функция, a, b, n_iter, method, дополнительные параметры).
+    Функция сравнивается как объект, поэтому две разные лямбды с одинаковым
+    текстом считаются разными подынтегральными функциями.
+
+    Если точного результата нет, но в кеше есть интеграл по [a, c] с тем же
+    шагом сетки, считается только остаток [c, b] и результаты складываются
+    (см. find_prefix). Из-за округления каждого слагаемого до 10 знаков
+    такой результат может отличаться от полного вычисления в 10-м знаке.
+
+    >>> cache = IntegralCache(maxsize=2)
+    >>> integrate_cached(quadratic, 0, 1, n_iter=5000, cache=cache)
+    0.16676668
+    >>> integrate_cached(quadratic, 0, 1, n_iter=5000, cache=cache)
+    0.16676668
+    >>> integrate_cached(quadratic, 0, 2, n_iter=10000, cache=cache)
+    1.33313336
+    >>> cache.stats()
+    {'hits': 1, 'misses': 2, 'extensions': 1, 'evictions': 0, 'size': 2}
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize не может быть <= 0")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl не может быть <= 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.extensions = self.evictions = 0
+
+    @staticmethod
+    def make_key(f: Callable, a: float, b: float, n_iter: int, method: str, options: dict = None) -> tuple:
+        """
+        Ключ записи. Параметры из CACHE_IGNORED_OPTIONS не учитываются,
+        остальные должны быть хешируемыми, иначе TypeError.
+        """
+        items = tuple(sorted((name, value) for name, value in (options or {}).items()
+                             if name not in CACHE_IGNORED_OPTIONS))
+        try:
+            hash(items)
+        except TypeError:
+            raise TypeError("параметры метода в ключе кеша должны быть хешируемыми") from None
+        return f, float(a), float(b), n_iter, method, items
+
+    def _alive(self, expires) -> bool:
+        return expires is None or expires > time.monotonic()
+
+    def get(self, key: tuple):
+        """Возвращает значение по ключу или None; учитывает попадание или промах в статистике."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and not self._alive(item[1]):
+                del self._data[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: tuple, value: float) -> None:
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def find_prefix(self, key: tuple):
+        """
+        Ищет в кеше интеграл по [a, c] той же функции тем же методом,
+        сетка которого совпадает с началом сетки запроса [a, b].
+
+        Возвращаемое значение
+        -------
+        Тройка (c, n_prefix, значение) с наибольшим c или None.
+        """
+        f, a, b, n_iter, method, options = key
+        step = (b - a) / n_iter
+        best = None
+        with self._lock:
+            for (kf, ka, kc, kn, km, ko), (value, expires) in self._data.items():
+                if kf is not f or ka != a or km != method or ko != options or kn >= n_iter:
+                    continue
+                if not self._alive(expires) or not math.isclose((kc - ka) / kn, step, rel_tol=1e-12):
+                    continue
+                if best is None or kn > best[1]:
+                    best = (kc, kn, value)
+        return best
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.extensions = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Статистика попаданий, промахов, продлений отрезка и вытеснений."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "extensions": self.extensions,
+                    "evictions": self.evictions, "size": len(self._data)}
+
+
+_DEFAULT_CACHE = IntegralCache()
+
+
+def get_cache() -> IntegralCache:
+    """Возвращает общий для модуля кеш, используемый integrate_cached по умолчанию."""
+    return _DEFAULT_CACHE
+
+
+def integrate_cached(f: Callable, a: float, b: float, *, n_iter: int = 100000, method: str = "integrate",
+                     cache: IntegralCache = None, **options) -> float:
+    """
+    Вычисляет интеграл методом method с кешированием результата.
+
+    Повторный запрос с теми же параметрами возвращается из кеша. Если в
+    кеше есть интеграл по начальному отрезку [a, c] с тем же шагом сетки,
+    вычисляется только остаток [c, b].
+
+    Параметры
+    ----------
+    f : Callable[[float], float]
+        Интегрируемая функция.
+    a, b : float
+        Пределы интегрирования.
+    n_iter : int, optional
+        Количество подинтервалов. По умолчанию 100000.
+    method : str, optional
+        Метод из CACHE_METHODS: "integrate", "async", "process", "nogil"
+        или "vectorized". По умолчанию "integrate".
+    cache : IntegralCache, optional
+        Кеш; по умолчанию общий кеш модуля (см. get_cache).
+    **options
+        Дополнительные параметры метода (n_jobs, summation и т.п.),
+        они входят в ключ кеша и должны быть хешируемыми. Параметры, не
+        влияющие на результат (CACHE_IGNORED_OPTIONS: timings, executor,
+        engine), передаются методу, но в ключ не входят; при попадании
+        в кеш метод не вызывается и timings не заполняется.
+
+    Возвращаемое значение
+    -------
+    float
+        Приближённое значение определённого интеграла ∫[a, b] f(x) dx.
+    """
+    if method not in CACHE_METHODS:
+        raise ValueError(f"неизвестный метод {method!r}, ожидается один из {tuple(CACHE_METHODS)}")
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    if cache is None:
+        cache = _DEFAULT_CACHE
+    key = cache.make_key(f, a, b, n_iter, method, options)
+    value = cache.get(key)
+    if value is not None:
+        return value
+    func = CACHE_METHODS[method]
+    prefix = cache.find_prefix(key)
+    if prefix is None:
+        value = func(f, a, b, n_iter=n_iter, **options)
+    else:
+        c, n_prefix, head = prefix
+        value = round(head + func(f, c, b, n_iter=n_iter - n_prefix, **options), 10)
+        with cache._lock:
+            cache.extensions += 1
+    cache.put(key, value)
+    return value
+
+
+#итерация 10 asyncio
+def _resolve_executor(executor) -> ftres.Executor:
+    if executor is None:
+        return get_thread_pool()
+    if isinstance(executor, IntegrationEngine):
+        return executor.start()._executor
+    return executor
+
+
+def _submit_chunks(loop, executor, f: Callable, a: float, b: float, n_iter: int, n_jobs: int,
+                   summation: str) -> list:
+    """Отправляет части сетки в executor и возвращает asyncio-futures в порядке частей."""
+    step = (b - a) / n_iter
+    return [loop.run_in_executor(executor, _integrate_range, f, a, step, start, stop, summation)
+            for start, stop in partition(n_iter, n_jobs)]
+
+
+async def integrate_aio(f: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = 3,
+                        executor=None, timeout: float = None, summation: str = "naive") -> float:
+    """
+    Асинхронный вариант integrate_async для asyncio.
+
+    Части сетки выполняются в executor (по умолчанию общий пул потоков,
+    можно передать IntegrationEngine для процессов), а корутина ждёт их
+    через await, не блокируя цикл событий. При отмене или истечении
+    timeout ещё не начатые части отменяются; уже запущенные части
+    досчитываются в фоне, но их результат отбрасывается.
+
+    Параметры
+    ----------
+    f, a, b, n_iter, n_jobs, summation
+        Как в integrate_async.
+    executor : concurrent.futures.Executor или IntegrationEngine, optional
+        Где выполнять части сетки. По умолчанию общий пул потоков.
+    timeout : float, optional
+        Ограничение времени в секундах; при превышении
+        возбуждается asyncio.TimeoutError.
+
+    Возвращаемое значение
+    -------
+    float
+        Приближённое значение определённого интеграла ∫[a, b] f(x) dx,
+        округлённое до 10 знаков после запятой.
+
+    >>> asyncio.run(integrate_aio(quadratic, 0, 1, n_iter=5000))
+    0.16676668
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    _check_summation(summation)
+    loop = asyncio.get_running_loop()
+    fs = _submit_chunks(loop, _resolve_executor(executor), f, a, b, n_iter, n_jobs, summation)
+    try:
+        partials = await asyncio.wait_for(asyncio.gather(*fs), timeout)
+    finally:
+        for fut in fs:
+            fut.cancel()
+    return round(_reduce_partials(partials, summation), 10)
+
+
+async def integrate_aio_stream(f: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = 3,
+                               executor=None, summation: str = "naive"):
+    """
+    Асинхронный генератор частичных результатов интегрирования.
+
+    После завершения каждой части сетки выдаёт кортеж
+    (готово частей, всего частей, сумма готовых частей). Последний
+    кортеж содержит полный интеграл, сложенный в порядке частей, как
+    в integrate_aio. Если потребитель прекращает перебор, оставшиеся
+    части отменяются.
+
+    >>> async def last(gen):
+    ...     async for item in gen:
+    ...         pass
+    ...     return item
+    >>> asyncio.run(last(integrate_aio_stream(quadratic, 0, 1, n_iter=5000)))
+    (12, 12, 0.16676668)
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    _check_summation(summation)
+    loop = asyncio.get_running_loop()
+    fs = _submit_chunks(loop, _resolve_executor(executor), f, a, b, n_iter, n_jobs, summation)
+    index = {fut: i for i, fut in enumerate(fs)}
+    partials = [None] * len(fs)
+    pending = set(fs)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                partials[index[fut]] = fut.result()
+            ready = [p for p in partials if p is not None]
+            if pending:
+                yield len(ready), len(fs), round(math.fsum(ready), 10)
+        yield len(fs), len(fs), round(_reduce_partials(partials, summation), 10)
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+#итерация 11 последовательное уточнение
+def integrate_progressive(f: Callable, a: float, b: float, *, n_start: int = 1000, max_iter: int = None):
+    """
+    Генератор последовательных уточнений интеграла методом левых прямоугольников.
+
+    На каждом шаге количество подинтервалов удваивается (n, 2n, 4n, ...).
+    Старые точки сетки входят в новую, поэтому вычисляются только
+    середины прежних подинтервалов: L(2n) = (L(n) + h(n) * Σ f(середин)) / 2.
+    Оценка погрешности |L(2n) - L(n)| соответствует первому порядку
+    точности метода. Перебор можно прервать в любой момент.
+
+    Параметры
+    ----------
+    f : Callable[[float], float]
+        Интегрируемая функция.
+    a, b : float
+        Пределы интегрирования.
+    n_start : int, optional
+        Количество подинтервалов на первом шаге. По умолчанию 1000.
+    max_iter : int, optional
+        Наибольшее количество подинтервалов; генератор останавливается,
+        когда следующий шаг его превысит. По умолчанию без ограничения.
+
+    Возвращаемое значение
+    -------
+    Генератор кортежей (n, значение, оценка погрешности); на первом
+    шаге оценка погрешности равна inf.
+
+    >>> for n, value, error in integrate_progressive(quadratic, 0, 1, n_start=1250, max_iter=5000):
+    ...     print(n, value, round(error, 8))
+    1250 0.16706688 inf
+    2500 0.16686672 0.00020016
+    5000 0.16676668 0.00010004
+    """
+    if n_start <= 0:
+        raise ValueError("n_start не может быть <= 0")
+    n = n_start
+    value = _integrate_range(f, a, (b - a) / n, 0, n, "fsum")
+    error = math.inf
+    while True:
+        yield n, round(value, 10), error
+        if max_iter is not None and 2 * n > max_iter:
+            return
+        h = (b - a) / (2 * n)
+        mids = math.fsum(f(a + (2 * i + 1) * h) for i in range(n))
+        refined = value / 2 + mids * h
+        error = abs(refined - value)
+        value, n = refined, 2 * n
+
+
+def integrate_until(f: Callable, a: float, b: float, *, tol: float = 1e-6, n_start: int = 1000,
+                    max_iter: int = 10 ** 8) -> tuple:
+    """
+    Уточняет интеграл через integrate_progressive, пока оценка погрешности
+    не станет меньше tol или количество подинтервалов не достигнет max_iter.
+
+    Возвращаемое значение
+    -------
+    tuple
+        Последнее уточнение (n, значение, оценка погрешности).
+
+    >>> n, value, error = integrate_until(quadratic, 0, 1, tol=1e-4, n_start=1250)
+    >>> n, value, round(error, 8)
+    (10000, 0.16671667, 5.001e-05)
+    """
+    if tol <= 0:
+        raise ValueError("tol не может быть <= 0")
+    for step in integrate_progressive(f, a, b, n_start=n_start, max_iter=max_iter):
+        if step[2] <= tol:
+            break
+    return step
+
+
+#итерация 12 общая память для процессов
+def _fill_shared(name: str, size: int, f: Callable, a: float, step: float, start: int, stop: int) -> None:
+    """Рабочий процесс: записывает f(a + i*step) для i из [start, stop) в общий буфер name."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        values = np.ndarray((size,), dtype=np.float64, buffer=shm.buf)
+        x = a + np.arange(start, stop) * step
+        y = _eval_vectorized(f, x)
+        if y is None:
+            for i in range(start, stop):
+                values[i] = f(a + i * step)
+        else:
+            values[start:stop] = y
+        del values
+    finally:
+        shm.close()
+
+
+class SharedGrid:
+    """
+    Значения функции на сетке a + i*h, i = 0..n_iter, в общей памяти.
+
+    Рабочие процессы IntegrationEngine записывают свои части сетки прямо
+    в буфер multiprocessing.shared_memory, поэтому значения не пересылаются
+    через pickle. Родительский процесс читает буфер как массив numpy без
+    копирования и может применять к нему разные квадратурные формулы,
+    не вычисляя f повторно. Буфер освобождается методом close() или при
+    выходе из with.
+
+    >>> with SharedGrid.evaluate(quadratic, 0, 1, n_iter=5000, n_jobs=2) as grid:
+    ...     grid.left(), grid.trapezoid(), grid.simpson()
+    (0.16676668, 0.16666668, 0.1666666667)
+    """
+
+    def __init__(self, a: float, b: float, n_iter: int):
+        if n_iter <= 0:
+            raise ValueError("n_iter не может быть <= 0")
+        self.a, self.b, self.n_iter = a, b, n_iter
+        self.step = (b - a) / n_iter
+        self._shm = shared_memory.SharedMemory(create=True, size=(n_iter + 1) * 8)
+        self.values = np.ndarray((n_iter + 1,), dtype=np.float64, buffer=self._shm.buf)
+
+    @classmethod
+    def evaluate(cls, f: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = 2,
+                 engine: IntegrationEngine = None) -> "SharedGrid":
+        """Создаёт сетку и заполняет её значениями f, разделив её на части для n_jobs рабочих процессов."""
+        grid = cls(a, b, n_iter)
+        if engine is None:
+            engine = get_engine()
+        size = n_iter + 1
+        try:
+            fs = [engine.submit(_fill_shared, grid._shm.name, size, f, a, grid.step, start, stop)
+                  for start, stop in partition(size, n_jobs)]
+            for fut in fs:
+                fut.result()
+        except BaseException:
+            grid.close()
+            raise
+        return grid
+
+    def left(self) -> float:
+        """Метод левых прямоугольников, совпадает с сеткой integrate."""
+        return round(float(np.sum(self.values[:-1])) * self.step, 10)
+
+    def right(self) -> float:
+        """Метод правых прямоугольников."""
+        return round(float(np.sum(self.values[1:])) * self.step, 10)
+
+    def trapezoid(self) -> float:
+        """Метод трапеций."""
+        v = self.values
+        return round((float(np.sum(v)) - float(v[0] + v[-1]) / 2) * self.step, 10)
+
+    def simpson(self) -> float:
+        """Метод Симпсона; требует чётного n_iter."""
+        if self.n_iter % 2:
+            raise ValueError("для метода Симпсона n_iter должно быть чётным")
+        v = self.values
+        acc = float(v[0] + v[-1]) + 4 * float(np.sum(v[1:-1:2])) + 2 * float(np.sum(v[2:-1:2]))
+        return round(acc * self.step / 3, 10)
+
+    def close(self) -> None:
+        """Освобождает общую память."""
+        if self._shm is not None:
+            del self.values
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+#итерация 13 профилирование
+# точки входа Cython, записывающие вызовы в активный profiling.profile();
+# внутри C-кода этапы не различаются, поэтому всё время относится к "evaluate"
+integrate_basic = instrument("integrate_basic")(integrate_basic)
+integrate_kernel = instrument("integrate_kernel")(integrate_kernel)
+integrate_kernel_parallel = instrument("integrate_kernel_parallel", n_jobs=3)(integrate_kernel_parallel)
+
+
+#итерация 14 автоматический выбор back-end
+# back-end -> (функция, принимает ли n_jobs)
+AUTO_BACKENDS = {
+    "integrate": (integrate, False),
+    "integrate_basic": (integrate_basic, False),
+    "integrate_vectorized": (integrate_vectorized, False),
+    "integrate_async_nogil": (integrate_async_nogil, True),
+    "integrate_process": (integrate_process, True),
+}
+PROBE_POINTS = 256
+PROBE_VECTOR_POINTS = 4096
+PROBE_REPEAT = 3
+# интегралы меньше стольких точек без готовых замеров считаются integrate:
+# замеры probe_integrand стоили бы заметную долю самого интеграла или больше
+PROBE_MIN_ITER = 10 * PROBE_REPEAT * PROBE_POINTS
+# постоянные накладные расходы вызова, с: пул потоков с nogil-ядрами и прогретый пул процессов
+THREAD_OVERHEAD = 2e-4
+PROCESS_OVERHEAD = 2e-2
+# компиляцию numba пробуем, только если без неё интеграл считается дольше этого времени, с
+COMPILE_WORTH = 2e-2
+# замеры хранятся для стольких функций, при превышении забывается давно не запрошенная
+AUTO_PROFILES_MAXSIZE = 256
+
+_AUTO_PROFILES = OrderedDict()
+_AUTO_LOCK = threading.Lock()
+
+
+def _cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _best_time(fn: Callable, *args) -> float:
+    """Наименьшее время из PROBE_REPEAT вызовов fn(*args)."""
+    best = float("inf")
+    for _ in range(PROBE_REPEAT):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _probe_vectorized(f: Callable, a: float, b: float):
+    """Время одного вычисления f на массиве точек или None, если f не векторизуется."""
+    x = np.linspace(a, b, PROBE_VECTOR_POINTS, endpoint=False)
+    y = _eval_vectorized(f, x)
+    if y is None:
+        return None
+    # функция может принять массив, но посчитать не то, что поточечно
+    sample = x[::PROBE_VECTOR_POINTS // 16]
+    try:
+        scalar = np.array([f(float(v)) for v in sample], dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if not np.allclose(y[::PROBE_VECTOR_POINTS // 16], scalar, equal_nan=True):
+        return None
+    return _best_time(f, x) / PROBE_VECTOR_POINTS
+
+
+def probe_integrand(f: Callable, a: float, b: float) -> dict:
+    """
+    Измеряет стоимость одного вычисления f разными способами; результат кешируется для f.
+
+    Возвращает словарь со временем одного вычисления, с:
+    "python" — цикл Python, "cython" — цикл integrate_basic,
+    "vectorized" — numpy на массиве (None, если f не векторизуется),
+    "nogil" — скомпилированное ядро numba (None — не компилируется,
+    отсутствует — компиляция ещё не пробовалась), а также "picklable" —
+    можно ли передать f в пул процессов.
+    """
+    with _AUTO_LOCK:
+        profile = _AUTO_PROFILES.get(f)
+        if profile is not None:
+            _AUTO_PROFILES.move_to_end(f)
+    if profile is not None:
+        return profile
+    step = (b - a) / PROBE_POINTS
+    profile = {
+        "python": _best_time(_integrate_range, f, a, step, 0, PROBE_POINTS) / PROBE_POINTS,
+        "cython": _best_time(partial(integrate_basic, n_iter=PROBE_POINTS), f, a, b) / PROBE_POINTS,
+        "vectorized": _probe_vectorized(f, a, b),
+    }
+    try:
+        pickle.dumps(f)
+        profile["picklable"] = True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        profile["picklable"] = False
+    with _AUTO_LOCK:
+        profile = _AUTO_PROFILES.setdefault(f, profile)
+        while len(_AUTO_PROFILES) > AUTO_PROFILES_MAXSIZE:
+            _AUTO_PROFILES.popitem(last=False)
+        return profile
+
+
+def _probe_nogil(f: Callable, profile: dict, a: float, b: float) -> None:
+    """Компилирует nogil-ядро и дописывает в profile время одного вычисления им."""
+    kernel = get_nogil_kernel(f)
+    if kernel is None:
+        profile["nogil"] = None
+    else:
+        step = (b - a) / PROBE_VECTOR_POINTS
+        profile["nogil"] = _best_time(kernel, a, step, 0, PROBE_VECTOR_POINTS) / PROBE_VECTOR_POINTS
+
+
+def choose_backend(f: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = None) -> dict:
+    """
+    Выбирает самый быстрый back-end для интеграла по модели стоимости.
+
+    Для каждого back-end время оценивается как накладные расходы вызова
+    плюс n_iter вычислений f, делённых на число исполнителей для
+    параллельных back-end. Стоимость вычисления f измеряется один раз
+    для каждой функции (см. probe_integrand). integrate_async не
+    рассматривается: из-за GIL он не быстрее integrate. Если замеров f
+    ещё нет, а n_iter меньше PROBE_MIN_ITER, замеры не делаются и
+    выбирается integrate: сам интеграл дешевле, чем выбор для него.
+
+    Параметры
+    ----------
+    n_jobs : int, optional
+        Число исполнителей для параллельных back-end. По умолчанию число
+        доступных процессору ядер.
+
+    Возвращаемое значение
+    -------
+    dict
+        {"backend": ключ AUTO_BACKENDS, "n_jobs": int,
+        "estimates": {back-end: оценка времени, с}}; estimates пуст,
+        если замеры не делались.
+
+    >>> choose_backend(np.sin, 0, 1, n_iter=10**6)["backend"]
+    'integrate_vectorized'
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter не может быть <= 0")
+    if n_jobs is None:
+        n_jobs = _cpu_count()
+    with _AUTO_LOCK:
+        probed = f in _AUTO_PROFILES
+    if not probed and n_iter < PROBE_MIN_ITER:
+        return {"backend": "integrate", "n_jobs": 1, "estimates": {}}
+    profile = probe_integrand(f, a, b)
+    estimates = {
+        "integrate": n_iter * profile["python"],
+        "integrate_basic": n_iter * profile["cython"],
+    }
+    if profile["vectorized"] is not None:
+        estimates["integrate_vectorized"] = n_iter * profile["vectorized"]
+    if "nogil" not in profile and min(estimates.values()) > COMPILE_WORTH:
+        _probe_nogil(f, profile, a, b)
+    if profile.get("nogil") is not None:
+        estimates["integrate_async_nogil"] = THREAD_OVERHEAD + n_iter * profile["nogil"] / n_jobs
+    if profile["picklable"] and n_jobs > 1:
+        estimates["integrate_process"] = PROCESS_OVERHEAD + n_iter * profile["python"] / n_jobs
+    backend = min(estimates, key=estimates.get)
+    return {"backend": backend, "n_jobs": n_jobs, "estimates": estimates}
+
+
+def integrate_auto(f: Callable, a: float, b: float, *, n_iter: int = 100000, n_jobs: int = None) -> float:
+    """
+    Вычисляет интеграл методом левых прямоугольников back-end, выбранным
+    choose_backend; решение опирается на кешированные замеры функции f.
+
+    >>> integrate_auto(quadratic, 0, 1, n_iter=5000)
+    0.16676668
+    """
+    choice = choose_backend(f, a, b, n_iter=n_iter, n_jobs=n_jobs)
+    func, uses_jobs = AUTO_BACKENDS[choice["backend"]]
+    if uses_jobs:
+        return func(f, a, b, n_iter=n_iter, n_jobs=choice["n_jobs"])
+    return func(f, a, b, n_iter=n_iter)
+
+
+def clear_auto_cache() -> None:
+    """Забывает замеры функций, сделанные probe_integrand."""
+    with _AUTO_LOCK:
+        _AUTO_PROFILES.clear()
 
 
 def quadratic(x):
@@ -0,0 +1,386 @@
+import doctest
+import itertools
+import math
+import numbers
+import time
+import warnings
+from typing import Callable
+import numpy as np
+from kernels import QMC_KERNEL_MAX_DIM, get_kernel_registry
+from main import VECTOR_CHUNK, get_engine, get_thread_pool, partition
+
+
+TENSOR_RULES = ("midpoint", "left")
+TENSOR_BACKENDS = ("vectorized", "thread", "process", "nogil")
+QMC_SEQUENCES = ("sobol", "halton")
+QMC_BACKENDS = ("vectorized", "thread", "process", "nogil")
+
+# параметры последовательности Соболя (Joe, Kuo, new-joe-kuo-6.21201) для измерений 2..10:
+# степень примитивного многочлена s, его коэффициенты a и начальные числа m
+SOBOL_PARAMS = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+]
+SOBOL_MAX_DIM = len(SOBOL_PARAMS) + 1
+SOBOL_BITS = 32
+
+
+def _eval_nd(f: Callable, coords: list):
+    """
+    Пробует вычислить f(*coords) сразу на массивах координат.
+
+    Возвращает массив формы coords[0].shape либо None, если функция
+    не умеет работать с массивами numpy или возвращает не вещественные
+    числа (как main._eval_vectorized: мнимую часть молча не отбрасываем).
+    """
+    try:
+        y = f(*coords)
+    except (TypeError, ValueError):
+        return None
+    y = np.asarray(y)
+    if y.dtype.kind not in "biuf":
+        return None
+    y = y.astype(float, copy=False)
+    if y.ndim == 0:
+        return np.broadcast_to(y, coords[0].shape)
+    if y.shape != coords[0].shape:
+        return None
+    return y
+
+
+def _check_bounds(bounds) -> tuple:
+    bounds = [(float(lo), float(hi)) for lo, hi in bounds]
+    if not bounds:
+        raise ValueError("bounds не может быть пустым")
+    return np.array([lo for lo, _ in bounds]), np.array([hi - lo for lo, hi in bounds])
+
+
+# тензорное произведение одномерных правил
+def _tensor_slab(f: Callable, lows: tuple, steps: tuple, counts: tuple, offset: float,
+                 start: int, stop: int) -> float:
+    """
+    Сумма f по узлам сетки, у которых индекс по первой оси лежит в [start, stop).
+
+    Узлы по оси k: lows[k] + (i + offset) * steps[k], i = 0..counts[k]-1.
+    Слой обрабатывается блоками не больше VECTOR_CHUNK узлов; если функция
+    не поддерживает массивы, узлы перебираются обычным циклом.
+    """
+    axes = [lows[k] + (np.arange(counts[k]) + offset) * steps[k] for k in range(len(counts))]
+    rows = max(1, VECTOR_CHUNK // math.prod(counts[1:]))
+    acc = 0.0
+    for begin in range(start, stop, rows):
+        grids = np.meshgrid(axes[0][begin:min(begin + rows, stop)], *axes[1:], indexing="ij")
+        y = _eval_nd(f, grids)
+        if y is None:
+            points = itertools.product(axes[0][start:stop].tolist(), *(axis.tolist() for axis in axes[1:]))
+            return math.fsum(f(*point) for point in points)
+        acc += float(np.sum(y))
+    return acc
+
+
+def get_nd_kernel(f: Callable, d: int):
+    """
+    Возвращает скомпилированное numba-ядро (nogil) для функции d переменных
+    или None, если функцию нельзя скомпилировать. Ядра хранятся в общем
+    реестре kernels.get_kernel_registry() и для импортируемых функций
+    сохраняются на диск.
+    """
+    return get_kernel_registry().get(f, f"tensor{d}")
+
+
+def _tensor_sum(f: Callable, lows: np.ndarray, steps: np.ndarray, counts: tuple, offset: float,
+                backend: str, n_jobs: int) -> float:
+    """Сумма f по всем узлам тензорной сетки выбранным способом."""
+    chunks = partition(counts[0], n_jobs)
+    args = (tuple(lows.tolist()), tuple(steps.tolist()), counts, offset)
+    if backend == "nogil":
+        kernel = get_nd_kernel(f, len(counts))
+        args = (lows, steps, np.array(counts, dtype=np.int64), offset)
+        start_time = time.perf_counter()
+        fs = [get_thread_pool().submit(kernel, *args, start, stop) for start, stop in chunks]
+        result = math.fsum(fut.result() for fut in fs)
+        get_kernel_registry().record_run(f, f"tensor{len(counts)}", time.perf_counter() - start_time)
+        return result
+    elif backend == "thread":
+        fs = [get_thread_pool().submit(_tensor_slab, f, *args, start, stop) for start, stop in chunks]
+    elif backend == "process":
+        engine = get_engine()
+        fs = [engine.submit(_tensor_slab, f, *args, start, stop) for start, stop in chunks]
+    else:
+        return _tensor_slab(f, *args, 0, counts[0])
+    return math.fsum(fut.result() for fut in fs)
+
+
+def integrate_tensor(f: Callable, bounds, *, n_iter=100, rule: str = "midpoint",
+                     backend: str = "vectorized", n_jobs: int = 2) -> tuple:
+    """
+    Вычисляет кратный интеграл (размерность 1–3) по прямоугольной области
+    тензорным произведением одномерных правил.
+
+    Область [a1, b1] x ... x [ad, bd] делится на n_iter частей по каждой
+    оси, функция вычисляется в серединах ("midpoint") или левых углах
+    ("left") ячеек. Для оценки погрешности тот же интеграл считается на
+    вдвое более грубой сетке, и разность пересчитывается по Ричардсону
+    (порядок 2 для "midpoint", 1 для "left").
+
+    Параметры
+    ----------
+    f : Callable
+        Функция d переменных f(x, y) или f(x, y, z). Для backend
+        "vectorized", "thread" и "process" желательно, чтобы она принимала
+        массивы numpy, иначе узлы перебираются циклом.
+    bounds : последовательность пар (a, b)
+        Пределы интегрирования по каждой оси.
+    n_iter : int или кортеж int, optional
+        Количество ячеек по каждой оси (одно число для всех осей или
+        по числу на ось). По умолчанию 100.
+    rule : str, optional
+        "midpoint" или "left". По умолчанию "midpoint".
+    backend : str, optional
+        "vectorized" — последовательно блоками numpy, "thread" и "process" —
+        слои первой оси в общем пуле потоков или процессов (см. partition),
+        "nogil" — скомпилированные numba-ядра в потоках без GIL (если
+        функция не компилируется, выдаётся RuntimeWarning и используется
+        "thread"). По умолчанию "vectorized".
+    n_jobs : int, optional
+        Количество параллельных исполнителей. По умолчанию 2.
+
+    Возвращаемое значение
+    -------
+    tuple
+        Пара (значение, оценка погрешности); значение округлено до 10 знаков.
+
+    >>> value, error = integrate_tensor(lambda x, y: x * y, [(0, 1), (0, 2)], n_iter=50)
+    >>> value, error < 1e-9
+    (1.0, True)
+    >>> value, error = integrate_tensor(lambda x, y, z: x * x + y * z, [(0, 1)] * 3, n_iter=40)
+    >>> round(value, 4), error < 1e-4
+    (0.5833, True)
+    """
+    if rule not in TENSOR_RULES:
+        raise ValueError(f"неизвестное правило {rule!r}, ожидается одно из {TENSOR_RULES}")
+    if backend not in TENSOR_BACKENDS:
+        raise ValueError(f"неизвестный backend {backend!r}, ожидается один из {TENSOR_BACKENDS}")
+    lows, widths = _check_bounds(bounds)
+    d = len(lows)
+    if d > 3:
+        raise ValueError("тензорная сетка поддерживает размерность до 3, используйте integrate_qmc")
+    counts = (n_iter,) * d if np.ndim(n_iter) == 0 else tuple(n_iter)
+    if len(counts) != d or not all(isinstance(n, numbers.Integral) and n > 0 for n in counts):
+        raise ValueError("n_iter должно быть положительным целым для каждой оси")
+    counts = tuple(int(n) for n in counts)
+    if backend == "nogil" and get_nd_kernel(f, d) is None:
+        warnings.warn("функция не компилируется numba, используется backend thread", RuntimeWarning, stacklevel=2)
+        backend = "thread"
+    offset = 0.5 if rule == "midpoint" else 0.0
+    order = 2 if rule == "midpoint" else 1
+
+    def value_for(counts):
+        steps = widths / np.array(counts)
+        return _tensor_sum(f, lows, steps, counts, offset, backend, n_jobs) * math.prod(steps.tolist())
+
+    fine = value_for(counts)
+    coarse_counts = tuple(max(1, n // 2) for n in counts)
+    if coarse_counts == counts:
+        return round(fine, 10), math.inf
+    coarse = value_for(coarse_counts)
+    return round(fine, 10), abs(fine - coarse) / (2 ** order - 1)
+
+
+# квази-Монте-Карло
+def _primes(n: int) -> list:
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def _sobol_directions(d: int) -> np.ndarray:
+    """Направляющие числа Соболя: массив (d, SOBOL_BITS) целых чисел, умноженных на 2^SOBOL_BITS."""
+    v = np.zeros((d, SOBOL_BITS), dtype=np.uint64)
+    v[0] = [1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]
+    for dim in range(1, d):
+        s, a, m = SOBOL_PARAMS[dim - 1]
+        row = [m[k] << (SOBOL_BITS - 1 - k) for k in range(s)]
+        for k in range(s, SOBOL_BITS):
+            value = row[k - s] ^ (row[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    value ^= row[k - i]
+            row.append(value)
+        v[dim] = row
+    return v
+
+
+def qmc_points(sequence: str, d: int, start: int, stop: int) -> np.ndarray:
+    """
+    Точки квазислучайной последовательности с номерами [start, stop) в [0, 1)^d.
+
+    Точки вычисляются напрямую по номеру (для Соболя через код Грея),
+    поэтому любые части последовательности можно строить независимо
+    в разных потоках или процессах.
+
+    Возвращаемое значение
+    -------
+    np.ndarray
+        Массив формы (d, stop - start).
+
+    >>> qmc_points("sobol", 2, 0, 4).tolist()
+    [[0.0, 0.5, 0.75, 0.25], [0.0, 0.5, 0.25, 0.75]]
+    >>> qmc_points("halton", 2, 0, 3).tolist()
+    [[0.5, 0.25, 0.75], [0.3333333333333333, 0.6666666666666666, 0.1111111111111111]]
+    """
+    index = np.arange(start, stop, dtype=np.uint64)
+    if sequence == "sobol":
+        if d > SOBOL_MAX_DIM:
+            raise ValueError(f"последовательность Соболя поддерживает размерность до {SOBOL_MAX_DIM}")
+        gray = index ^ (index >> np.uint64(1))
+        directions = _sobol_directions(d)
+        result = np.zeros((d, len(index)), dtype=np.uint64)
+        for k in range(SOBOL_BITS):
+            mask = ((gray >> np.uint64(k)) & np.uint64(1)).astype(bool)
+            if not mask.any():
+                continue
+            result[:, mask] ^= directions[:, k:k + 1]
+        return result / float(1 << SOBOL_BITS)
+    result = np.zeros((d, len(index)))
+    for dim, base in enumerate(_primes(d)):
+        i = index + np.uint64(1)
+        fraction = 1.0
+        while i.any():
+            fraction /= base
+            result[dim] += (i % np.uint64(base)) * fraction
+            i //= np.uint64(base)
+    return result
+
+
+def _qmc_chunk(f: Callable, sequence: str, lows: np.ndarray, widths: np.ndarray, shifts: np.ndarray,
+               start: int, stop: int) -> np.ndarray:
+    """
+    Суммы f по точкам [start, stop) для каждого случайного сдвига последовательности.
+
+    Возвращает массив длины len(shifts).
+    """
+    d = len(lows)
+    sums = np.zeros(len(shifts))
+    block = max(1, VECTOR_CHUNK // max(1, len(shifts)))
+    for begin in range(start, stop, block):
+        base = qmc_points(sequence, d, begin, min(begin + block, stop))
+        for r, shift in enumerate(shifts):
+            u = (base + shift[:, None]) % 1.0
+            coords = list(lows[:, None] + u * widths[:, None])
+            y = _eval_nd(f, coords)
+            if y is None:
+                sums[r] += math.fsum(f(*point) for point in zip(*(c.tolist() for c in coords)))
+            else:
+                sums[r] += float(np.sum(y))
+    return sums
+
+
+def _qmc_kernel_chunk(kernel, sequence: str, lows: np.ndarray, widths: np.ndarray, shifts: np.ndarray,
+                      start: int, stop: int) -> np.ndarray:
+    """То же, что _qmc_chunk, но суммы по каждому блоку точек считает скомпилированное ядро без GIL."""
+    d = len(lows)
+    sums = np.zeros(len(shifts))
+    for begin in range(start, stop, VECTOR_CHUNK):
+        sums += kernel(qmc_points(sequence, d, begin, min(begin + VECTOR_CHUNK, stop)), shifts, lows, widths)
+    return sums
+
+
+def integrate_qmc(f: Callable, bounds, *, n_points: int = 1 << 14, sequence: str = "sobol",
+                  n_random: int = 8, seed: int = None, backend: str = "vectorized", n_jobs: int = 2) -> tuple:
+    """
+    Вычисляет кратный интеграл по прямоугольной области рандомизированным
+    методом квази-Монте-Карло (последовательности Соболя или Холтона).
+
+    Последовательность n_points точек сдвигается n_random раз на случайный
+    вектор по модулю 1 (сдвиг Крэнли–Паттерсона). Каждый сдвиг даёт
+    независимую несмещённую оценку, их среднее — результат, а стандартная
+    ошибка среднего — оценка погрешности. Точки делятся на части
+    (см. partition) и могут считаться параллельно.
+
+    Параметры
+    ----------
+    f : Callable
+        Функция d переменных f(x1, ..., xd), желательно принимающая массивы numpy.
+    bounds : последовательность пар (a, b)
+        Пределы интегрирования по каждой оси.
+    n_points : int, optional
+        Количество точек последовательности. Для Соболя лучше степень двойки.
+        По умолчанию 2**14.
+    sequence : str, optional
+        "sobol" (размерность до SOBOL_MAX_DIM) или "halton". По умолчанию "sobol".
+    n_random : int, optional
+        Количество случайных сдвигов, не меньше 2. По умолчанию 8.
+    seed : int, optional
+        Начальное значение генератора сдвигов для воспроизводимости.
+    backend : str, optional
+        "vectorized", "thread", "process" или "nogil" — скомпилированное
+        numba-ядро (размерность до QMC_KERNEL_MAX_DIM) в потоках без GIL;
+        если ядро недоступно, выдаётся RuntimeWarning и используется
+        "thread". По умолчанию "vectorized".
+    n_jobs : int, optional
+        Количество параллельных исполнителей. По умолчанию 2.
+
+    Возвращаемое значение
+    -------
+    tuple
+        Пара (значение, оценка погрешности); значение округлено до 10 знаков.
+
+    >>> value, error = integrate_qmc(lambda *x: np.prod(x, axis=0), [(0, 1)] * 5, seed=1)
+    >>> abs(value - 1 / 32) < 1e-4, error < 1e-4
+    (True, True)
+    """
+    if sequence not in QMC_SEQUENCES:
+        raise ValueError(f"неизвестная последовательность {sequence!r}, ожидается одна из {QMC_SEQUENCES}")
+    if backend not in QMC_BACKENDS:
+        raise ValueError(f"неизвестный backend {backend!r}, ожидается один из {QMC_BACKENDS}")
+    if not isinstance(n_points, numbers.Integral) or n_points <= 0:
+        raise ValueError("n_points должно быть положительным целым")
+    if not isinstance(n_random, numbers.Integral) or n_random < 2:
+        raise ValueError("n_random должно быть целым не меньше 2")
+    n_points, n_random = int(n_points), int(n_random)
+    lows, widths = _check_bounds(bounds)
+    if sequence == "sobol" and len(lows) > SOBOL_MAX_DIM:
+        raise ValueError(f"последовательность Соболя поддерживает размерность до {SOBOL_MAX_DIM}")
+    shifts = np.random.default_rng(seed).random((n_random, len(lows)))
+    chunks = partition(n_points, n_jobs)
+    args = (f, sequence, lows, widths, shifts)
+    kind = f"qmc{len(lows)}"
+    if backend == "nogil":
+        kernel = get_kernel_registry().get(f, kind) if len(lows) <= QMC_KERNEL_MAX_DIM else None
+        if kernel is None:
+            warnings.warn("функция не компилируется numba, используется backend thread", RuntimeWarning, stacklevel=2)
+            backend = "thread"
+    if backend == "nogil":
+        start_time = time.perf_counter()
+        fs = [get_thread_pool().submit(_qmc_kernel_chunk, kernel, *args[1:], start, stop) for start, stop in chunks]
+        sums = sum(fut.result() for fut in fs)
+        get_kernel_registry().record_run(f, kind, time.perf_counter() - start_time)
+    elif backend == "thread":
+        fs = [get_thread_pool().submit(_qmc_chunk, *args, start, stop) for start, stop in chunks]
+        sums = sum(fut.result() for fut in fs)
+    elif backend == "process":
+        engine = get_engine()
+        fs = [engine.submit(_qmc_chunk, *args, start, stop) for start, stop in chunks]
+        sums = sum(fut.result() for fut in fs)
+    else:
+        sums = _qmc_chunk(*args, 0, n_points)
+    estimates = sums * math.prod(widths.tolist()) / n_points
+    value = float(np.mean(estimates))
+    error = float(np.std(estimates, ddof=1)) / math.sqrt(n_random)
+    return round(value, 10), error
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
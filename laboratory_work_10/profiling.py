@@ -0,0 +1,199 @@
+import doctest
+import functools
+import json
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+
+_PROFILERS = []
+_PROFILERS_LOCK = threading.Lock()
+
+
+class Profiler:
+    """
+    Собирает записи о вызовах функций интегрирования, сделанных внутри profile().
+
+    Каждая запись — словарь с полями:
+    backend, function, n_iter, n_jobs, chunks, workers, started, wall_s,
+    phases (время этапов: "pool", "compile", "submit", "wait", "reduce",
+    "evaluate" — в зависимости от back-end), busy_s (суммарное время
+    вычисления частей в исполнителях), evals, evals_per_s, utilization
+    (busy_s / (wall_s * workers)); у вызовов без разбиения на части
+    busy_s = wall_s и workers = 1. Для процессов ещё pickle_s и
+    pickle_bytes — оценка стоимости сериализации задач.
+    """
+
+    def __init__(self, callback: Callable = None):
+        self.callback = callback
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def summary(self) -> dict:
+        """Сводка по back-end: число вызовов, общее время, вычисления функции и их скорость."""
+        result = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            item = result.setdefault(record["backend"], {"calls": 0, "wall_s": 0.0, "evals": 0})
+            item["calls"] += 1
+            item["wall_s"] += record["wall_s"]
+            item["evals"] += record["evals"]
+        for item in result.values():
+            item["evals_per_s"] = item["evals"] / item["wall_s"] if item["wall_s"] > 0 else 0.0
+        return result
+
+    def to_jsonl(self, path: str) -> None:
+        """Сохраняет записи в файл JSON Lines, по записи на строку."""
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def profile(callback: Callable = None):
+    """
+    Включает запись вызовов интегрирования во всех потоках на время блока with.
+
+    Параметры
+    ----------
+    callback : Callable[[dict], None], optional
+        Вызывается с каждой новой записью, например для отправки в систему метрик.
+
+    >>> from main import integrate_async, quadratic
+    >>> with profile() as profiler:
+    ...     integrate_async(quadratic, 0, 1, n_iter=1000, n_jobs=2)
+    0.167167
+    >>> record = profiler.records[0]
+    >>> record["backend"], record["chunks"], record["evals"], sorted(record["phases"])
+    ('integrate_async', 8, 1000, ['pool', 'reduce', 'submit', 'wait'])
+    """
+    profiler = Profiler(callback)
+    with _PROFILERS_LOCK:
+        _PROFILERS.append(profiler)
+    try:
+        yield profiler
+    finally:
+        with _PROFILERS_LOCK:
+            _PROFILERS.remove(profiler)
+
+
+class _Call:
+    """
+    Замер одного вызова: этапы отмечаются lap(имя) по мере выполнения,
+    запись отправляется в активные профили при done().
+    """
+
+    def __init__(self, backend: str, f: Callable, n_iter: int, n_jobs: int):
+        self.record = {
+            "backend": backend,
+            "function": f if isinstance(f, str) else getattr(f, "__qualname__", repr(f)),
+            "n_iter": n_iter,
+            "n_jobs": n_jobs,
+            "chunks": 1,
+            "workers": 1,
+            "started": time.time(),
+            "phases": {},
+        }
+        self._start = self._last = time.perf_counter()
+
+    def __bool__(self) -> bool:
+        return True
+
+    def lap(self, phase: str) -> None:
+        """Относит время с предыдущей отметки к этапу phase."""
+        now = time.perf_counter()
+        phases = self.record["phases"]
+        phases[phase] = phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def pickle(self, payload: tuple, count: int) -> None:
+        """Оценивает сериализацию count одинаковых задач по одной задаче payload."""
+        started = time.perf_counter()
+        size = len(pickle.dumps(payload))
+        self.record["pickle_s"] = (time.perf_counter() - started) * count
+        self.record["pickle_bytes"] = size * count
+
+    def done(self, timings: list = None, workers: int = 1) -> None:
+        """
+        Завершает замер. timings — времена частей сетки (см. main._collect_chunks),
+        workers — сколько исполнителей могли работать одновременно.
+        """
+        wall = time.perf_counter() - self._start
+        record = self.record
+        if timings:
+            record["chunks"] = len(timings)
+            busy = sum(item["seconds"] for item in timings)
+            record["workers"] = max(1, min(workers, len(timings)))
+        else:
+            busy = wall
+        record["wall_s"] = wall
+        record["busy_s"] = busy
+        record["evals"] = record["n_iter"]
+        record["evals_per_s"] = record["n_iter"] / wall if wall > 0 else 0.0
+        record["utilization"] = busy / (wall * record["workers"]) if wall > 0 else 0.0
+        with _PROFILERS_LOCK:
+            profilers = list(_PROFILERS)
+        for profiler in profilers:
+            profiler.add(dict(record, phases=dict(record["phases"])))
+
+
+class _NullCall:
+    """Заглушка, когда профилирование выключено: все отметки ничего не делают."""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def lap(self, phase: str) -> None:
+        pass
+
+    def pickle(self, payload: tuple, count: int) -> None:
+        pass
+
+    def done(self, timings: list = None, workers: int = 1) -> None:
+        pass
+
+
+_NULL_CALL = _NullCall()
+
+
+def track(backend: str, f: Callable = None, n_iter: int = 0, n_jobs: int = 1):
+    """Начинает замер вызова back-end или возвращает заглушку, если нет активного profile()."""
+    if not _PROFILERS:
+        return _NULL_CALL
+    return _Call(backend, f, n_iter, n_jobs)
+
+
+def instrument(backend: str, n_iter: int = 100000, n_jobs: int = 1):
+    """
+    Декоратор для функций вида fn(f, a, b, *, n_iter, n_jobs), внутрь которых
+    нельзя добавить отметки (например, функции Cython): записывается
+    общее время вызова как этап "evaluate". n_iter и n_jobs — значения
+    по умолчанию самой функции.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(f, a, b, **kwargs):
+            if not _PROFILERS:
+                return fn(f, a, b, **kwargs)
+            call = _Call(backend, f, kwargs.get("n_iter", n_iter), kwargs.get("n_jobs", n_jobs))
+            result = fn(f, a, b, **kwargs)
+            call.lap("evaluate")
+            call.done()
+            return result
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    doctest.testmod()
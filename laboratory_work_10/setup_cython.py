@@ -1,6 +1,29 @@
 from Cython.Build import cythonize
-from setuptools import setup
+from setuptools import Extension, setup
+from setuptools.command.build_ext import build_ext
+
+# флаги OpenMP и оптимизации зависят от компилятора: MSVC не понимает -fopenmp
+OPENMP_FLAGS = {
+    "msvc": (["/openmp", "/O2"], []),
+    "unix": (["-fopenmp", "-O3"], ["-fopenmp"]),
+    "mingw32": (["-fopenmp", "-O3"], ["-fopenmp"]),
+}
+
+
+class BuildExt(build_ext):
+    def build_extensions(self):
+        compile_args, link_args = OPENMP_FLAGS.get(self.compiler.compiler_type, ([], []))
+        for ext in self.extensions:
+            ext.extra_compile_args = compile_args
+            ext.extra_link_args = link_args
+        super().build_extensions()
+
+
+extensions = [
+    Extension("Cython_int", ["Cython_int.pyx"]),
+]
 
 setup(
-    ext_modules=cythonize("Cython_int.pyx", annotate=True, compiler_directives={"language_level": 3}),
+    ext_modules=cythonize(extensions, annotate=True, compiler_directives={"language_level": 3}),
+    cmdclass={"build_ext": BuildExt},
 )
@@ -1,19 +1,160 @@
+import argparse
+import csv
+import json
 import math
 import timeit
 from main import *
-from Cython_int import integrate_basic
-from numpy.ma.extras import average
+from Cython_int import integrate_basic, integrate_kernel, integrate_kernel_parallel
+
+
+def cheap(x):
+    return math.cos(x)
+
+
+def medium(x):
+    return 2 * x ** 2 - 3 * x + math.cos(x) * math.exp(-x * x)
+
+
+def heavy(x):
+    acc = 0.0
+    for k in range(50):
+        acc += math.sin(x + k) / (k + 1)
+    return acc
+
+
+# подынтегральные функции разной стоимости: имя -> (функция, имя C-ядра Cython или None)
+INTEGRANDS = {
+    "cheap": (cheap, "cos"),
+    "medium": (medium, None),
+    "heavy": (heavy, None),
+}
+
+# back-end -> (функция, принимает ли n_jobs)
+BACKENDS = {
+    "integrate": (integrate, False),
+    "integrate_vectorized": (integrate_vectorized, False),
+    "integrate_async": (integrate_async, True),
+    "integrate_process": (integrate_process, True),
+    "integrate_async_nogil": (integrate_async_nogil, True),
+    "integrate_basic": (integrate_basic, False),
+    "integrate_kernel": (integrate_kernel, False),
+    "integrate_kernel_parallel": (integrate_kernel_parallel, True),
+}
+
+A, B = 0.0, math.pi
+TOLERANCE = 1e-8
+
+
+def _make_call(backend: str, integrand: str, n_iter: int, n_jobs: int):
+    """Возвращает функцию без аргументов, вызывающую back-end, или None, если комбинация не поддерживается."""
+    func, uses_jobs = BACKENDS[backend]
+    f, kernel = INTEGRANDS[integrand]
+    if backend.startswith("integrate_kernel"):
+        if kernel is None:
+            return None
+        f = kernel
+    kwargs = {"n_iter": n_iter}
+    if uses_jobs:
+        kwargs["n_jobs"] = n_jobs
+    return lambda: func(f, A, B, **kwargs)
+
+
+def time(call, repeat=5, number=1):
+    """Возвращает лучшее и среднее время одного вызова call"""
+    times = [t / number for t in timeit.repeat(call, number=number, repeat=repeat)]
+    return min(times), sum(times) / len(times)
+
+
+# поля записей run_benchmarks по порядку
+RECORD_FIELDS = ("backend", "integrand", "n_iter", "n_jobs", "best_s", "mean_s", "evals_per_s",
+                 "result", "error", "ok")
+
+
+def run_benchmarks(n_iters=(1000, 100000, 1000000), n_jobs_list=(1, 2, 4),
+                   integrands=tuple(INTEGRANDS), backends=tuple(BACKENDS), repeat=5) -> list:
+    """
+    Запускает перебор параметров по всем back-end.
+
+    Перед замером каждая комбинация вызывается один раз, чтобы прогреть
+    компиляцию numba и пулы потоков и процессов. Результат сравнивается с
+    эталоном integrate(..., summation="fsum") на той же сетке.
+
+    Возвращаемое значение
+    -------
+    list
+        Список словарей с полями backend, integrand, n_iter, n_jobs,
+        best_s, mean_s, evals_per_s, result, error, ok.
+    """
+    records = []
+    for integrand in integrands:
+        f = INTEGRANDS[integrand][0]
+        for n_iter in n_iters:
+            reference = integrate(f, A, B, n_iter=n_iter, summation="fsum")
+            for backend in backends:
+                jobs = n_jobs_list if BACKENDS[backend][1] else (1,)
+                for n_jobs in jobs:
+                    call = _make_call(backend, integrand, n_iter, n_jobs)
+                    if call is None:
+                        continue
+                    result = call()
+                    best, mean = time(call, repeat=repeat)
+                    error = abs(result - reference)
+                    records.append({
+                        "backend": backend,
+                        "integrand": integrand,
+                        "n_iter": n_iter,
+                        "n_jobs": n_jobs,
+                        "best_s": best,
+                        "mean_s": mean,
+                        "evals_per_s": n_iter / best if best > 0 else float("inf"),
+                        "result": result,
+                        "error": error,
+                        "ok": error <= TOLERANCE * max(1.0, abs(reference)),
+                    })
+    return records
+
+
+def save_json(records: list, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(records, file, ensure_ascii=False, indent=2)
+
+
+def save_csv(records: list, path: str) -> None:
+    """Записывает замеры в CSV; для пустого списка — только заголовок RECORD_FIELDS"""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(records[0]) if records else list(RECORD_FIELDS))
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def format_table(records: list) -> str:
+    """Таблица сравнения: время каждого back-end относительно integrate при тех же параметрах"""
+    baseline = {(r["integrand"], r["n_iter"]): r["best_s"] for r in records if r["backend"] == "integrate"}
+    lines = [f"{'backend':<26} {'integrand':<8} {'n_iter':>9} {'jobs':>4} {'best, ms':>10} "
+             f"{'evals/s':>12} {'speedup':>8}  ok"]
+    for r in records:
+        base = baseline.get((r["integrand"], r["n_iter"]))
+        speedup = f"{base / r['best_s']:.2f}" if base and r["best_s"] > 0 else "-"
+        lines.append(f"{r['backend']:<26} {r['integrand']:<8} {r['n_iter']:>9} {r['n_jobs']:>4} "
+                     f"{r['best_s'] * 1000:>10.3f} {r['evals_per_s']:>12.3g} {speedup:>8}  "
+                     f"{'да' if r['ok'] else 'НЕТ'}")
+    return "\n".join(lines)
 
-def time(func, n, repeat=10):
-    """Возвращает среднее время выполнения func(n)"""
-    times = timeit.repeat(lambda: func(math.cos, 0, math.pi, n_iter = n), number=5, repeat=repeat)
-    return average(times)
 
 if __name__ == "__main__":
-    test_data = 1000
-    print(time(integrate, test_data))
-    print(time(integrate_async, test_data))
-    print(time(integrate_process, test_data))
-    print(time(integrate_async_nogil, test_data))
-    print(time(integrate_basic, test_data))
+    parser = argparse.ArgumentParser(description="Замеры back-end интегрирования laboratory_work_10")
+    parser.add_argument("--n-iter", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--integrand", nargs="+", choices=list(INTEGRANDS), default=list(INTEGRANDS))
+    parser.add_argument("--backend", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="путь для сохранения результатов в JSON")
+    parser.add_argument("--csv", help="путь для сохранения результатов в CSV")
+    args = parser.parse_args()
 
+    records = run_benchmarks(args.n_iter, args.n_jobs, args.integrand, args.backend, args.repeat)
+    print(format_table(records))
+    if args.json:
+        save_json(records, args.json)
+    if args.csv:
+        save_csv(records, args.csv)